@@ -0,0 +1,106 @@
+# benchmarks/asgi_vs_wsgi.py
+"""
+Load test comparing WSGI (gunicorn) and ASGI (uvicorn) concurrency at a fixed worker count.
+
+Both servers are started with the same number of worker processes and driven with the same
+concurrent load against the async I/O-bound endpoints. Run from the directory containing
+manage.py, with the usual database environment variables set:
+
+    python -m benchmarks.asgi_vs_wsgi --workers 1 --concurrency 50 --requests 1000
+
+Pass --wsgi-url/--asgi-url to target servers that are already running instead.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.loadgen import run_load
+from benchmarks.servers import issue_token, setup_django, start_server, stop_server
+
+ENDPOINTS = [
+    ('GET', '/moodtracker/prompts/', None),
+    ('GET', '/moodtracker/insights/', None),
+    ('POST', '/users/password_reset/', {'email': 'bench-user@example.com'}),
+]
+GENERATE_ENDPOINT = ('POST', '/moodtracker/insights/generate/', {})
+
+
+def prepare_fixture():
+    """
+    Ensures a benchmark user with swipe history exists and returns a JWT access token for it.
+    """
+    from django.contrib.auth import get_user_model
+    from moodtracker.models import Prompt, UserResponse, Insight
+
+    user, created = get_user_model().objects.get_or_create(
+        username='bench-user', defaults={'email': 'bench-user@example.com'}
+    )
+    if created:
+        user.set_password('bench-password')
+        user.save()
+    if Prompt.objects.count() < 20:
+        Prompt.objects.bulk_create([Prompt(text=f"Benchmark prompt {i}", category='mood') for i in range(20)])
+    if not user.responses.exists():
+        UserResponse.objects.bulk_create(
+            [UserResponse(user=user, prompt=prompt, response=True) for prompt in Prompt.objects.all()[:10]]
+        )
+    if not user.insights.exists():
+        Insight.objects.bulk_create([Insight(user=user, content=f"Benchmark insight {i}") for i in range(25)])
+    return issue_token(user)
+
+
+def benchmark(base_url, token, endpoints, concurrency, total_requests):
+    headers = {'Authorization': f'Bearer {token}'}
+    results = {}
+    for method, path, body in endpoints:
+        results[f'{method} {path}'] = run_load(
+            base_url, path, concurrency=concurrency, total_requests=total_requests,
+            method=method, headers=headers, body=body,
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for both servers')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--wsgi-url', help='Use an already running WSGI server')
+    parser.add_argument('--asgi-url', help='Use an already running ASGI server')
+    parser.add_argument('--include-generate', action='store_true',
+                        help='Also hit the insight generation endpoint (needs a reachable Celery broker)')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    token = prepare_fixture()
+    endpoints = ENDPOINTS + ([GENERATE_ENDPOINT] if args.include_generate else [])
+
+    report = {
+        'workers': args.workers,
+        'threads': args.threads,
+        'concurrency': args.concurrency,
+        'requests_per_endpoint': args.requests,
+        'results': {},
+    }
+    for kind, url in (('wsgi', args.wsgi_url), ('asgi', args.asgi_url)):
+        process = None
+        if url is None:
+            process, url = start_server(kind, args.workers, args.threads)
+        try:
+            report['results'][kind] = benchmark(url, token, endpoints, args.concurrency, args.requests)
+        finally:
+            stop_server(process)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/compressed_text.py
+"""
+Storage size and read/write throughput of journal text with and without compression.
+
+Entries are written to ``Journaling.entry_text`` inside a transaction that is rolled back, once
+with the field's configured threshold and once with compression effectively disabled (every
+value stored raw). Text samples are drawn from the synthetic seeder's vocabulary.
+
+    python manage.py seed_synthetic --users 1
+    python -m benchmarks.compressed_text --entries 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from benchmarks.servers import setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def sample_texts(count, min_words, max_words, seed):
+    from users.management.commands.seed_synthetic import WORDS
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def run_mode(user, texts, threshold, batch_size):
+    from django.db import connection, transaction
+    from journaling.models import Journaling
+
+    field = Journaling._meta.get_field('entry_text')
+    configured = field.compress_threshold
+    field.compress_threshold = threshold
+    result = {'threshold': threshold}
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            entries = Journaling.objects.bulk_create(
+                [Journaling(user=user, entry_text=text) for text in texts], batch_size=batch_size,
+            )
+            result['write_seconds'] = time.perf_counter() - started
+            ids = [entry.pk for entry in entries]
+
+            with connection.cursor() as cursor:
+                stored = 0
+                for start in range(0, len(ids), batch_size):
+                    chunk = ids[start:start + batch_size]
+                    cursor.execute(
+                        "SELECT SUM(LENGTH(entry_text)) FROM journaling_journaling WHERE id IN (%s)"
+                        % ", ".join(["%s"] * len(chunk)),
+                        chunk,
+                    )
+                    stored += cursor.fetchone()[0] or 0
+            result['stored_bytes'] = stored
+
+            started = time.perf_counter()
+            decoded = 0
+            for entry in Journaling.objects.filter(pk__in=ids).only('id', 'entry_text').iterator(chunk_size=batch_size):
+                decoded += len(entry.entry_text)
+            result['read_seconds'] = time.perf_counter() - started
+            result['characters'] = decoded
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        field.compress_threshold = configured
+
+    result['writes_per_second'] = len(texts) / result['write_seconds']
+    result['reads_per_second'] = len(texts) / result['read_seconds']
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--min-words', type=int, default=20)
+    parser.add_argument('--max-words', type=int, default=400)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from journaling.models import Journaling
+
+    user = get_user_model().objects.filter(username__startswith='synthetic_').order_by('pk').first()
+    if user is None:
+        raise SystemExit("No synthetic users found; run `python manage.py seed_synthetic` first.")
+    texts = sample_texts(args.entries, args.min_words, args.max_words, args.seed)
+
+    field = Journaling._meta.get_field('entry_text')
+    report = {
+        'entries': args.entries,
+        'text_bytes': sum(len(text.encode('utf-8')) for text in texts),
+        'modes': {
+            'compressed': run_mode(user, texts, field.compress_threshold, args.batch_size),
+            'uncompressed': run_mode(user, texts, sys.maxsize, args.batch_size),
+        },
+    }
+    report['storage_ratio'] = report['modes']['compressed']['stored_bytes'] / report['modes']['uncompressed']['stored_bytes']
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
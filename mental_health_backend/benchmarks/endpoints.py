@@ -0,0 +1,237 @@
+# benchmarks/endpoints.py
+"""
+Load benchmark for every URL exposed by mental_health_backend/urls.py (including moodtracker/urls.py).
+
+For each route the harness:
+  * records the number of SQL queries of a single in-process request (Django test client), and
+  * drives the route over HTTP with concurrent keep-alive clients and reports p50/p95/p99 latency.
+
+Seed data first, then run from the directory containing manage.py:
+
+    python manage.py seed_synthetic --users 1000
+    python -m benchmarks.endpoints --output bench.json
+    python -m benchmarks.endpoints --output bench-new.json --baseline bench.json
+
+DATABASE_ENGINE=sqlite3 targets a local SQLite file; otherwise the configured Postgres is used.
+"""
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.loadgen import run_load
+from benchmarks.servers import issue_token, setup_django, start_server, stop_server
+
+SKIPPED_PREFIXES = ('admin/',)
+
+# POST-only routes and the body sent to them; only driven with --include-writes
+POST_BODIES = {
+    'token_obtain_pair': lambda ctx: {'username': ctx['user'].username, 'password': 'synthetic-password'},
+    'token_refresh': lambda ctx: {'refresh': ctx['refresh']},
+    'password-reset-request': lambda ctx: {'email': ctx['user'].email},
+    'reset_password_token_create': lambda ctx: {'email': ctx['user'].email},
+    'swipe-session-create': lambda ctx: {},
+    'generate-insight': lambda ctx: {},
+}
+
+
+def iter_routes(patterns, prefix=''):
+    """
+    Yields ``(route, name, callback)`` for every concrete URL pattern, following includes.
+    """
+    from django.urls import URLResolver
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        else:
+            yield route, pattern.name, pattern.callback
+
+
+def view_model(callback):
+    view_class = getattr(callback, 'view_class', None)
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    meta = getattr(serializer_class, 'Meta', None)
+    return getattr(meta, 'model', None)
+
+
+def sample_pk(model, user):
+    """
+    Picks a primary key for detail routes, preferring rows owned by the benchmark user.
+    """
+    if model is None:
+        return None
+    queryset = model.objects.all()
+    if any(field.name == 'user' for field in model._meta.fields):
+        queryset = queryset.filter(user=user)
+    return queryset.order_by('pk').values_list('pk', flat=True).first()
+
+
+def build_path(route, callback, user):
+    """
+    Fills path converters with real ids; returns None when no matching row exists.
+    """
+    from moodtracker.models import SwipeSession
+    kwarg_models = {'session_id': SwipeSession}
+
+    def substitute(match):
+        name = match.group(1).split(':')[-1]
+        pk = sample_pk(kwarg_models.get(name, view_model(callback)), user)
+        if pk is None:
+            raise LookupError(name)
+        return str(pk)
+
+    try:
+        return '/' + re.sub(r'<([^>]+)>', substitute, route)
+    except LookupError:
+        return None
+
+
+def allowed_methods(callback):
+    view_class = getattr(callback, 'view_class', None)
+    if view_class is None:
+        return {'GET'}
+    return {method.upper() for method in ('get', 'post') if hasattr(view_class, method)}
+
+
+def collect_scenarios(user, include_writes):
+    from django.urls import get_resolver
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    context = {'user': user, 'refresh': str(RefreshToken.for_user(user))}
+    scenarios, skipped = [], []
+    for route, name, callback in iter_routes(get_resolver().url_patterns):
+        if route.startswith(SKIPPED_PREFIXES):
+            continue
+        path = build_path(route, callback, user)
+        if path is None:
+            skipped.append({'route': route, 'reason': 'no row available for path parameter'})
+            continue
+        methods = allowed_methods(callback)
+        if 'GET' in methods:
+            scenarios.append({'name': name, 'method': 'GET', 'path': path, 'body': None})
+        elif 'POST' in methods and include_writes and name in POST_BODIES:
+            scenarios.append({'name': name, 'method': 'POST', 'path': path, 'body': POST_BODIES[name](context)})
+        else:
+            skipped.append({'route': route, 'reason': 'write-only route (use --include-writes)'})
+    return scenarios, skipped
+
+
+def count_queries(scenario, token):
+    """
+    Executes the scenario once in-process and returns ``(status_code, query_count)``.
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    with CaptureQueriesContext(connection) as queries:
+        if scenario['method'] == 'GET':
+            response = client.get(scenario['path'])
+        else:
+            response = client.post(scenario['path'], scenario['body'], content_type='application/json')
+    return response.status_code, len(queries)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """
+    Prints p95 and query-count deltas against a previous JSON report.
+    """
+    previous = {(entry['method'], entry['path']): entry for entry in baseline['endpoints']}
+    print(f"{'endpoint':60} {'p95 ms':>18} {'queries':>12}", file=sys.stderr)
+    for entry in report['endpoints']:
+        old = previous.get((entry['method'], entry['path']))
+        if old is None:
+            continue
+        print(
+            f"{entry['method'] + ' ' + entry['path']:60} "
+            f"{old['p95_ms']!s:>8} -> {entry['p95_ms']!s:<8} "
+            f"{old['queries']!s:>4} -> {entry['queries']!s:<4}",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Benchmark an already running server instead of starting one')
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--username', help='User to authenticate as (default: first synthetic user)')
+    parser.add_argument('--include-writes', action='store_true', help='Also drive POST-only routes')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='Previous JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    users = get_user_model().objects.order_by('pk')
+    user = users.get(username=args.username) if args.username else users.filter(username__startswith='synthetic_').first()
+    if user is None:
+        raise SystemExit("No synthetic users found; run `python manage.py seed_synthetic` first.")
+    token = issue_token(user)
+    scenarios, skipped = collect_scenarios(user, args.include_writes)
+
+    process, base_url = (None, args.url) if args.url else start_server(args.server, args.workers, args.threads)
+    endpoints = []
+    try:
+        for scenario in scenarios:
+            status_code, queries = count_queries(scenario, token)
+            result = run_load(
+                base_url, scenario['path'], concurrency=args.concurrency, total_requests=args.requests,
+                method=scenario['method'], headers={'Authorization': f'Bearer {token}'}, body=scenario['body'],
+            )
+            endpoints.append({
+                'name': scenario['name'], 'method': scenario['method'], 'path': scenario['path'],
+                'status': status_code, 'queries': queries, **result,
+            })
+            print(f"{scenario['method']:4} {scenario['path']:55} p95={result['p95_ms']}ms queries={queries}",
+                  file=sys.stderr)
+    finally:
+        stop_server(process)
+
+    report = {
+        'revision': git_revision(),
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'server': 'external' if args.url else args.server,
+        'workers': args.workers,
+        'threads': args.threads,
+        'concurrency': args.concurrency,
+        'requests_per_endpoint': args.requests,
+        'endpoints': endpoints,
+        'skipped': skipped,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(report, json.load(handle))
+
+
+if __name__ == '__main__':
+    main()
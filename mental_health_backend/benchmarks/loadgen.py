@@ -0,0 +1,97 @@
+# benchmarks/loadgen.py
+"""
+Minimal concurrent HTTP load generator used by the benchmark scripts.
+
+Only the standard library is used so the harness runs anywhere the backend does.
+"""
+
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, pct):
+    """
+    Returns the nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """
+    Reduces a list of per-request latencies (seconds) to a JSON-friendly summary in milliseconds.
+    """
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else None,
+        'p50_ms': to_ms(percentile(ordered, 50)),
+        'p95_ms': to_ms(percentile(ordered, 95)),
+        'p99_ms': to_ms(percentile(ordered, 99)),
+        'max_ms': to_ms(ordered[-1] if ordered else None),
+    }
+
+
+def _worker(base_url, method, path, headers, body, count):
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.hostname, parts.port, timeout=60)
+    latencies, errors, statuses = [], 0, {}
+    payload = json.dumps(body) if body is not None else None
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = connection_class(parts.hostname, parts.port, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.status >= 500:
+            errors += 1
+    connection.close()
+    return latencies, errors, statuses
+
+
+def run_load(base_url, path, concurrency=10, total_requests=200, method='GET', headers=None, body=None):
+    """
+    Fires ``total_requests`` requests at ``base_url + path`` from ``concurrency`` keep-alive clients.
+
+    Returns the summary produced by :func:`summarize` plus a histogram of status codes.
+    """
+    headers = dict(headers or {})
+    if body is not None:
+        headers.setdefault('Content-Type', 'application/json')
+    per_client = [total_requests // concurrency] * concurrency
+    for index in range(total_requests % concurrency):
+        per_client[index] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(
+            lambda count: _worker(base_url, method, path, headers, body, count),
+            [count for count in per_client if count],
+        ))
+    elapsed = time.perf_counter() - started
+
+    latencies, errors, statuses = [], 0, {}
+    for worker_latencies, worker_errors, worker_statuses in results:
+        latencies.extend(worker_latencies)
+        errors += worker_errors
+        for code, hits in worker_statuses.items():
+            statuses[code] = statuses.get(code, 0) + hits
+    summary = summarize(latencies, elapsed, errors)
+    summary['status_codes'] = {str(code): hits for code, hits in sorted(statuses.items())}
+    return summary
@@ -0,0 +1,106 @@
+# benchmarks/logging_overhead.py
+"""
+Request latency with SQL debug logging on (synchronous vs queued) and off.
+
+Requests are served in-process through the Django test client so only the logging
+configuration changes between runs. Log output goes to a real file to include I/O cost.
+
+    python manage.py seed_synthetic --users 50
+    python -m benchmarks.logging_overhead --requests 500
+"""
+
+import argparse
+import json
+import logging.config
+import sys
+import tempfile
+import time
+
+from benchmarks.loadgen import summarize
+from benchmarks.servers import issue_token, setup_django
+
+PATHS = ['/journaling/', '/gratitude/', '/moodtracker/insights/', '/goals/']
+
+
+def legacy_config(stream):
+    """
+    The previous LOGGING setup with SQL enabled: a synchronous StreamHandler at DEBUG.
+    """
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {'console': {'class': 'logging.StreamHandler', 'stream': stream}},
+        'root': {'handlers': ['console'], 'level': 'DEBUG'},
+        'loggers': {
+            'django': {'handlers': [], 'level': 'INFO', 'propagate': True},
+            'django.db.backends': {'level': 'DEBUG'},
+        },
+    }
+
+
+def queued_config(stream, profile, sql):
+    from mental_health_backend.structured_logging import build_logging_config
+    config = build_logging_config(profile, sql=sql, sample_rates={'django.db.backends': 1.0})
+    config['handlers']['console']['stream'] = stream
+    return config
+
+
+def stop_listeners():
+    for handler in logging.getLogger().handlers:
+        if hasattr(handler, 'stop'):
+            handler.stop()
+
+
+def run_mode(client, total_requests):
+    latencies = []
+    started = time.perf_counter()
+    for index in range(total_requests):
+        request_started = time.perf_counter()
+        response = client.get(PATHS[index % len(PATHS)])
+        latencies.append(time.perf_counter() - request_started)
+        assert response.status_code == 200, response.status_code
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    settings.DEBUG = True  # SQL statements are only logged with DEBUG on
+    user = get_user_model().objects.filter(username__startswith='synthetic_').order_by('pk').first()
+    if user is None:
+        raise SystemExit("No synthetic users found; run `python manage.py seed_synthetic` first.")
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}')
+    client.get(PATHS[0])  # Warm up URL resolution, middleware and connections
+
+    modes = {
+        'sql_debug_sync_stream': lambda stream: legacy_config(stream),
+        'sql_debug_queued_json': lambda stream: queued_config(stream, 'prod', sql=True),
+        'sql_off_queued_json': lambda stream: queued_config(stream, 'prod', sql=False),
+    }
+    report = {'requests': args.requests, 'paths': PATHS, 'modes': {}}
+    for name, build in modes.items():
+        with tempfile.NamedTemporaryFile('w', suffix='.log') as log_file:
+            logging.config.dictConfig(build(log_file))
+            report['modes'][name] = run_mode(client, args.requests)
+            stop_listeners()
+            log_file.flush()
+            report['modes'][name]['log_bytes'] = log_file.tell()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
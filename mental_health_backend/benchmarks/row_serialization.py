@@ -0,0 +1,102 @@
+# benchmarks/row_serialization.py
+"""
+Rows per second through the regular DRF list path and the ``values_list()`` fast path.
+
+For each list serializer, the same rows are fetched and serialized, then rendered to JSON,
+``--repeat`` times (best time kept): once as model instances through the ``ModelSerializer``
+and ``JSONRenderer``, once as tuples through ``RowSerializer`` and ``ORJSONRenderer``. The
+two outputs are checked to be identical.
+
+    python manage.py seed_synthetic --users 20
+    python -m benchmarks.row_serialization --rows 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.servers import setup_django
+
+
+def timed(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_case(serializer_class, queryset, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from mental_health_backend.fastpath import compile_rows
+    from mental_health_backend.renderers import ORJSONRenderer
+
+    # A fresh queryset each time: a reused one would serve cached instances with their text decoded
+    data, drf_serialize = timed(repeat, lambda: serializer_class(list(queryset.all()), many=True).data)
+    drf_body, drf_render = timed(repeat, lambda: JSONRenderer().render(data))
+
+    row_serializer = compile_rows(serializer_class(), queryset)
+    fast_data, fast_serialize = timed(repeat, lambda: row_serializer.to_representation(list(row_serializer.rows(queryset))))
+    fast_body, fast_render = timed(repeat, lambda: ORJSONRenderer().render(fast_data))
+
+    count = len(fast_data)
+
+    def phases(serialize, render):
+        return {
+            'fetch_and_serialize_seconds': serialize,
+            'render_seconds': render,
+            'rows_per_second': count / (serialize + render),
+            'render_rows_per_second': count / render if render else None,
+        }
+
+    drf = phases(drf_serialize, drf_render)
+    fast = phases(fast_serialize, fast_render)
+    return {
+        'rows': count,
+        'identical': drf_body == fast_body,
+        'drf': drf,
+        'fast_path': fast,
+        'speedup': fast['rows_per_second'] / drf['rows_per_second'] if drf['rows_per_second'] else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from journaling.models import CognitiveExercise, Journaling, Meditation
+    from journaling.serializers import CognitiveExerciseSerializer, JournalingSerializer, MeditationSerializer
+    from moodtracker.models import Insight
+    from moodtracker.serializers import InsightSerializer
+
+    cases = {
+        'journaling': (JournalingSerializer, Journaling.objects.order_by('-created_at')),
+        'insights': (InsightSerializer, Insight.objects.order_by('-generated_at')),
+        'meditations': (MeditationSerializer, Meditation.objects.all()),
+        'cognitive_exercises': (CognitiveExerciseSerializer, CognitiveExercise.objects.all()),
+    }
+    report = {}
+    for name, (serializer_class, queryset) in cases.items():
+        queryset = queryset[:args.rows]
+        if queryset.exists():
+            report[name] = run_case(serializer_class, queryset, args.repeat)
+    if not report:
+        raise SystemExit("No rows found; run `python manage.py seed_synthetic` first.")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
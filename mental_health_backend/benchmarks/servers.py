@@ -0,0 +1,74 @@
+# benchmarks/servers.py
+"""
+Helpers shared by the benchmark scripts: Django bootstrap, auth tokens and server processes.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mental_health_backend.settings')
+    import django
+    django.setup()
+
+
+def issue_token(user):
+    """
+    Returns a JWT access token string for ``user``.
+    """
+    from rest_framework_simplejwt.tokens import AccessToken
+    return str(AccessToken.for_user(user))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+
+def start_server(kind, workers=1, threads=1):
+    """
+    Starts gunicorn (``kind='wsgi'``) or uvicorn (``kind='asgi'``) on a free port.
+
+    Returns the process and its base URL; the caller is responsible for terminating it.
+    """
+    port = free_port()
+    if kind == 'wsgi':
+        executable = 'gunicorn'
+        command = [
+            executable, 'mental_health_backend.wsgi:application',
+            '--workers', str(workers), '--threads', str(threads),
+            '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+        ]
+    else:
+        executable = 'uvicorn'
+        command = [
+            executable, 'mental_health_backend.asgi:application',
+            '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log',
+        ]
+    if shutil.which(executable) is None:
+        raise SystemExit(f"{executable} is not installed; pip install -r requirements.txt")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return process, f'http://127.0.0.1:{port}'
+
+
+def stop_server(process):
+    if process is not None:
+        process.terminate()
+        process.wait()
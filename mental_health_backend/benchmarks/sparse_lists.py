@@ -0,0 +1,115 @@
+# benchmarks/sparse_lists.py
+"""
+Bytes on the wire and rows transferred from the database per list page, with and without
+``?fields=`` and ``?preview=``.
+
+Each variant fetches the same pages of the journal and insight lists of the synthetic user
+with the most entries. Database bytes are measured by re-running the page query and summing
+the size of every returned value.
+
+    python manage.py seed_synthetic --users 5
+    python -m benchmarks.sparse_lists --pages 5
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.servers import issue_token, setup_django
+
+VARIANTS = {
+    'full': {},
+    'preview': {'preview': 80},
+    'fields': {'fields': 'id,created_at,word_count'},
+    'fields_preview': {'fields': 'id,entry_text,created_at', 'preview': 80},
+}
+INSIGHT_VARIANTS = {
+    'full': {},
+    'preview': {'preview': 80},
+    'fields_preview': {'fields': 'id,content,generated_at', 'preview': 80},
+}
+
+
+def value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    return len(str(value).encode('utf-8'))
+
+
+def page_query_bytes(sql):
+    """
+    Re-runs a captured page query and sums the size of its values.
+    """
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return sum(value_size(value) for row in cursor.fetchall() for value in row)
+
+
+def run_variant(client, path, table, params, pages):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    response_bytes, db_bytes, timings = [], [], []
+    for page in range(1, pages + 1):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path, {**params, 'page': page})
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            break
+        response_bytes.append(len(response.content))
+        sql = next(
+            q['sql'] for q in queries.captured_queries
+            if f'FROM "{table}"' in q['sql'] and 'COUNT(' not in q['sql']
+        )
+        db_bytes.append(page_query_bytes(sql))
+    return {
+        'params': params,
+        'pages': len(response_bytes),
+        'response_bytes_per_page': statistics.mean(response_bytes) if response_bytes else 0,
+        'db_bytes_per_page': statistics.mean(db_bytes) if db_bytes else 0,
+        'median_ms': statistics.median(timings) * 1000 if timings else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    from django.test import Client
+
+    user = (
+        get_user_model().objects.filter(username__startswith='synthetic_')
+        .annotate(entries=Count('journals')).order_by('-entries').first()
+    )
+    if user is None:
+        raise SystemExit("No synthetic users found; run `python manage.py seed_synthetic` first.")
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {issue_token(user)}')
+
+    report = {'user': user.username, 'journaling': {}, 'insights': {}}
+    for name, params in VARIANTS.items():
+        report['journaling'][name] = run_variant(client, '/journaling/', 'journaling_journaling', params, args.pages)
+    for name, params in INSIGHT_VARIANTS.items():
+        report['insights'][name] = run_variant(client, '/moodtracker/insights/', 'moodtracker_insight', params, args.pages)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/vector_search.py
+"""
+Query latency and recall of the embedding index, brute force against IVF.
+
+Writes ``--rows`` synthetic unit vectors (clustered, like sentence embeddings) to a temporary
+index twice, once scored exhaustively and once with its IVF layer, then runs ``--queries``
+searches against each. Recall is the share of the exact top ``--k`` that the IVF search
+returns. Also times a per-owner search, as used for a user's own journal entries.
+
+    python -m benchmarks.vector_search --rows 1000000 --dim 384
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def synthetic_vectors(rows, dim, clusters, seed):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    for start in range(0, rows, 100_000):
+        count = min(100_000, rows - start)
+        vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.normal(size=(count, dim)).astype(np.float32)
+        yield start, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def write_index(path, args, **finish):
+    from mental_health_backend.vectors import IndexWriter, VectorIndex
+    writer = IndexWriter(path, args.dim)
+    for start, vectors in synthetic_vectors(args.rows, args.dim, args.clusters, args.seed):
+        ids = np.arange(start + 1, start + len(vectors) + 1)
+        writer.add(ids, ids % args.owners, vectors)
+    started = time.perf_counter()
+    writer.finish(**finish)
+    return VectorIndex(path), time.perf_counter() - started
+
+
+def timed_searches(queries, search):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append({id for id, _ in search(query)})
+        latencies.append(time.perf_counter() - started)
+    latencies = np.array(latencies) * 1000
+    return results, {'p50_ms': float(np.percentile(latencies, 50)), 'p95_ms': float(np.percentile(latencies, 95))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--clusters', type=int, default=1000)
+    parser.add_argument('--owners', type=int, default=10_000, help='Distinct owner IDs (users)')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        flat, _ = write_index(f'{root}/flat', args, ivf_min_rows=args.rows + 1)
+        ivf, ivf_build = write_index(f'{root}/ivf', args, ivf_min_rows=0)
+        queries = [flat.vector(id) for id in np.random.default_rng(args.seed + 1).integers(1, args.rows + 1, args.queries)]
+
+        exact, flat_latency = timed_searches(queries, lambda query: flat.search(query, k=args.k))
+        approximate, ivf_latency = timed_searches(queries, lambda query: ivf.search(query, k=args.k, nprobe=args.nprobe))
+        _, owner_latency = timed_searches(queries, lambda query: ivf.search(query, k=args.k, owner=1))
+        recall = np.mean([len(a & e) / args.k for a, e in zip(approximate, exact)])
+
+        report = {
+            'rows': args.rows,
+            'dim': args.dim,
+            'index_bytes': args.rows * args.dim * 2,
+            'brute_force': flat_latency,
+            'ivf': {**ivf_latency, 'lists': len(ivf.centroids), 'nprobe': args.nprobe, 'recall': float(recall), 'build_seconds': ivf_build},
+            'owner_search': owner_latency,
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
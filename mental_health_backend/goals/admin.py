@@ -1,4 +1,14 @@
 from django.contrib import admin
+from mental_health_backend.admin import LargeTableAdmin
 from .models import Goals
 
-admin.site.register(Goals)
+
+@admin.register(Goals)
+class GoalsAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'goal_name', 'status', 'due_date')
+    list_select_related = ('user',)
+    list_defer = ('description',)
+    search_fields = ('user__username', 'goal_name')
+    list_filter = ('status',)
+    date_hierarchy = 'due_date'
+    raw_id_fields = ('user',)
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0003_concretenessmodule_alter_goals_description_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="goals",
+            index=models.Index(fields=["user", "status", "due_date"], name="goals_user_status_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="userprogress",
+            index=models.Index(fields=["user", "date"], name="goals_progress_user_date_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:14
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from goals.reminders import next_occurrence
+
+
+def schedule_existing_reminders(apps, schema_editor):
+    ActivityReminder = apps.get_model("goals", "ActivityReminder")
+    now = timezone.now()
+    reminders = list(ActivityReminder.objects.select_related("user").only("id", "reminder_time", "user__timezone"))
+    for reminder in reminders:
+        reminder.next_fire_at = next_occurrence(reminder.reminder_time, reminder.user.timezone, now)
+    ActivityReminder.objects.bulk_update(reminders, ["next_fire_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0004_user_scoped_indexes"),
+        ("users", "0003_user_timezone"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activityreminder",
+            name="next_fire_at",
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(schedule_existing_reminders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    """
+    Folds rows sharing (user, date) into the oldest one before the unique constraint is added.
+    """
+    UserProgress = apps.get_model("goals", "UserProgress")
+    duplicates = (
+        UserProgress.objects.values("user_id", "date")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        rows = list(UserProgress.objects.filter(user_id=group["user_id"], date=group["date"]).order_by("id"))
+        kept, extra = rows[0], rows[1:]
+        kept.completed_sessions = sum(row.completed_sessions for row in rows)
+        kept.notes = "\n".join(row.notes for row in rows if row.notes) or None
+        kept.save(update_fields=["completed_sessions", "notes"])
+        UserProgress.objects.filter(id__in=[row.id for row in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0005_activityreminder_next_fire_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="userprogress",
+            name="goals_progress_user_date_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="userprogress",
+            constraint=models.UniqueConstraint(fields=("user", "date"), name="goals_progress_user_date_uniq"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goals", "0006_userprogress_unique_user_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="goals",
+            name="due_date",
+            field=models.DateField(db_index=True),
+        ),
+    ]
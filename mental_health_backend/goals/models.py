@@ -1,13 +1,22 @@
-from django.db import models
+from zoneinfo import ZoneInfo
+
+from django.db import connections, models
 from django.conf import settings
+from django.utils import timezone
+from .reminders import next_occurrence
 
 class Goals(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     goal_name = models.CharField(max_length=255)
     description = models.TextField()
-    due_date = models.DateField()
+    due_date = models.DateField(db_index=True)  # Admin date hierarchy
     status = models.CharField(max_length=50, choices=[('in-progress', 'In Progress'), ('completed', 'Completed')])
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status', 'due_date'], name='goals_user_status_due_idx'),
+        ]
+
 class ConcretenessModule(models.Model):
     title = models.CharField(max_length=255)
     steps = models.TextField()
@@ -17,10 +26,77 @@ class ActivityReminder(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
     description = models.TextField()
-    reminder_time = models.TimeField()
+    reminder_time = models.TimeField()  # Wall-clock time in the user's time zone
+    next_fire_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)  # UTC, maintained on save
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored time, so a save can tell whether it changed
+        instance.saved_reminder_time = instance.__dict__.get('reminder_time')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Only a new or changed time is rescheduled: recomputing from now would skip an
+        # occurrence that is due but not yet dispatched. Time zone changes are handled in
+        # goals.signals.
+        update_fields = kwargs.get('update_fields')
+        changed = self.next_fire_at is None or self.reminder_time != getattr(self, 'saved_reminder_time', None)
+        if changed and (update_fields is None or 'reminder_time' in update_fields):
+            self.next_fire_at = next_occurrence(self.reminder_time, self.user.timezone, timezone.now())
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'next_fire_at'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'reminder_time' in update_fields:
+            self.saved_reminder_time = self.reminder_time
+
+class UserProgressQuerySet(models.QuerySet):
+
+    def increment(self, user, date, sessions=1, notes=None):
+        """
+        Atomically adds ``sessions`` to ``user``'s row for ``date``, creating it if needed.
+
+        A single ``INSERT ... ON CONFLICT DO UPDATE`` (same syntax on PostgreSQL and SQLite), so
+        concurrent writers never create duplicates or lose updates. ``notes``, when given,
+        replaces the stored notes. Returns the resulting row.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        sql = (
+            f'INSERT INTO {table} ({quote("user_id")}, {quote("date")}, {quote("completed_sessions")}, {quote("notes")}) '
+            f'VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT ({quote("user_id")}, {quote("date")}) DO UPDATE SET '
+            f'{quote("completed_sessions")} = {table}.{quote("completed_sessions")} + EXCLUDED.{quote("completed_sessions")}, '
+            f'{quote("notes")} = COALESCE(EXCLUDED.{quote("notes")}, {table}.{quote("notes")}) '
+            f'RETURNING {quote("id")}, {quote("completed_sessions")}, {quote("notes")}'
+        )
+        params = [user.pk, connection.ops.adapt_datefield_value(date), sessions, notes]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            pk, completed_sessions, notes = cursor.fetchone()
+        progress = self.model(id=pk, user=user, date=date, completed_sessions=completed_sessions, notes=notes)
+        progress._state.adding = False
+        progress._state.db = self.db
+        return progress
+
+    def record_completion(self, user, completed_at, sessions=1):
+        """
+        Counts a session completed at ``completed_at`` on that day in the user's time zone.
+        """
+        return self.increment(user, timezone.localdate(completed_at, ZoneInfo(user.timezone)), sessions)
+
 
 class UserProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     date = models.DateField()
     completed_sessions = models.IntegerField()
     notes = models.TextField(blank=True, null=True)
+
+    objects = UserProgressQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Also serves (user, date) range reads
+            models.UniqueConstraint(fields=['user', 'date'], name='goals_progress_user_date_uniq'),
+        ]
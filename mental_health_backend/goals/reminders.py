@@ -0,0 +1,47 @@
+# goals/reminders.py
+"""
+Scheduling helpers for ActivityReminder.
+
+``reminder_time`` is a wall-clock time in the owner's time zone. Each reminder also stores
+``next_fire_at``, the next UTC instant it is due, so the per-minute dispatcher is a single
+index range scan over the due rows instead of a pass over every reminder.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+
+def minute_bucket(now):
+    """
+    Returns the ``[start, end)`` minute containing ``now``.
+    """
+    start = now.replace(second=0, microsecond=0)
+    return start, start + timedelta(minutes=1)
+
+
+def next_occurrence(reminder_time, tz_name, after):
+    """
+    First UTC instant strictly after ``after`` whose local time in ``tz_name`` is ``reminder_time``.
+
+    Reminders fire at minute precision. A time skipped by a DST jump fires at the equivalent
+    instant after the jump; a repeated time fires once, on its first occurrence.
+    """
+    tz = ZoneInfo(tz_name)
+    wall_time = reminder_time.replace(second=0, microsecond=0, tzinfo=None)
+    day = after.astimezone(tz).date()
+    while True:
+        candidate = datetime.combine(day, wall_time, tzinfo=tz).astimezone(dt_timezone.utc)
+        if candidate > after:
+            return candidate
+        day += timedelta(days=1)
+
+
+def reschedule_user_reminders(user, now):
+    """
+    Recomputes ``next_fire_at`` for all of ``user``'s reminders, e.g. after a time zone change.
+    """
+    from .models import ActivityReminder
+
+    reminders = list(ActivityReminder.objects.filter(user=user).only('id', 'reminder_time'))
+    for reminder in reminders:
+        reminder.next_fire_at = next_occurrence(reminder.reminder_time, user.timezone, now)
+    ActivityReminder.objects.bulk_update(reminders, ['next_fire_at'])
@@ -0,0 +1,38 @@
+# goals/schema.py
+import graphene
+from graphene_django import DjangoObjectType
+
+from mental_health_backend.loaders import mark_siblings
+from .models import Goals, ConcretenessModule, ActivityReminder, UserProgress
+
+
+class GoalType(DjangoObjectType):
+    class Meta:
+        model = Goals
+        fields = ('id', 'goal_name', 'description', 'due_date', 'status')
+        convert_choices_to_enum = False
+
+
+class ConcretenessModuleType(DjangoObjectType):
+    class Meta:
+        model = ConcretenessModule
+        fields = ('id', 'title', 'steps', 'created_at')
+
+
+class ActivityReminderType(DjangoObjectType):
+    class Meta:
+        model = ActivityReminder
+        fields = ('id', 'title', 'description', 'reminder_time')
+
+
+class UserProgressType(DjangoObjectType):
+    class Meta:
+        model = UserProgress
+        fields = ('id', 'date', 'completed_sessions', 'notes')
+
+
+class Query(graphene.ObjectType):
+    concreteness_modules = graphene.List(graphene.NonNull(ConcretenessModuleType), required=True)
+
+    def resolve_concreteness_modules(root, info):
+        return mark_siblings(ConcretenessModule.objects.order_by('-created_at'))
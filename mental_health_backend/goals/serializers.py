@@ -6,6 +6,7 @@ class GoalsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goals
         fields = '__all__'
+        read_only_fields = ['user']
 
 class ConcretenessModuleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,8 +17,18 @@ class ActivityReminderSerializer(serializers.ModelSerializer):
     class Meta:
         model = ActivityReminder
         fields = '__all__'
+        read_only_fields = ['user']
 
 class UserProgressSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProgress
         fields = '__all__'
+        read_only_fields = ['user']
+
+    def validate(self, attrs):
+        # Creation upserts; only moving an existing row onto another day can collide
+        if self.instance is not None and 'date' in attrs:
+            clash = UserProgress.objects.filter(user=self.instance.user_id, date=attrs['date']).exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise serializers.ValidationError({'date': ['Progress for this date already exists.']})
+        return attrs
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .reminders import reschedule_user_reminders
+
+
+@receiver(post_save, sender=get_user_model())
+def reschedule_reminders_on_timezone_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keeps ``next_fire_at`` in step with the user's time zone.
+
+    Only a save that changes the time zone reschedules: rescheduling from ``now`` would push a
+    reminder that is due but not yet dispatched to its next occurrence.
+    """
+    if update_fields is not None and 'timezone' not in update_fields:
+        return
+    previous = getattr(instance, 'saved_timezone', None)
+    instance.saved_timezone = instance.timezone
+    if created or previous == instance.timezone:
+        return
+    reschedule_user_reminders(instance, timezone.now())
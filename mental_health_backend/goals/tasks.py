@@ -0,0 +1,73 @@
+# goals/tasks.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+from mental_health_backend.delivery import delivery_key, sending
+from .models import ActivityReminder
+from .reminders import minute_bucket, next_occurrence
+
+
+@shared_task
+def dispatch_activity_reminders(now=None):
+    """
+    Runs every minute from beat: fans out the reminders due in the current minute bucket.
+
+    Due rows are claimed in batches of ``ACTIVITY_REMINDER_BATCH_SIZE`` straight off the
+    ``next_fire_at`` index, moved to their next occurrence and handed to
+    ``send_activity_reminders``, so a tick costs O(due reminders). Reminders missed by more than
+    ``ACTIVITY_REMINDER_GRACE`` seconds (e.g. beat was down) are rescheduled without sending.
+    """
+    now = now or timezone.now()
+    bucket_start, bucket_end = minute_bucket(now)
+    stale_before = bucket_start - timedelta(seconds=settings.ACTIVITY_REMINDER_GRACE)
+    due = (
+        ActivityReminder.objects
+        .filter(next_fire_at__lt=bucket_end)
+        .order_by('next_fire_at')
+        .values_list('id', 'reminder_time', 'next_fire_at', 'user__timezone')
+    )
+    dispatched = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked lets an overlapping tick work on other rows instead of double-sending
+            batch = list(due.select_for_update(skip_locked=True, of=('self',))[:settings.ACTIVITY_REMINDER_BATCH_SIZE])
+            if not batch:
+                break
+            to_send = [pk for pk, _, fire_at, _ in batch if fire_at >= stale_before]
+            # Reminders sharing a time zone and wall-clock time move together: one UPDATE per group
+            rescheduled = defaultdict(list)
+            for pk, reminder_time, _, tz_name in batch:
+                rescheduled[(reminder_time, tz_name)].append(pk)
+            for (reminder_time, tz_name), ids in rescheduled.items():
+                next_fire_at = next_occurrence(reminder_time, tz_name, bucket_start)
+                ActivityReminder.objects.filter(id__in=ids).update(next_fire_at=next_fire_at)
+            if to_send:
+                transaction.on_commit(lambda ids=to_send: send_activity_reminders.delay(ids, bucket_start.isoformat()))
+        dispatched += len(to_send)
+    return dispatched
+
+
+@shared_task
+def send_activity_reminders(reminder_ids, occurrence):
+    """
+    Emails one batch of activity reminders over a single mail connection.
+
+    ``occurrence`` is the minute bucket the batch was dispatched for; reminders already sent for
+    it (the task was redelivered, see mental_health_backend.delivery) are skipped.
+    """
+    reminders = {
+        delivery_key('activity_reminder', reminder.pk, occurrence): reminder
+        for reminder in ActivityReminder.objects.filter(id__in=reminder_ids, user__is_active=True).select_related('user')
+    }
+    with sending(list(reminders)) as claimed:
+        messages = [
+            (f'Reminder: {reminder.title}', reminder.description, settings.DEFAULT_FROM_EMAIL, [reminder.user.email])
+            for reminder in map(reminders.get, claimed)
+        ]
+        send_mass_mail(messages, fail_silently=False)
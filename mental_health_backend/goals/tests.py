@@ -1,9 +1,23 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from unittest import mock
+
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.db import IntegrityError
 from django.urls import reverse
-from datetime import date, time
+from django.utils import timezone
+from journaling.models import ProblemSolvingSession
+from moodtracker.models import SwipeSession
 from .models import Goals, ConcretenessModule, ActivityReminder, UserProgress
+from .reminders import next_occurrence
+from .tasks import dispatch_activity_reminders, send_activity_reminders
 
 User = get_user_model()
 
@@ -247,3 +261,286 @@ class GoalsAppTestCase(APITestCase):
         response = self.client.delete(detail_url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(UserProgress.objects.filter(id=progress.id).exists())
+
+    # ---------------------
+    # Scoping and Filtering Tests
+    # ---------------------
+    def create_goal(self, user, name, due_date, status="in-progress"):
+        return Goals.objects.create(user=user, goal_name=name, description="", due_date=due_date, status=status)
+
+    def test_goals_are_scoped_to_user(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        goal = self.create_goal(other, "Not mine", "2025-01-01")
+        self.create_goal(self.user, "Mine", "2025-01-01")
+
+        response = self.client.get(reverse('goals-list'))
+        self.assertEqual([g["goal_name"] for g in response.data["results"]], ["Mine"])
+        response = self.client.get(reverse('goals-detail', kwargs={'pk': goal.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_goals_create_assigns_request_user(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        data = {"user": other.id, "goal_name": "Read", "description": "Daily", "due_date": "2025-01-01", "status": "in-progress"}
+        response = self.client.post(reverse('goals-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Goals.objects.get(id=response.data["id"]).user, self.user)
+
+    def test_goals_filter_and_ordering(self):
+        self.create_goal(self.user, "Early", "2025-01-01")
+        self.create_goal(self.user, "Middle", "2025-02-01")
+        self.create_goal(self.user, "Done", "2025-02-15", status="completed")
+        self.create_goal(self.user, "Late", "2025-03-01")
+        url = reverse('goals-list')
+
+        response = self.client.get(url, {"status": "in-progress", "due_after": "2025-01-15", "ordering": "-due_date"})
+        self.assertEqual([g["goal_name"] for g in response.data["results"]], ["Late", "Middle"])
+
+        response = self.client.get(url, {"due_before": "2025-02-15"})
+        self.assertEqual([g["goal_name"] for g in response.data["results"]], ["Early", "Middle", "Done"])
+
+        response = self.client.get(url, {"due_after": "not-a-date"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_user_progress_date_range(self):
+        for day in (1, 10, 20):
+            UserProgress.objects.create(user=self.user, date=date(2025, 1, day), completed_sessions=day)
+        response = self.client.get(reverse('user-progress'), {"date_after": "2025-01-05", "date_before": "2025-01-31"})
+        self.assertEqual([p["completed_sessions"] for p in response.data["results"]], [20, 10])
+
+
+class UserProgressAccumulationTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123", timezone="Asia/Tokyo")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_increment_upserts_one_row_per_day(self):
+        first = UserProgress.objects.increment(self.user, date(2025, 1, 1), 2, notes="Morning")
+        second = UserProgress.objects.increment(self.user, date(2025, 1, 1), 3)
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(second.completed_sessions, 5)
+        self.assertEqual(second.notes, "Morning")
+        self.assertEqual(UserProgress.objects.get().completed_sessions, 5)
+        with self.assertRaises(IntegrityError):
+            UserProgress.objects.create(user=self.user, date=date(2025, 1, 1), completed_sessions=1)
+
+    def test_post_accumulates_into_the_days_row(self):
+        url = reverse('user-progress')
+        self.client.post(url, {"date": "2025-02-02", "completed_sessions": 1}, format='json')
+        response = self.client.post(url, {"date": "2025-02-02", "completed_sessions": 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["completed_sessions"], 3)
+        self.assertEqual(UserProgress.objects.count(), 1)
+
+    def test_completed_problem_solving_session_feeds_progress(self):
+        session = ProblemSolvingSession.objects.create(user=self.user, title="Plan", scheduled_time=timezone.now() + timedelta(days=1))
+        url = reverse('problem-solving-session-detail', kwargs={'pk': session.id})
+        self.client.patch(url, {"completed": True}, format='json')
+        self.client.patch(url, {"completed": True}, format='json')  # Already completed: not counted twice
+        progress = UserProgress.objects.get()
+        self.assertEqual(progress.completed_sessions, 1)
+
+        self.client.patch(url, {"completed": False}, format='json')
+        progress.refresh_from_db()
+        self.assertEqual(progress.completed_sessions, 0)
+
+    def test_completed_swipe_session_feeds_progress_in_user_time_zone(self):
+        session = SwipeSession.objects.create(user=self.user)
+        with mock.patch('django.utils.timezone.now', return_value=utc(2025, 1, 1, 20)):
+            response = self.client.post(reverse('swipe-session-complete', kwargs={'session_id': session.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 20:00 UTC is already the next day in Tokyo
+        self.assertEqual(UserProgress.objects.get().date, date(2025, 1, 2))
+        response = self.client.post(reverse('swipe-session-complete', kwargs={'session_id': session.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(UserProgress.objects.get().completed_sessions, 1)
+
+    def test_progress_range_read_is_one_query(self):
+        for day in range(1, 8):
+            UserProgress.objects.increment(self.user, date(2025, 1, day))
+        with self.assertNumQueries(2):  # Page count plus the indexed range read
+            response = self.client.get(reverse('user-progress'), {"date_after": "2025-01-03", "date_before": "2025-01-05"})
+        self.assertEqual([p["date"] for p in response.data["results"]], ["2025-01-05", "2025-01-04", "2025-01-03"])
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ActivityReminderDispatchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.london = User.objects.create_user(username="london", email="london@example.com", password="password123", timezone="Europe/London")
+        cls.kolkata = User.objects.create_user(username="kolkata", email="kolkata@example.com", password="password123", timezone="Asia/Kolkata")
+
+    def setUp(self):
+        cache.clear()
+
+    def tick(self, now):
+        with mock.patch.object(send_activity_reminders, 'delay', side_effect=send_activity_reminders) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatched = dispatch_activity_reminders(now)
+        return dispatched, delay
+
+    def create_reminder(self, user, reminder_time, now):
+        with mock.patch('goals.models.timezone.now', return_value=now):
+            return ActivityReminder.objects.create(user=user, title="Stretch", description="Stand up", reminder_time=reminder_time)
+
+    def test_next_occurrence_across_dst(self):
+        # 01:30 does not exist in London on 2025-03-30; it fires at the equivalent instant after the jump
+        self.assertEqual(next_occurrence(time(1, 30), "Europe/London", utc(2025, 3, 29, 12)), utc(2025, 3, 30, 1, 30))
+        # 01:30 happens twice on 2025-10-26; only the first one fires
+        first = next_occurrence(time(1, 30), "Europe/London", utc(2025, 10, 25, 12))
+        self.assertEqual(first, utc(2025, 10, 26, 0, 30))
+        self.assertEqual(next_occurrence(time(1, 30), "Europe/London", first), utc(2025, 10, 27, 1, 30))
+
+    def test_only_reminders_due_in_users_time_zone_fire(self):
+        now = utc(2025, 1, 15, 0)
+        self.create_reminder(self.london, time(9, 0), now)
+        kolkata = self.create_reminder(self.kolkata, time(9, 0), now)
+
+        dispatched, _ = self.tick(utc(2025, 1, 15, 3, 30, 12))  # 09:00 in Kolkata, 03:30 in London
+        self.assertEqual(dispatched, 1)
+        self.assertEqual([m.to for m in mail.outbox], [["kolkata@example.com"]])
+        kolkata.refresh_from_db()
+        self.assertEqual(kolkata.next_fire_at, utc(2025, 1, 16, 3, 30))
+
+        dispatched, _ = self.tick(utc(2025, 1, 15, 9, 0))
+        self.assertEqual(dispatched, 1)
+        self.assertEqual(mail.outbox[-1].to, ["london@example.com"])
+
+    @override_settings(ACTIVITY_REMINDER_BATCH_SIZE=2)
+    def test_reminders_are_sent_in_batches(self):
+        now = utc(2025, 1, 15, 0)
+        for _ in range(5):
+            self.create_reminder(self.london, time(8, 0), now)
+        dispatched, delay = self.tick(utc(2025, 1, 15, 8, 0))
+        self.assertEqual(dispatched, 5)
+        self.assertEqual([len(call.args[0]) for call in delay.call_args_list], [2, 2, 1])
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_redelivered_batch_is_not_resent(self):
+        now = utc(2025, 1, 15, 0)
+        reminders = [self.create_reminder(self.london, time(8, 0), now).pk, self.create_reminder(self.kolkata, time(8, 0), now).pk]
+        occurrence = utc(2025, 1, 15, 8, 0).isoformat()
+        with mock.patch('goals.tasks.send_mass_mail', side_effect=ConnectionError("SMTP down")):
+            with self.assertRaises(ConnectionError):
+                send_activity_reminders(reminders, occurrence)
+        send_activity_reminders(reminders, occurrence)
+        send_activity_reminders(reminders, occurrence)
+        self.assertEqual(len(mail.outbox), 2)
+        send_activity_reminders(reminders, utc(2025, 1, 16, 8, 0).isoformat())
+        self.assertEqual(len(mail.outbox), 4)
+
+    @override_settings(ACTIVITY_REMINDER_GRACE=600)
+    def test_long_missed_reminders_are_rescheduled_without_sending(self):
+        now = utc(2025, 1, 15, 0)
+        late = self.create_reminder(self.london, time(8, 55), now)
+        stale = self.create_reminder(self.london, time(8, 0), now)
+        dispatched, _ = self.tick(utc(2025, 1, 15, 9, 0))
+        self.assertEqual(dispatched, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        stale.refresh_from_db()
+        late.refresh_from_db()
+        self.assertEqual(stale.next_fire_at, utc(2025, 1, 16, 8, 0))
+        self.assertEqual(late.next_fire_at, utc(2025, 1, 16, 8, 55))
+
+    def test_time_zone_change_reschedules(self):
+        reminder = self.create_reminder(self.london, time(9, 0), utc(2025, 1, 15, 0))
+        self.london.timezone = "Asia/Kolkata"
+        with mock.patch('goals.signals.timezone.now', return_value=utc(2025, 1, 15, 0)):
+            self.london.save()
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.next_fire_at, utc(2025, 1, 15, 3, 30))
+
+    def test_editing_a_due_reminder_keeps_its_occurrence(self):
+        reminder = self.create_reminder(self.london, time(9, 0), utc(2025, 1, 15, 0))
+        reminder = ActivityReminder.objects.get(pk=reminder.pk)
+        reminder.title = "Walk"
+        # Edited after it fell due, before the dispatcher claimed it
+        with mock.patch('goals.models.timezone.now', return_value=utc(2025, 1, 15, 9, 0, 30)):
+            reminder.save()
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.next_fire_at, utc(2025, 1, 15, 9, 0))
+
+        reminder.reminder_time = time(10, 0)
+        with mock.patch('goals.models.timezone.now', return_value=utc(2025, 1, 15, 9, 0, 30)):
+            reminder.save()
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.next_fire_at, utc(2025, 1, 15, 10, 0))
+
+    def test_other_user_saves_do_not_reschedule(self):
+        reminder = self.create_reminder(self.london, time(9, 0), utc(2025, 1, 15, 0))
+        user = User.objects.get(pk=self.london.pk)
+        user.first_name = "Ada"
+        # Saved after the reminder fell due, before the dispatcher claimed it
+        with mock.patch('goals.signals.reschedule_user_reminders') as reschedule:
+            user.save()
+        reschedule.assert_not_called()
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.next_fire_at, utc(2025, 1, 15, 9, 0))
+
+        user.timezone = "Asia/Kolkata"
+        with mock.patch('goals.signals.timezone.now', return_value=utc(2025, 1, 15, 0)):
+            user.save()
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.next_fire_at, utc(2025, 1, 15, 3, 30))
+
+
+@tag('slow')
+class ActivityReminderSimulationTestCase(TestCase):
+    """
+    Simulates a full day of per-minute ticks over 1M reminders spread across time zones.
+    """
+    REMINDERS = 1_000_000
+    TIME_ZONES = ["UTC", "America/New_York", "Asia/Kolkata", "Australia/Adelaide"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = utc(2025, 1, 15, 0)
+        users = [
+            User.objects.create_user(username=f"sim{i}", email=f"sim{i}@example.com", password="x", timezone=tz)
+            for i, tz in enumerate(cls.TIME_ZONES)
+        ]
+        cls.expected = Counter()
+        ops = connection.ops
+        schedule = {}
+        rows = []
+        for i in range(cls.REMINDERS):
+            user = users[i % len(users)]
+            minute = (i * 7919) % 1440  # spread over the day
+            key = (user, minute)
+            if key not in schedule:
+                reminder_time = time(minute // 60, minute % 60)
+                fire_at = next_occurrence(reminder_time, user.timezone, cls.start - timedelta(microseconds=1))
+                schedule[key] = (fire_at, (user.id, "t", "d", ops.adapt_timefield_value(reminder_time), ops.adapt_datetimefield_value(fire_at)))
+            fire_at, row = schedule[key]
+            cls.expected[fire_at] += 1
+            rows.append(row)
+        # Raw executemany: model instances would dominate the run time at this size
+        table = ActivityReminder._meta.db_table
+        columns = ", ".join(connection.ops.quote_name(c) for c in ("user_id", "title", "description", "reminder_time", "next_fire_at"))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s, %s)", rows)
+
+    @override_settings(ACTIVITY_REMINDER_BATCH_SIZE=1000)
+    def test_day_of_ticks_fires_each_reminder_once(self):
+        sent = 0
+        max_queries = 0
+        with mock.patch.object(send_activity_reminders, 'delay') as delay:
+            for minute in range(1440):
+                now = self.start + timedelta(minutes=minute)
+                with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                    dispatched = dispatch_activity_reminders(now)
+                self.assertEqual(dispatched, self.expected[now])
+                sent += dispatched
+                max_queries = max(max_queries, len(queries))
+        self.assertEqual(sent, self.REMINDERS)
+        self.assertEqual(sum(len(call.args[0]) for call in delay.call_args_list), self.REMINDERS)
+        # ~700 due per minute, one batch: claim, one UPDATE per (time zone, wall time) group,
+        # the empty claim that ends the loop and the savepoints around them. Independent of table size.
+        self.assertLessEqual(max_queries, 13)
+        self.assertFalse(ActivityReminder.objects.filter(next_fire_at__lt=self.start + timedelta(days=1)).exists())
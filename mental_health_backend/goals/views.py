@@ -1,18 +1,78 @@
-from rest_framework import generics
+from datetime import date
+
+from rest_framework import filters, generics, serializers
+from mental_health_backend.idempotency import IdempotentCreateMixin
 from .models import Goals, ConcretenessModule, ActivityReminder, UserProgress
 from .serializers import GoalsSerializer, ConcretenessModuleSerializer, ActivityReminderSerializer, UserProgressSerializer
 
+
+class UserOwnedMixin:
+    """
+    Scopes a view to rows owned by the requesting user and assigns ownership on create.
+    """
+    model = None
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):  # Schema generation has no user
+            return self.model.objects.none()
+        return self.model.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class DateRangeFilterMixin:
+    """
+    Filters ``date_field`` by the ``<prefix>_after`` / ``<prefix>_before`` query parameters (inclusive).
+    """
+    date_field = None
+    date_param_prefix = None
+
+    def parse_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise serializers.ValidationError({name: ['Enter a valid date (YYYY-MM-DD).']})
+
+    def filter_date_range(self, queryset):
+        after = self.parse_date_param(f'{self.date_param_prefix}_after')
+        before = self.parse_date_param(f'{self.date_param_prefix}_before')
+        if after:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': after})
+        if before:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': before})
+        return queryset
+
+
 # Goals Views
-class GoalsListCreateView(generics.ListCreateAPIView):
-    queryset = Goals.objects.all()
+class GoalsListCreateView(IdempotentCreateMixin, UserOwnedMixin, DateRangeFilterMixin, generics.ListCreateAPIView):
+    """
+    Lists the user's goals. Supports ``?status=``, ``?due_after=``/``?due_before=`` and ``?ordering=``.
+    """
+    model = Goals
     serializer_class = GoalsSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['due_date', 'goal_name', 'status', 'id']
+    ordering = ['due_date', 'id']
+    date_field = 'due_date'
+    date_param_prefix = 'due'
 
-class GoalsDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Goals.objects.all()
+    def get_queryset(self):
+        queryset = self.filter_date_range(super().get_queryset())
+        status = self.request.query_params.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+        return queryset
+
+class GoalsDetailView(UserOwnedMixin, generics.RetrieveUpdateDestroyAPIView):
+    model = Goals
     serializer_class = GoalsSerializer
 
 # Concreteness Module Views
-class ConcretenessModuleListCreateView(generics.ListCreateAPIView):
+class ConcretenessModuleListCreateView(IdempotentCreateMixin, generics.ListCreateAPIView):
     queryset = ConcretenessModule.objects.all()
     serializer_class = ConcretenessModuleSerializer
 
@@ -21,19 +81,40 @@ class ConcretenessModuleDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ConcretenessModuleSerializer
 
 # Activity Reminder Views
-class ActivityReminderListCreateView(generics.ListCreateAPIView):
-    queryset = ActivityReminder.objects.all()
+class ActivityReminderListCreateView(IdempotentCreateMixin, UserOwnedMixin, generics.ListCreateAPIView):
+    model = ActivityReminder
     serializer_class = ActivityReminderSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['reminder_time', 'title', 'id']
+    ordering = ['reminder_time', 'id']
 
-class ActivityReminderDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = ActivityReminder.objects.all()
+class ActivityReminderDetailView(UserOwnedMixin, generics.RetrieveUpdateDestroyAPIView):
+    model = ActivityReminder
     serializer_class = ActivityReminderSerializer
 
 # User Progress Views
-class UserProgressListCreateView(generics.ListCreateAPIView):
-    queryset = UserProgress.objects.all()
+class UserProgressListCreateView(IdempotentCreateMixin, UserOwnedMixin, DateRangeFilterMixin, generics.ListCreateAPIView):
+    """
+    Lists the user's progress records. Supports ``?date_after=``/``?date_before=`` and ``?ordering=``.
+    """
+    model = UserProgress
     serializer_class = UserProgressSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['date', 'completed_sessions', 'id']
+    ordering = ['-date', '-id']
+    date_field = 'date'
+    date_param_prefix = 'date'
+
+    def get_queryset(self):
+        return self.filter_date_range(super().get_queryset())
+
+    def perform_create(self, serializer):
+        # Adds to the day's row rather than creating a second one
+        data = serializer.validated_data
+        serializer.instance = UserProgress.objects.increment(
+            self.request.user, data['date'], data['completed_sessions'], data.get('notes')
+        )
 
-class UserProgressDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = UserProgress.objects.all()
+class UserProgressDetailView(UserOwnedMixin, generics.RetrieveUpdateDestroyAPIView):
+    model = UserProgress
     serializer_class = UserProgressSerializer
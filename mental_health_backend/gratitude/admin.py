@@ -1,4 +1,13 @@
 from django.contrib import admin
+from mental_health_backend.admin import LargeTableAdmin
 from .models import Gratitude
 
-admin.site.register(Gratitude)
+
+@admin.register(Gratitude)
+class GratitudeAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'created_at')
+    list_select_related = ('user',)
+    list_defer = ('entry_text',)
+    search_fields = ('user__username',)
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user',)
@@ -5,7 +5,7 @@ from django.conf import settings  # For AUTH_USER_MODEL
 class Gratitude(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     entry_text = models.TextField()  # Entry related to gratitude
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # Admin date hierarchy
 
     class Meta:
         ordering = ['-created_at']  # Default ordering
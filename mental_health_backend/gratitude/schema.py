@@ -0,0 +1,25 @@
+# gratitude/schema.py
+import graphene
+from graphene_django import DjangoObjectType
+
+from mental_health_backend.loaders import mark_siblings
+from .models import Gratitude, CompassionExercise
+
+
+class GratitudeType(DjangoObjectType):
+    class Meta:
+        model = Gratitude
+        fields = ('id', 'entry_text', 'created_at')
+
+
+class CompassionExerciseType(DjangoObjectType):
+    class Meta:
+        model = CompassionExercise
+        fields = ('id', 'title', 'prompt', 'created_at')
+
+
+class Query(graphene.ObjectType):
+    compassion_exercises = graphene.List(graphene.NonNull(CompassionExerciseType), required=True)
+
+    def resolve_compassion_exercises(root, info):
+        return mark_siblings(CompassionExercise.objects.all())
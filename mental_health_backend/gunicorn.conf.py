@@ -0,0 +1,8 @@
+# gunicorn.conf.py
+# Picked up automatically when gunicorn is started from this directory.
+
+
+def child_exit(server, worker):
+    # Clean up the exited worker's Prometheus samples in multiprocess mode
+    from mental_health_backend.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
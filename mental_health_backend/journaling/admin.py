@@ -1,13 +1,17 @@
 # journaling/admin.py
 
 from django.contrib import admin
+from mental_health_backend.admin import LargeTableAdmin
 from .models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
 
 @admin.register(Journaling)
-class JournalingAdmin(admin.ModelAdmin):
+class JournalingAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'created_at')
-    search_fields = ('user__username', 'entry_text')
-    list_filter = ('created_at',)
+    list_select_related = ('user',)
+    list_defer = ('entry_text', 'preview')
+    search_fields = ('user__username',)
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user',)
 
 @admin.register(Meditation)
 class MeditationAdmin(admin.ModelAdmin):
@@ -22,7 +26,10 @@ class CognitiveExerciseAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
 
 @admin.register(ProblemSolvingSession)
-class ProblemSolvingSessionAdmin(admin.ModelAdmin):
+class ProblemSolvingSessionAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'title', 'scheduled_time', 'completed', 'created_at')
-    search_fields = ('user__username', 'title', 'notes_before', 'notes_after')
-    list_filter = ('completed', 'created_at', 'scheduled_time')
+    list_select_related = ('user',)
+    list_defer = ('notes_before', 'notes_after')
+    search_fields = ('user__username', 'title')
+    list_filter = ('completed', 'scheduled_time')
+    raw_id_fields = ('user',)
@@ -0,0 +1,36 @@
+# journaling/management/commands/backfill_journal_stats.py
+from django.core.management.base import BaseCommand
+
+from journaling.models import Journaling
+from journaling.stats import entry_date, entry_stats
+
+STAT_FIELDS = ['word_count', 'char_count', 'reading_time_seconds', 'entry_date']
+
+
+class Command(BaseCommand):
+    help = "Computes the precomputed statistics columns for journal entries that predate them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries processed per batch')
+        parser.add_argument('--all', action='store_true', help='Recompute every entry, not only missing ones')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        entries = Journaling.objects.select_related('user').only('id', 'entry_text', 'created_at', 'user__timezone')
+        if not options['all']:
+            entries = entries.filter(word_count__isnull=True)
+        updated = 0
+        last_id = 0
+        # Keyset pagination on the primary key: each batch is an index range scan
+        while True:
+            batch = list(entries.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            for entry in batch:
+                for field, value in entry_stats(entry.entry_text).items():
+                    setattr(entry, field, value)
+                entry.entry_date = entry_date(entry.user, entry.created_at)
+            Journaling.objects.bulk_update(batch, STAT_FIELDS)
+            updated += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f"Backfilled statistics for {updated} journal entries"))
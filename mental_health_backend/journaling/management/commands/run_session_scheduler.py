@@ -0,0 +1,20 @@
+# journaling/management/commands/run_session_scheduler.py
+from django.core.management.base import BaseCommand
+
+from journaling.scheduler import SessionReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Runs the problem-solving session reminder scheduler (run exactly one instance)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=None, help='Seconds of upcoming sessions kept in memory')
+        parser.add_argument('--lead', type=int, default=None, help='Seconds before due time a reminder is handed to Celery')
+
+    def handle(self, *args, **options):
+        scheduler = SessionReminderScheduler(horizon=options['horizon'], lead=options['lead'])
+        self.stdout.write(f"Scheduling session reminders (horizon {scheduler.horizon}, lead {scheduler.lead})")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
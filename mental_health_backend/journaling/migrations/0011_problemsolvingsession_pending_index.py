@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("journaling", "0010_alter_cognitiveexercise_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="problemsolvingsession",
+            index=models.Index(condition=models.Q(("completed", False)), fields=["scheduled_time"], name="journaling_pss_pending_idx"),
+        ),
+    ]
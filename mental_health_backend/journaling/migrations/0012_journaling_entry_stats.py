@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("journaling", "0011_problemsolvingsession_pending_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journaling",
+            name="char_count",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="journaling",
+            name="entry_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="journaling",
+            name="reading_time_seconds",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="journaling",
+            name="word_count",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="journaling",
+            index=models.Index(fields=["user", "entry_date"], name="journaling_user_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="journaling",
+            index=models.Index(fields=["user", "word_count"], name="journaling_user_words_idx"),
+        ),
+    ]
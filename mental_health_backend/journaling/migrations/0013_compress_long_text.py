@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:40
+
+import mental_health_backend.fields
+from django.db import migrations, models
+
+from mental_health_backend.fields import copy_field_values
+
+SESSION_NOTES = [("notes_before", "notes_before_compressed"), ("notes_after", "notes_after_compressed")]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("journaling", "0012_journaling_entry_stats"),
+    ]
+
+    operations = [
+        # Nullable while both columns exist, so reversing can re-add it empty and copy the text back.
+        migrations.AlterField(model_name="journaling", name="entry_text", field=models.TextField(null=True)),
+        migrations.AddField(
+            model_name="journaling",
+            name="entry_text_compressed",
+            field=mental_health_backend.fields.CompressedTextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="problemsolvingsession",
+            name="notes_before_compressed",
+            field=mental_health_backend.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="problemsolvingsession",
+            name="notes_after_compressed",
+            field=mental_health_backend.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            copy_field_values("journaling", "Journaling", [("entry_text", "entry_text_compressed")]),
+            copy_field_values("journaling", "Journaling", [("entry_text_compressed", "entry_text")]),
+        ),
+        migrations.RunPython(
+            copy_field_values("journaling", "ProblemSolvingSession", SESSION_NOTES),
+            copy_field_values("journaling", "ProblemSolvingSession", [(new, old) for old, new in SESSION_NOTES]),
+        ),
+        migrations.RemoveField(model_name="journaling", name="entry_text"),
+        migrations.RenameField(model_name="journaling", old_name="entry_text_compressed", new_name="entry_text"),
+        migrations.AlterField(
+            model_name="journaling",
+            name="entry_text",
+            field=mental_health_backend.fields.CompressedTextField(),
+        ),
+        migrations.RemoveField(model_name="problemsolvingsession", name="notes_before"),
+        migrations.RemoveField(model_name="problemsolvingsession", name="notes_after"),
+        migrations.RenameField(model_name="problemsolvingsession", old_name="notes_before_compressed", new_name="notes_before"),
+        migrations.RenameField(model_name="problemsolvingsession", old_name="notes_after_compressed", new_name="notes_after"),
+    ]
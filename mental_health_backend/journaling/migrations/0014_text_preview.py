@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:52
+
+import mental_health_backend.fields
+from django.db import migrations
+
+from mental_health_backend.fields import fill_previews
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("journaling", "0013_compress_long_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journaling",
+            name="preview",
+            field=mental_health_backend.fields.TextPreviewField(blank=True, default="", editable=False, max_length=200, source="entry_text"),
+        ),
+        migrations.RunPython(fill_previews("journaling", "Journaling", "preview"), migrations.RunPython.noop),
+    ]
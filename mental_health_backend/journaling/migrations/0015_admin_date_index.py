@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("journaling", "0014_text_preview"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="journaling",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -2,15 +2,26 @@
 from django.db import models
 from django.conf import settings  # For AUTH_USER_MODEL
 from django.utils import timezone  # For setting timestamps
+from mental_health_backend.fields import CompressedTextField, TextPreviewField
 
 
 class Journaling(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='journals')
-    entry_text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    entry_text = CompressedTextField()
+    preview = TextPreviewField(source='entry_text')  # Served by list views instead of the full text
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # Admin date hierarchy
+    # Precomputed by JournalingSerializer (see journaling.stats); null until backfilled
+    word_count = models.PositiveIntegerField(null=True, blank=True)
+    char_count = models.PositiveIntegerField(null=True, blank=True)
+    reading_time_seconds = models.PositiveIntegerField(null=True, blank=True)
+    entry_date = models.DateField(null=True, blank=True)  # created_at's date in the user's time zone
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'entry_date'], name='journaling_user_date_idx'),
+            models.Index(fields=['user', 'word_count'], name='journaling_user_words_idx'),
+        ]
 
     def __str__(self):
         return f"Journaling Entry {self.id} by {self.user.username}"
@@ -47,14 +58,18 @@ class ProblemSolvingSession(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='problem_solutions')
     title = models.CharField(max_length=255)
     scheduled_time = models.DateTimeField()
-    notes_before = models.TextField(blank=True, null=True)  # Separate before notes
-    notes_after = models.TextField(blank=True, null=True)   # Separate after notes
+    notes_before = CompressedTextField(blank=True, null=True)  # Separate before notes
+    notes_after = CompressedTextField(blank=True, null=True)   # Separate after notes
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(blank=True, null=True)  # Timestamp when completed
     created_at = models.DateTimeField(auto_now_add=True)  # Timestamp when created
 
     class Meta:
         ordering = ['-scheduled_time']
+        indexes = [
+            # Range scans of upcoming sessions by the reminder scheduler
+            models.Index(fields=['scheduled_time'], condition=models.Q(completed=False), name='journaling_pss_pending_idx'),
+        ]
 
     def __str__(self):
         return f"ProblemSolvingSession {self.id}: {self.title} by {self.user.username}"
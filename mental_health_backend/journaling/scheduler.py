@@ -0,0 +1,115 @@
+# journaling/scheduler.py
+"""
+Reminder scheduling for ProblemSolvingSession.
+
+A single long-running ``SessionReminderScheduler`` (see the ``run_session_scheduler`` command)
+keeps the sessions due within ``SESSION_REMINDER_HORIZON`` in a min-heap, loaded with one
+range query over the pending ``scheduled_time`` index per window. Shortly before a session is
+due it is handed to Celery with ``eta`` set to the exact due time, so Celery never holds
+far-future tasks and the database is never polled over every session.
+
+Edits are reconciled without talking to the scheduler process:
+
+* ``send_session_reminder`` re-reads the session when it fires and does nothing if it was
+  deleted, completed or moved (cancellation and stale reschedules).
+* A session moved into the window the scheduler has already loaded is enqueued directly by
+  ``schedule_session_change``; one moved beyond it is picked up by a later refill.
+"""
+import heapq
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Cache key holding the end of the window the scheduler has loaded
+LOADED_UNTIL_CACHE_KEY = 'journaling:session_reminders:loaded_until'
+
+
+def enqueue_reminder(session_id, scheduled_time):
+    from .tasks import send_session_reminder
+
+    scheduled_time = scheduled_time.astimezone(dt_timezone.utc)
+    send_session_reminder.apply_async((session_id, scheduled_time.isoformat()), eta=scheduled_time)
+
+
+def schedule_session_change(session, now=None):
+    """
+    Enqueues ``session`` directly when its time falls inside the window already loaded.
+    """
+    if session.completed:
+        return False
+    now = now or timezone.now()
+    loaded_until = cache.get(LOADED_UNTIL_CACHE_KEY)
+    if loaded_until is None or not now <= session.scheduled_time < loaded_until:
+        return False
+    enqueue_reminder(session.id, session.scheduled_time)
+    return True
+
+
+class SessionReminderScheduler:
+
+    def __init__(self, horizon=None, lead=None):
+        self.horizon = timedelta(seconds=horizon or settings.SESSION_REMINDER_HORIZON)
+        self.lead = timedelta(seconds=lead or settings.SESSION_REMINDER_LEAD)
+        self.heap = []
+        self.loaded_until = None
+
+    def refill(self, now):
+        """
+        Loads pending sessions due in ``[loaded_until, now + horizon)`` into the heap.
+        """
+        from .models import ProblemSolvingSession
+
+        # On a cold start, look back by ``lead`` so sessions handed over just before a restart are
+        # not lost; send_session_reminder deduplicates anything enqueued twice.
+        start = self.loaded_until or now - self.lead
+        end = now + self.horizon
+        if end <= start:
+            return 0
+        due = (
+            ProblemSolvingSession.objects
+            .filter(completed=False, scheduled_time__gte=start, scheduled_time__lt=end)
+            .order_by('scheduled_time')
+            .values_list('scheduled_time', 'id')
+        )
+        loaded = 0
+        for entry in due.iterator():
+            heapq.heappush(self.heap, entry)
+            loaded += 1
+        self.loaded_until = end
+        cache.set(LOADED_UNTIL_CACHE_KEY, end, timeout=None)
+        return loaded
+
+    def dispatch(self, now):
+        """
+        Hands every session due within ``lead`` of ``now`` to Celery. Returns how many.
+        """
+        dispatched = 0
+        while self.heap and self.heap[0][0] - self.lead <= now:
+            scheduled_time, session_id = heapq.heappop(self.heap)
+            enqueue_reminder(session_id, scheduled_time)
+            dispatched += 1
+        return dispatched
+
+    def next_wakeup(self, now):
+        """
+        When to run again: the next hand-over, or when less than half the horizon is loaded.
+        """
+        refill_at = self.loaded_until - self.horizon / 2
+        if self.heap:
+            return min(self.heap[0][0] - self.lead, refill_at)
+        return refill_at
+
+    def tick(self, now):
+        if self.loaded_until is None or now >= self.loaded_until - self.horizon / 2:
+            self.refill(now)
+        return self.dispatch(now)
+
+    def run_forever(self, sleep=time.sleep, clock=timezone.now, max_sleep=60):
+        while True:
+            now = clock()
+            self.tick(now)
+            delay = (self.next_wakeup(now) - clock()).total_seconds()
+            sleep(min(max(delay, 0), max_sleep))
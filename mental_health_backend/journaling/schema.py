@@ -0,0 +1,44 @@
+# journaling/schema.py
+import graphene
+from graphene_django import DjangoObjectType
+
+from mental_health_backend.loaders import mark_siblings
+from .models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
+
+
+class JournalingType(DjangoObjectType):
+    class Meta:
+        model = Journaling
+        fields = ('id', 'entry_text', 'created_at')
+
+
+class MeditationType(DjangoObjectType):
+    class Meta:
+        model = Meditation
+        fields = ('id', 'title', 'description', 'duration', 'audio_url', 'created_at')
+
+
+class CognitiveExerciseType(DjangoObjectType):
+    class Meta:
+        model = CognitiveExercise
+        fields = ('id', 'title', 'prompt', 'example', 'created_at')
+
+
+class ProblemSolvingSessionType(DjangoObjectType):
+    class Meta:
+        model = ProblemSolvingSession
+        fields = (
+            'id', 'title', 'scheduled_time', 'notes_before', 'notes_after',
+            'completed', 'completed_at', 'created_at',
+        )
+
+
+class Query(graphene.ObjectType):
+    meditations = graphene.List(graphene.NonNull(MeditationType), required=True)
+    cognitive_exercises = graphene.List(graphene.NonNull(CognitiveExerciseType), required=True)
+
+    def resolve_meditations(root, info):
+        return mark_siblings(Meditation.objects.all())
+
+    def resolve_cognitive_exercises(root, info):
+        return mark_siblings(CognitiveExercise.objects.all())
@@ -2,14 +2,34 @@
 
 from rest_framework import serializers
 from .models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
+from .stats import entry_date, entry_stats
+from django.db import transaction
 from django.utils import timezone
+from goals.models import UserProgress
 
 
 class JournalingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Journaling
-        fields = ['id', 'entry_text', 'created_at', 'user']
-        read_only_fields = ['user', 'created_at']
+        fields = ['id', 'entry_text', 'created_at', 'user', 'word_count', 'reading_time_seconds']
+        read_only_fields = ['user', 'created_at', 'word_count', 'reading_time_seconds']
+
+    @staticmethod
+    def derived_fields(validated_data, user=None):
+        """
+        Columns computed from a write: text statistics, and the local entry date when creating for ``user``.
+        """
+        fields = {}
+        if 'entry_text' in validated_data:
+            fields.update(entry_stats(validated_data['entry_text']))
+        if user is not None:
+            fields['entry_date'] = entry_date(user, timezone.now())
+        return fields
+
+    def save(self, **kwargs):
+        # Stats are derived here, once per write, so analytics never need the text again
+        kwargs.update(self.derived_fields(self.validated_data, kwargs.get('user') if self.instance is None else None))
+        return super().save(**kwargs)
 
     def validate_entry_text(self, value):
         if not value.strip():
@@ -74,10 +94,28 @@ class ProblemSolvingSessionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Scheduled time must be in the future.")
         return value
 
+    def create(self, validated_data):
+        with transaction.atomic():
+            if validated_data.get('completed'):
+                validated_data['completed_at'] = timezone.now()
+            instance = super().create(validated_data)
+            if instance.completed:
+                UserProgress.objects.record_completion(instance.user, instance.completed_at)
+        return instance
+
     def update(self, instance, validated_data):
-        completed = validated_data.get('completed', instance.completed)
-        if completed and not instance.completed:
-            instance.completed_at = timezone.now()
-        elif not completed and instance.completed:
-            instance.completed_at = None
-        return super().update(instance, validated_data)
+        with transaction.atomic():
+            # Lock the row so concurrent completions are only counted once
+            was_completed, completed_at = (
+                ProblemSolvingSession.objects.select_for_update()
+                .values_list('completed', 'completed_at').get(pk=instance.pk)
+            )
+            completed = validated_data.get('completed', was_completed)
+            if completed and not was_completed:
+                instance.completed_at = timezone.now()
+                UserProgress.objects.record_completion(instance.user, instance.completed_at)
+            elif not completed and was_completed:
+                instance.completed_at = None
+                if completed_at:
+                    UserProgress.objects.record_completion(instance.user, completed_at, sessions=-1)
+            return super().update(instance, validated_data)
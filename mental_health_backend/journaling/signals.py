@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import ProblemSolvingSession
+from .scheduler import schedule_session_change
+
+
+@receiver(post_save, sender=ProblemSolvingSession)
+def reschedule_session_reminder(sender, instance, **kwargs):
+    """
+    Enqueues the reminder right away when a session lands in the window the scheduler already loaded.
+
+    Deletions, completions and moves need no handling here: the queued reminder re-checks the session.
+    """
+    transaction.on_commit(lambda: schedule_session_change(instance))
@@ -0,0 +1,83 @@
+# journaling/stats.py
+"""
+Per-entry journal statistics, computed once when an entry is written so analytics never rescan entry text.
+"""
+import math
+import re
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+WORDS_PER_MINUTE = 200
+
+# (label, lower bound inclusive, upper bound exclusive) on word_count
+LENGTH_BUCKETS = (
+    ('short', 0, 50),
+    ('medium', 50, 200),
+    ('long', 200, 500),
+    ('very_long', 500, None),
+)
+
+WORD_RE = re.compile(r'\S+')
+
+
+def entry_stats(text):
+    words = len(WORD_RE.findall(text))
+    return {
+        'word_count': words,
+        'char_count': len(text),
+        'reading_time_seconds': math.ceil(words * 60 / WORDS_PER_MINUTE),
+    }
+
+
+def entry_date(user, moment):
+    return timezone.localdate(moment, ZoneInfo(user.timezone))
+
+
+def streaks(dates, today):
+    """
+    Returns ``(current, longest)`` runs of consecutive days in ascending, distinct ``dates``.
+
+    The current streak is still alive if its last day is today or yesterday.
+    """
+    current = longest = 0
+    previous = None
+    for day in dates:
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    if previous is None or today - previous > timedelta(days=1):
+        current = 0
+    return current, longest
+
+
+def user_stats(queryset, today):
+    """
+    Aggregates the precomputed columns of ``queryset`` (one user's entries) in SQL.
+    """
+    buckets = {
+        label: Count('id', filter=Q(word_count__gte=low) & (Q(word_count__lt=high) if high else Q()))
+        for label, low, high in LENGTH_BUCKETS
+    }
+    totals = queryset.aggregate(
+        entries=Count('id'),
+        total_words=Sum('word_count'),
+        average_words=Avg('word_count'),
+        longest_entry_words=Max('word_count'),
+        total_reading_time_seconds=Sum('reading_time_seconds'),
+        **buckets,
+    )
+    dates = queryset.filter(entry_date__isnull=False).order_by('entry_date').values_list('entry_date', flat=True).distinct()
+    current, longest = streaks(dates, today)
+    return {
+        'entries': totals['entries'],
+        'total_words': totals['total_words'] or 0,
+        'average_words': round(totals['average_words'] or 0, 1),
+        'longest_entry_words': totals['longest_entry_words'] or 0,
+        'total_reading_time_seconds': totals['total_reading_time_seconds'] or 0,
+        'length_distribution': {label: totals[label] for label, _, _ in LENGTH_BUCKETS},
+        'current_streak': current,
+        'longest_streak': longest,
+    }
@@ -0,0 +1,34 @@
+# journaling/tasks.py
+
+from datetime import datetime
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+from mental_health_backend.delivery import delivery_key, sending
+from .models import ProblemSolvingSession
+
+
+@shared_task
+def send_session_reminder(session_id, scheduled_time):
+    """
+    Emails the reminder for a problem-solving session, enqueued with ``eta=scheduled_time``.
+
+    Does nothing when the session was deleted, completed or rescheduled since it was enqueued,
+    or when this occurrence was already sent.
+    """
+    session = ProblemSolvingSession.objects.filter(id=session_id, completed=False).select_related('user').first()
+    if session is None or session.scheduled_time != datetime.fromisoformat(scheduled_time):
+        return False
+    # Recorded as sent only once send_mail succeeds, so a failed or interrupted send is retried
+    with sending([delivery_key('session_reminder', session_id, scheduled_time)]) as claimed:
+        if not claimed:
+            return False
+        send_mail(
+            f'Time for your problem-solving session: {session.title}',
+            session.notes_before or 'Your scheduled problem-solving session is starting now.',
+            settings.DEFAULT_FROM_EMAIL,
+            [session.user.email],
+            fail_silently=False,
+        )
+    return True
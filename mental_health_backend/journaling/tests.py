@@ -1,7 +1,21 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 from .models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
+from .scheduler import SessionReminderScheduler
+from .tasks import send_session_reminder
 import logging
 
 logger = logging.getLogger(__name__)
@@ -259,3 +273,168 @@ class JournalingAppTestCase(APITestCase):
         delete_response = self.client.delete(f"/journaling/problem_solving_sessions/{session_id}/")
         logger.debug(f"test_problem_solving_session_delete | Status: {delete_response.status_code} | Data: {delete_response.data}")
         self.assertEqual(delete_response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class SessionReminderSchedulerTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="scheduler", email="scheduler@example.com", password="password123")
+
+    def setUp(self):
+        cache.clear()
+        self.now = datetime(2030, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+        patcher = mock.patch('journaling.tasks.send_session_reminder.apply_async')
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def session(self, minutes, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProblemSolvingSession.objects.create(
+                user=self.user, title="Plan", scheduled_time=self.now + timedelta(minutes=minutes), **kwargs
+            )
+
+    def enqueued(self):
+        return [(call.args[0][0], call.kwargs['eta']) for call in self.apply_async.call_args_list]
+
+    def test_refill_loads_only_the_pending_window(self):
+        soon, later = self.session(10), self.session(30)
+        self.session(20, completed=True)
+        self.session(90)  # Beyond the one hour horizon
+        scheduler = SessionReminderScheduler(horizon=3600, lead=300)
+        with self.assertNumQueries(1):
+            self.assertEqual(scheduler.refill(self.now), 2)
+        self.assertEqual([session_id for _, session_id in sorted(scheduler.heap)], [soon.id, later.id])
+
+    def test_sessions_are_handed_over_with_exact_eta(self):
+        first, second = self.session(10), self.session(12)
+        scheduler = SessionReminderScheduler(horizon=3600, lead=300)
+        self.assertEqual(scheduler.tick(self.now), 0)
+        self.assertEqual(scheduler.next_wakeup(self.now), self.now + timedelta(minutes=5))
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=5)), 1)
+        self.assertEqual(scheduler.tick(self.now + timedelta(minutes=7)), 1)
+        self.assertEqual(self.enqueued(), [(first.id, first.scheduled_time), (second.id, second.scheduled_time)])
+
+    def test_changes_inside_loaded_window_are_enqueued_directly(self):
+        scheduler = SessionReminderScheduler(horizon=3600, lead=300)
+        scheduler.tick(self.now)
+        with mock.patch('journaling.scheduler.timezone.now', return_value=self.now):
+            inside = self.session(20)
+            self.session(120)  # Left to a later refill
+        self.assertEqual(self.enqueued(), [(inside.id, inside.scheduled_time)])
+
+    def test_reminder_skips_cancelled_and_rescheduled_sessions(self):
+        session = self.session(10)
+        original = session.scheduled_time.isoformat()
+        self.assertTrue(send_session_reminder(session.id, original))
+        self.assertFalse(send_session_reminder(session.id, original))  # Already sent
+        self.assertEqual(len(mail.outbox), 1)
+
+        session.scheduled_time += timedelta(minutes=30)
+        session.save()
+        self.assertFalse(send_session_reminder(session.id, original))
+        session.delete()
+        self.assertFalse(send_session_reminder(session.id, session.scheduled_time.isoformat()))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_reminder_is_retried_after_a_failed_send(self):
+        session = self.session(10)
+        scheduled_time = session.scheduled_time.isoformat()
+        with mock.patch('journaling.tasks.send_mail', side_effect=ConnectionError("SMTP down")):
+            with self.assertRaises(ConnectionError):
+                send_session_reminder(session.id, scheduled_time)
+        self.assertTrue(send_session_reminder(session.id, scheduled_time))
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class JournalStatsTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="writer", email="writer@example.com", password="password123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_stats_are_computed_on_write(self):
+        response = self.client.post(reverse('journaling-list-create'), {"entry_text": "one two  three\nfour"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        entry = Journaling.objects.get(id=response.data["id"])
+        self.assertEqual((entry.word_count, entry.char_count, entry.reading_time_seconds), (4, 19, 2))
+        self.assertEqual(entry.entry_date, timezone.localdate())
+
+        self.client.patch(reverse('journaling-detail', kwargs={'pk': entry.id}), {"entry_text": "word " * 400}, format='json')
+        entry.refresh_from_db()
+        self.assertEqual((entry.word_count, entry.reading_time_seconds), (400, 120))
+
+    def test_backfill_fills_missing_stats(self):
+        Journaling.objects.bulk_create([Journaling(user=self.user, entry_text="a b c") for _ in range(3)])
+        out = StringIO()
+        call_command('backfill_journal_stats', '--batch-size', '2', stdout=out)
+        self.assertIn("3 journal entries", out.getvalue())
+        self.assertEqual(set(Journaling.objects.values_list('word_count', flat=True)), {3})
+        self.assertFalse(Journaling.objects.filter(entry_date__isnull=True).exists())
+
+    def test_stats_endpoint_aggregates_without_entry_text(self):
+        today = timezone.localdate()
+        for days_ago, words in [(0, 10), (1, 60), (2, 250), (5, 600)]:
+            Journaling.objects.create(
+                user=self.user, entry_text="x", word_count=words, char_count=words * 5,
+                reading_time_seconds=words * 60 // 200, entry_date=today - timedelta(days=days_ago),
+            )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('journaling-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any('entry_text' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.data['entries'], 4)
+        self.assertEqual(response.data['total_words'], 920)
+        self.assertEqual(response.data['length_distribution'], {'short': 1, 'medium': 1, 'long': 1, 'very_long': 1})
+        self.assertEqual((response.data['current_streak'], response.data['longest_streak']), (3, 3))
+
+
+class SparseListTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reader", password="password123")
+        Journaling.objects.bulk_create([Journaling(user=cls.user, entry_text=f"{i} " + "long entry " * 50) for i in range(3)])
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('journaling-list-create')
+
+    def get_entries(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        entry_query = next(q['sql'] for q in queries.captured_queries if 'COUNT' not in q['sql'] and '"journaling_journaling"."id"' in q['sql'])
+        return response.data['results'], entry_query
+
+    def test_fields_limits_payload_and_columns(self):
+        results, sql = self.get_entries({'fields': 'id,created_at'})
+        self.assertEqual([set(entry) for entry in results], [{'id', 'created_at'}] * 3)
+        self.assertNotIn('entry_text', sql)
+        self.assertNotIn('word_count', sql)
+
+    def test_preview_is_cut_in_sql(self):
+        results, sql = self.get_entries({'preview': 20})
+        self.assertIn('SUBSTR', sql.upper())
+        self.assertNotIn('"entry_text"', sql)
+        self.assertEqual({len(entry['entry_text']) for entry in results}, {20})
+        self.assertIn('word_count', results[0])
+
+    def test_preview_follows_updates(self):
+        entry = Journaling.objects.filter(user=self.user).first()
+        self.client.patch(reverse('journaling-detail', kwargs={'pk': entry.id}), {"entry_text": "Rewritten"}, format='json')
+        results, _ = self.get_entries({'fields': 'id,entry_text', 'preview': 50})
+        self.assertIn({'id': entry.id, 'entry_text': 'Rewritten'}, [dict(entry) for entry in results])
+
+    def test_invalid_parameters(self):
+        for query in ({'fields': 'id,secret'}, {'preview': 0}, {'preview': 201}, {'preview': 'all'}):
+            self.assertEqual(self.client.get(self.url, query).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_is_unaffected(self):
+        response = self.client.post(f"{self.url}?fields=id&preview=5", {"entry_text": "Kept in full"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['entry_text'], "Kept in full")
@@ -2,6 +2,8 @@ from django.urls import path
 from .views import (
     JournalingListCreateView,
     JournalingDetailView,
+    JournalStatsView,
+    SimilarJournalEntriesView,
     MeditationListCreateView,
     MeditationDetailView,
     CognitiveExerciseListCreateView,
@@ -13,6 +15,8 @@ from .views import (
 urlpatterns = [
     path('', JournalingListCreateView.as_view(), name='journaling-list-create'),
     path('<int:pk>/', JournalingDetailView.as_view(), name='journaling-detail'),
+    path('<int:pk>/similar/', SimilarJournalEntriesView.as_view(), name='journaling-similar'),
+    path('stats/', JournalStatsView.as_view(), name='journaling-stats'),
 
     path('meditations/', MeditationListCreateView.as_view(), name='meditations'),
     path('meditations/<int:pk>/', MeditationDetailView.as_view(), name='meditation-detail'),
@@ -1,5 +1,12 @@
 # journaling/views.py
-from rest_framework import generics, permissions
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from mental_health_backend.embeddings import result_limit, similar
+from mental_health_backend.fastpath import RowListMixin
+from mental_health_backend.fieldsets import SparseFieldsetMixin
+from mental_health_backend.idempotency import IdempotentCreateMixin
 from .models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
 from .serializers import (
     JournalingSerializer,
@@ -8,11 +15,16 @@ from .serializers import (
     ProblemSolvingSessionSerializer,
 )
 from django.shortcuts import get_object_or_404
+from .stats import entry_date, user_stats
 
 
-class JournalingListCreateView(generics.ListCreateAPIView):
+class JournalingListCreateView(IdempotentCreateMixin, SparseFieldsetMixin, RowListMixin, generics.ListCreateAPIView):
+    """
+    Lists the user's entries. Supports ``?fields=`` and ``?preview=N`` (see mental_health_backend.fieldsets).
+    """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = JournalingSerializer
+    preview_fields = {'entry_text': 'preview'}
 
     def get_queryset(self):
         return Journaling.objects.filter(user=self.request.user)
@@ -26,10 +38,45 @@ class JournalingDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = JournalingSerializer
 
     def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):  # Schema generation has no user
+            return Journaling.objects.none()
         return Journaling.objects.filter(user=self.request.user)
 
 
-class MeditationListCreateView(generics.ListCreateAPIView):
+class JournalStatsView(APIView):
+    """
+    The user's journaling statistics, aggregated from precomputed per-entry columns.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        today = entry_date(request.user, timezone.now())
+        stats = user_stats(Journaling.objects.filter(user=request.user), today)
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class SimilarJournalEntriesView(APIView):
+    """
+    The user's past entries closest in meaning to one of their entries, best first, from the
+    journal embedding index (see mental_health_backend.embeddings). Supports ``?limit=``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, format=None):
+        entry = get_object_or_404(Journaling.objects.only('id'), pk=pk, user=request.user)
+        matches = similar('journals', entry.pk, result_limit(request), owner=request.user.id)
+        if matches is None:
+            return Response({'error': 'This entry has not been indexed yet.'}, status=status.HTTP_404_NOT_FOUND)
+        entries = {
+            row['id']: row for row in Journaling.objects.filter(
+                user=request.user, pk__in=[id for id, _ in matches],
+            ).values('id', 'preview', 'created_at')
+        }
+        results = [{**entries[id], 'score': score} for id, score in matches if id in entries]
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class MeditationListCreateView(IdempotentCreateMixin, RowListMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = MeditationSerializer
     queryset = Meditation.objects.all()
@@ -41,7 +88,7 @@ class MeditationDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Meditation.objects.all()
 
 
-class CognitiveExerciseListCreateView(generics.ListCreateAPIView):
+class CognitiveExerciseListCreateView(IdempotentCreateMixin, RowListMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = CognitiveExerciseSerializer
     queryset = CognitiveExercise.objects.all()
@@ -53,7 +100,7 @@ class CognitiveExerciseDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = CognitiveExercise.objects.all()
 
 
-class ProblemSolvingSessionListCreateView(generics.ListCreateAPIView):
+class ProblemSolvingSessionListCreateView(IdempotentCreateMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ProblemSolvingSessionSerializer
 
@@ -69,4 +116,6 @@ class ProblemSolvingSessionDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProblemSolvingSessionSerializer
 
     def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):  # Schema generation has no user
+            return ProblemSolvingSession.objects.none()
         return ProblemSolvingSession.objects.filter(user=self.request.user)
@@ -0,0 +1,122 @@
+# mental_health_backend/admin.py
+"""
+Admin building blocks for tables that grow with usage.
+
+``LargeTableAdmin`` avoids the queries that make a changelist slow on millions of rows:
+the count of an unfiltered table comes from the planner's estimate in ``pg_class``
+(``EstimatedCountPaginator``), the second "N total" count is skipped, and columns in
+``list_defer`` (long text) are not fetched for the list. Subclasses are expected to set
+``list_select_related`` for the relations they display, and to filter by ``date_hierarchy``
+on an indexed column rather than ``list_filter`` choices built with ``SELECT DISTINCT``.
+The date hierarchy's links come from the first and last date in range (two index lookups)
+instead of the distinct dates present, so periods without rows may be listed.
+"""
+import datetime
+from functools import lru_cache
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """
+    The planner's row estimate for ``model``'s table, or ``None`` if it is not available.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table is first vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts an unfiltered queryset from the table estimate once it exceeds ``exact_count_limit``.
+
+    Filtered querysets, and tables small enough for the estimate to be off by a visible
+    amount, are counted exactly.
+    """
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct and not query.combinator:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.exact_count_limit:
+                return estimate
+        return super().count
+
+
+def date_periods(first, last, kind):
+    """
+    Every year, month or day from ``first`` to ``last`` (dates), as dates.
+    """
+    if kind == 'year':
+        return [datetime.date(year, 1, 1) for year in range(first.year, last.year + 1)]
+    if kind == 'month':
+        return [
+            datetime.date(index // 12, index % 12 + 1, 1)
+            for index in range(first.year * 12 + first.month - 1, last.year * 12 + last.month)
+        ]
+    return [first + datetime.timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+class DatePeriodsMixin:
+    """
+    ``dates()``/``datetimes()`` for the admin date hierarchy without ``SELECT DISTINCT``.
+    """
+
+    def dates(self, field_name, kind, order='ASC'):
+        return self.date_periods(field_name, kind, order)
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        return self.date_periods(field_name, kind, order)
+
+    def date_periods(self, field_name, kind, order):
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        first, last = bounds['first'], bounds['last']
+        if first is None:
+            return []
+        if isinstance(first, datetime.datetime):
+            first, last = (timezone.localtime(value).date() if timezone.is_aware(value) else value.date() for value in (first, last))
+        periods = date_periods(first, last, kind)
+        return periods if order == 'ASC' else periods[::-1]
+
+
+@lru_cache(maxsize=None)
+def with_date_periods(queryset_class):
+    return type(f'DatePeriods{queryset_class.__name__}', (DatePeriodsMixin, queryset_class), {})
+
+
+class LargeTableChangeList(ChangeList):
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_defer:
+            queryset = queryset.defer(*self.model_admin.list_defer)
+        if self.date_hierarchy:
+            queryset = queryset.all()
+            queryset.__class__ = with_date_periods(queryset.__class__)  # Kept by querysets chained from it
+        return queryset
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_defer = ()  # Columns the changelist does not display
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
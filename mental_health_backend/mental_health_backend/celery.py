@@ -1,7 +1,7 @@
 # mental_health_backend/mental_health_backend/celery.py
 
 import os
-from celery import Celery
+from celery import Celery, signals
 
 # Set the default Django settings module for Celery
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mental_health_backend.settings')
@@ -14,3 +14,33 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+# Worker profiles: which queues a worker consumes, with a pool and prefetch suited to them.
+# Selected with CELERY_WORKER_PROFILE (see the Procfile); -Q, -c and --prefetch-multiplier
+# on the command line still take precedence.
+WORKER_PROFILES = {
+    # Each task waits seconds on the model API: few processes, one message reserved at a time
+    'inference': {'queues': ['inference'], 'concurrency': 2, 'prefetch_multiplier': 1},
+    # Short SMTP round trips, due within the minute
+    'email': {'queues': ['email', 'default'], 'concurrency': 8, 'prefetch_multiplier': 4},
+    # Long loops over every user; nothing waits on them
+    'batch': {'queues': ['batch'], 'concurrency': 1, 'prefetch_multiplier': 1},
+}
+
+
+@signals.celeryd_init.connect
+def apply_worker_profile(sender=None, instance=None, conf=None, **kwargs):
+    name = os.environ.get('CELERY_WORKER_PROFILE')
+    if not name:
+        return
+    profile = WORKER_PROFILES[name]
+    # Namespaced like the Django settings they override
+    conf.update(
+        CELERY_WORKER_CONCURRENCY=profile['concurrency'],
+        CELERY_WORKER_PREFETCH_MULTIPLIER=profile['prefetch_multiplier'],
+    )
+    instance.app.amqp.queues.select(profile['queues'])
+
+
+# Register the task metrics signal handlers (queue wait, run time, failures, retries).
+from . import metrics  # noqa: E402,F401
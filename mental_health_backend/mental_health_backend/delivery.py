@@ -0,0 +1,45 @@
+# mental_health_backend/delivery.py
+"""
+Once-only sends for Celery tasks.
+
+Tasks are acknowledged late (``CELERY_TASK_ACKS_LATE``): a task whose worker stopped before it
+finished is delivered again and starts over. Each email a task sends is therefore keyed by its
+recipient and occurrence, e.g. ``delivery:swipe_reminder:<user>:<date>``, and sent inside
+:func:`sending`:
+
+* the key is first claimed with ``cache.add`` for ``CLAIM_TIMEOUT`` seconds, so a duplicate task
+  running at the same time skips it;
+* once the block completes the key is recorded as sent for ``SENT_TIMEOUT`` seconds, so a rerun
+  skips it;
+* if the block raises the claim is released, so the retry sends it.
+
+A claim held by a worker that died mid-send expires well before the broker redelivers the task
+(the Redis transport waits an hour), so the rerun sends what the first run may not have.
+"""
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+CLAIM_TIMEOUT = 300
+SENT_TIMEOUT = 2 * 86400
+CLAIMED = 'claimed'
+SENT = 'sent'
+
+
+def delivery_key(kind, *parts):
+    return ':'.join(['delivery', kind, *map(str, parts)])
+
+
+@contextmanager
+def sending(keys):
+    """
+    Claims ``keys`` and yields those this caller won (the rest were sent or are being sent).
+    They are recorded as sent when the block completes, and released if it raises.
+    """
+    claimed = [key for key in keys if cache.add(key, CLAIMED, CLAIM_TIMEOUT)]
+    try:
+        yield claimed
+    except BaseException:
+        cache.delete_many(claimed)
+        raise
+    cache.set_many(dict.fromkeys(claimed, SENT), SENT_TIMEOUT)
@@ -0,0 +1,158 @@
+# mental_health_backend/embeddings.py
+"""
+Sentence embeddings for prompts and journal entries, and the search indexes built from them.
+
+Texts are embedded on the CPU with the transformers model ``EMBEDDING_MODEL`` (mean pooling
+over the last hidden state, L2-normalised), ``EMBEDDING_BATCH_SIZE`` texts at a time.
+``build_index`` reads a source's rows from the database in primary key order, embeds them and
+writes a new version of its index under ``EMBEDDING_INDEX_DIR/<name>`` (see
+mental_health_backend.vectors). The version becomes current only once it is complete, so
+searches keep using the previous one during a rebuild. A build started while another one
+of the same index is running raises ``IndexBusy``. Each process opens the current version
+on first use, and again after a rebuild replaced it.
+
+Indexes are rebuilt, not updated: rows written after a build (or edited since) are searched
+as of that build, so run ``manage.py build_embedding_index`` on a schedule.
+"""
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .fields import decompress_text
+from .vectors import IndexWriter, VectorIndex, build_lock, current_version, publish_version
+
+# Tokens of each text the model sees; journal entries longer than this are embedded by their start
+MAX_TOKENS = 256
+# Rows read from the database per query
+READ_BATCH_SIZE = 2000
+# Results of a similarity endpoint: default and maximum ``?limit=``
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 50
+
+
+class Embedder:
+    """
+    Turns a list of texts into an ``(n, dim)`` float32 array of unit vectors.
+    """
+
+    def __init__(self, name):
+        # transformers and torch are only needed by the process that builds indexes
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        self.model = AutoModel.from_pretrained(name).eval()
+
+    def __call__(self, texts):
+        torch = self.torch
+        with torch.inference_mode():
+            batch = self.tokenizer(texts, padding=True, truncation=True, max_length=MAX_TOKENS, return_tensors='pt')
+            hidden = self.model(**batch).last_hidden_state
+            mask = batch['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            return torch.nn.functional.normalize(pooled, dim=1).numpy()
+
+
+@lru_cache(maxsize=None)
+def get_embedder(name):
+    return Embedder(name)
+
+
+def keyset_rows(queryset, fields):
+    """
+    Yields ``values_list(*fields)`` rows (``pk`` first) in primary key order, one batch query at a time.
+    """
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list(*fields)[:READ_BATCH_SIZE])
+        if not batch:
+            return
+        yield from batch
+        last_pk = batch[-1][0]
+
+
+def prompt_rows():
+    from moodtracker.models import Prompt
+    for pk, text in keyset_rows(Prompt.objects.all(), ('pk', 'text')):
+        yield pk, 0, text  # Prompts are shared: one owner
+
+
+def journal_rows():
+    from journaling.models import Journaling
+    for pk, user_id, text in keyset_rows(Journaling.objects.all(), ('pk', 'user_id', 'entry_text')):
+        yield pk, user_id, decompress_text(text)
+
+
+# Index name -> rows as (id, owner id, text)
+SOURCES = {
+    'prompts': prompt_rows,
+    'journals': journal_rows,
+}
+
+
+def index_root(name):
+    return Path(settings.EMBEDDING_INDEX_DIR) / name
+
+
+def build_index(name, embed=None):
+    """
+    Embeds every row of source ``name`` into a new version of its index and makes it current.
+    Returns the number of rows indexed.
+    """
+    embed = embed or get_embedder(settings.EMBEDDING_MODEL)
+    root = index_root(name)
+    with build_lock(root):
+        version = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        rows = iter(SOURCES[name]())
+        writer = None
+        while batch := list(islice(rows, settings.EMBEDDING_BATCH_SIZE)):
+            ids, owners, texts = zip(*batch)
+            vectors = embed(list(texts))
+            if writer is None:
+                writer = IndexWriter(root / version, vectors.shape[1], settings.EMBEDDING_SHARD_SIZE)
+            writer.add(ids, owners, vectors)
+        if writer is None:
+            return 0
+        writer.finish(ivf_min_rows=settings.EMBEDDING_IVF_MIN_ROWS)
+        publish_version(root, version)
+    return sum(shard['rows'] for shard in writer.shards)
+
+
+@lru_cache(maxsize=8)
+def open_index(path):
+    return VectorIndex(path)
+
+
+def get_index(name):
+    """
+    The current index for ``name``, or ``None`` if none was built yet.
+    """
+    version = current_version(index_root(name))
+    return open_index(str(index_root(name) / version)) if version else None
+
+
+def similar(name, id, limit, owner=None):
+    """
+    ``[(id, score), ...]`` for the ``limit`` rows of index ``name`` nearest to row ``id``
+    (itself excluded), or ``None`` if that row is not indexed.
+    """
+    index = get_index(name)
+    vector = index.vector(id) if index is not None else None
+    if vector is None:
+        return None
+    return index.search(vector, k=limit, nprobe=settings.EMBEDDING_NPROBE, owner=owner, exclude=[id])
+
+
+def result_limit(request):
+    value = request.query_params.get('limit', DEFAULT_RESULTS)
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if not 1 <= limit <= MAX_RESULTS:
+        raise ValidationError({'limit': [f'Must be an integer from 1 to {MAX_RESULTS}.']})
+    return limit
@@ -0,0 +1,150 @@
+# mental_health_backend/events.py
+"""
+Per-user server-sent events.
+
+Publishers (request handlers, Celery workers) call :func:`publish` with a user ID, an event
+name and JSON-serializable data; every stream that user has open receives it. The event is
+encoded to its SSE frame once, when published, and streams forward the bytes as they are.
+
+With ``EVENTS_REDIS_URL`` set, events travel over Redis pub/sub, so a worker reaches streams
+served by any web process; each open stream holds one subscribed connection. Without it,
+events are delivered within the publishing process only, which is enough for tests and a
+single development server. Events are not stored: a stream receives only what is published
+while it is open.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import orjson
+import redis
+from django.conf import settings
+from redis import asyncio as aioredis
+
+# First frame of every stream: the reconnection delay (milliseconds) for EventSource clients
+STREAM_PREAMBLE = b'retry: 3000\n\n'
+KEEPALIVE = b': keep-alive\n\n'
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f'events:user:{user_id}'
+
+
+def format_event(event, data):
+    return b'event: ' + event.encode() + b'\ndata: ' + orjson.dumps(data) + b'\n\n'
+
+
+class LocalSubscription:
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        """
+        The next message, or ``None`` if none arrived within ``timeout`` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalEventBus:
+    """
+    Delivers to subscribers in this process. ``publish`` may be called from any thread.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)  # Channel -> {(event loop, queue)}
+        self.lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:  # The subscriber's event loop has closed
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.subscribers[channel].add(subscriber)
+        try:
+            yield LocalSubscription(subscriber[1])
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscriber)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+
+class RedisSubscription:
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        """
+        The next message, or ``None`` if none arrived within ``timeout`` seconds.
+        """
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message['data'] if message else None
+
+
+class RedisEventBus:
+    """
+    Delivers through Redis pub/sub to subscribers in every process.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        # Delivery is best effort: a missed event must not fail the work that produced it
+        try:
+            self.client.publish(channel, message)
+        except redis.RedisError:
+            logger.warning('Could not publish an event to %s', channel, exc_info=True)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_event_bus():
+    if settings.EVENTS_REDIS_URL:
+        return RedisEventBus(settings.EVENTS_REDIS_URL)
+    return LocalEventBus()
+
+
+def publish(user_id, event, data):
+    get_event_bus().publish(user_channel(user_id), format_event(event, data))
+
+
+async def event_stream(user_id):
+    """
+    The SSE body for ``user_id``'s events, with a keep-alive comment after
+    ``EVENTS_KEEPALIVE`` idle seconds so proxies do not close the connection.
+    """
+    async with get_event_bus().subscribe(user_channel(user_id)) as subscription:
+        yield STREAM_PREAMBLE  # Subscribed: nothing published from here on is missed
+        while True:
+            message = await subscription.get(settings.EVENTS_KEEPALIVE)
+            yield KEEPALIVE if message is None else message
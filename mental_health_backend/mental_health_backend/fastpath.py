@@ -0,0 +1,135 @@
+# mental_health_backend/fastpath.py
+"""
+Read-only serialization fast path for list pages.
+
+A DRF list page builds a model instance per row, then calls ``get_attribute`` and
+``to_representation`` on every field of every row. ``compile_rows`` turns a serializer's
+fields into ``(column, converter)`` pairs once per request; the page is then fetched with
+``values_list()`` and each row becomes a dict in one pass. Fields whose representation is a
+plain cast use the cast; any other field (dates, decimals, ...) keeps its own
+``to_representation``, so the output is the same as the serializer's. Serializers with fields
+that do not map onto a single column are not compiled and take the regular path.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .fields import CompressedTextField, decompress_text
+
+# Fields whose to_representation is exactly this cast for values read from the database
+CASTS = {
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+    serializers.BooleanField: bool,
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.URLField: str,
+    serializers.SlugField: str,
+}
+
+
+class RowSerializer:
+    """
+    Builds the representation of ``values_list()`` rows from precompiled field converters.
+    """
+
+    def __init__(self, names, columns, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters  # None where the column value is already the representation
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, rows):
+        fields = list(zip(self.names, self.converters))
+        return [
+            {
+                name: value if value is None or convert is None else convert(value)
+                for (name, convert), value in zip(fields, row)
+            }
+            for row in rows
+        ]
+
+
+def field_converter(field, model_field):
+    """
+    The converter for ``field`` reading ``model_field`` (``None`` for an annotation),
+    ``None`` for identity, or ``NotImplemented`` when the field cannot be compiled.
+    """
+    if isinstance(field, serializers.RelatedField):
+        # values_list() yields the primary key, which is what PrimaryKeyRelatedField renders
+        if type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None:
+            return None
+        return NotImplemented
+    if model_field is not None and model_field.is_relation:
+        return NotImplemented
+    if isinstance(field, serializers.Serializer):
+        return NotImplemented
+    convert = CASTS.get(type(field), field.to_representation)
+    if isinstance(model_field, CompressedTextField):
+        return lambda value: convert(decompress_text(value))
+    return convert
+
+
+def compile_rows(serializer, queryset):
+    """
+    Returns a ``RowSerializer`` for the readable fields of ``serializer`` over ``queryset``,
+    or ``None`` if any of them does not read a single column or annotation.
+    """
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+    opts = queryset.model._meta
+    annotations = queryset.query.annotations
+    names, columns, converters = [], [], []
+    for field in serializer._readable_fields:
+        source = field.source
+        if source in annotations:
+            model_field = None
+        else:
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+        convert = field_converter(field, model_field)
+        if convert is NotImplemented:
+            return None
+        names.append(field.field_name)
+        columns.append(source)
+        converters.append(convert)
+    return RowSerializer(names, columns, converters)
+
+
+class RowListMixin:
+    """
+    Serves GET list pages through ``RowSerializer`` when the view's serializer compiles.
+    """
+
+    def get_row_serializer(self, queryset):
+        serializer = self.get_serializer(many=True)
+        return compile_rows(getattr(serializer, 'child', serializer), queryset)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        row_serializer = self.get_row_serializer(queryset)
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = row_serializer.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.to_representation(page))
+        return Response(row_serializer.to_representation(rows))
+
+    async def alist(self, request, *args, **kwargs):  # adrf views
+        queryset = await self.afilter_queryset(self.get_queryset())
+        row_serializer = self.get_row_serializer(queryset)
+        if row_serializer is None:
+            return await super().alist(request, *args, **kwargs)
+        rows = row_serializer.rows(queryset)
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return await self.get_apaginated_response(row_serializer.to_representation(page))
+        return Response(row_serializer.to_representation(await sync_to_async(list)(rows)))
@@ -0,0 +1,190 @@
+# mental_health_backend/fields.py
+"""
+Model fields shared across apps.
+"""
+import zlib
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+# First byte of every stored value
+RAW = b'\x00'
+ZLIB = b'\x01'
+
+
+class StoredText(bytes):
+    """
+    A value as stored by ``CompressedTextField``, not yet decoded.
+
+    Model instances decode it on first attribute access. ``values()``/``values_list()`` return
+    it as is; pass it to ``decompress_text`` to get the string.
+    """
+
+
+def compress_text(value, threshold, level):
+    data = value.encode('utf-8')
+    if len(data) >= threshold:
+        compressed = zlib.compress(data, level)
+        if len(compressed) < len(data):
+            return ZLIB + compressed
+    return RAW + data
+
+
+def decompress_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    body = value[1:]
+    if value[:1] == ZLIB:
+        body = zlib.decompress(body)
+    return body.decode('utf-8')
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """
+    Decodes the stored value the first time the attribute is read, then caches the string.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, StoredText):
+            value = instance.__dict__[self.field.attname] = decompress_text(value)
+        return value
+
+    def __set__(self, instance, value):
+        # Defining __set__ makes this a data descriptor, so reads go through __get__ even once the
+        # value sits in the instance __dict__.
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    A ``TextField`` stored in a binary column, zlib-compressed once it reaches ``compress_threshold`` bytes.
+
+    Serializers, forms and the admin see a plain text field. Values are decompressed lazily, and an
+    instance saved without its text having been read writes the stored bytes back untouched.
+    The column holds bytes, so database-side text functions and lookups (``icontains``,
+    ``Left``, ...) do not apply.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, compress_threshold=256, compress_level=6, **kwargs):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compress_threshold != 256:
+            kwargs['compress_threshold'] = self.compress_threshold
+        if self.compress_level != 6:
+            kwargs['compress_level'] = self.compress_level
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else StoredText(value)
+
+    def to_python(self, value):
+        return decompress_text(value)
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, StoredText):
+            return value
+        return compress_text(str(value), self.compress_threshold, self.compress_level)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        return None if value is None else connection.Database.Binary(value)
+
+
+class TextPreviewField(models.CharField):
+    """
+    The first ``max_length`` characters of the text field ``source``, stored as plain text.
+
+    Lists read (and ``Substr``) this column instead of fetching and decoding the full text.
+    It is refreshed on ``save()`` and ``bulk_create`` whenever the source text was assigned or
+    read, and left alone otherwise. ``save(update_fields=...)`` callers must include it.
+    ``bulk_update`` never calls ``pre_save``, so its callers must refresh it themselves with
+    :func:`refresh_previews` and include the fields that returns.
+    """
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 200)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        text = model_instance.__dict__.get(self.source)  # Not yet decoded when it is StoredText
+        if isinstance(text, str) or (text is None and self.source in model_instance.__dict__):
+            setattr(model_instance, self.attname, (text or '')[:self.max_length])
+        return getattr(model_instance, self.attname)
+
+
+def refresh_previews(instance, changed):
+    """
+    Brings ``instance``'s ``TextPreviewField``s whose source is in ``changed`` up to date, for
+    writes that skip ``pre_save``. Returns the names of the refreshed fields.
+    """
+    refreshed = []
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, TextPreviewField) and field.source in changed:
+            field.pre_save(instance, add=False)
+            refreshed.append(field.name)
+    return refreshed
+
+
+def copy_field_values(app_label, model_name, field_pairs, batch_size=1000):
+    """
+    Returns a ``RunPython`` function copying each ``(source, target)`` field pair row by row.
+
+    Used to move existing text into a ``CompressedTextField`` column (and back, with the pairs
+    swapped), letting the field encode values instead of relying on a database cast.
+    """
+    def copy(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        sources = [source for source, _ in field_pairs]
+        targets = [target for _, target in field_pairs]
+        last_pk = 0
+        while True:
+            batch = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', *sources)[:batch_size])
+            if not batch:
+                break
+            for row in batch:
+                for source, target in field_pairs:
+                    setattr(row, target, getattr(row, source))
+            model.objects.bulk_update(batch, targets)
+            last_pk = batch[-1].pk
+    return copy
+
+
+def fill_previews(app_label, model_name, field_name, batch_size=1000):
+    """
+    Returns a ``RunPython`` function computing the ``TextPreviewField`` ``field_name`` for existing rows.
+    """
+    def fill(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        field = model._meta.get_field(field_name)
+        last_pk = 0
+        while True:
+            batch = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', field.source)[:batch_size])
+            if not batch:
+                break
+            for row in batch:
+                getattr(row, field.source)  # Decode, so pre_save sees the text
+                field.pre_save(row, add=False)
+            model.objects.bulk_update(batch, [field_name])
+            last_pk = batch[-1].pk
+    return fill
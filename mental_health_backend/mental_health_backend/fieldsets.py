@@ -0,0 +1,92 @@
+# mental_health_backend/fieldsets.py
+"""
+Sparse fieldsets and text previews for list endpoints.
+
+``?fields=id,created_at`` limits both the serialized fields and the selected columns.
+``?preview=N`` replaces each text field in the view's ``preview_fields`` with the first ``N``
+characters of the model's ``TextPreviewField``, cut with ``Substr`` in SQL, so the full text
+is neither fetched nor serialized. Both apply to GET requests only.
+"""
+from django.db.models.functions import Substr
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    """
+    Adds ``?fields=`` and ``?preview=`` to a list view.
+    """
+    preview_fields = {}  # Serializer text field -> TextPreviewField name on the model
+
+    def get_sparse_fields(self):
+        """
+        The field names requested with ``?fields=``, or ``None`` for all of them.
+        """
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        requested = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = requested - set(self.get_serializer_class()().fields)
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+        return requested
+
+    def get_preview_length(self):
+        """
+        The ``?preview=`` length, or ``None`` for full text.
+        """
+        raw = self.request.query_params.get('preview')
+        if raw is None or not self.preview_fields:
+            return None
+        model = self.get_serializer_class().Meta.model
+        limit = min(model._meta.get_field(name).max_length for name in self.preview_fields.values())
+        try:
+            length = int(raw)
+        except ValueError:
+            length = 0
+        if not 1 <= length <= limit:
+            raise ValidationError({'preview': [f'Must be an integer between 1 and {limit}.']})
+        return length
+
+    def filter_queryset(self, queryset):
+        return self.restrict_queryset(super().filter_queryset(queryset))
+
+    async def afilter_queryset(self, queryset):  # adrf views
+        return self.restrict_queryset(await super().afilter_queryset(queryset))
+
+    def restrict_queryset(self, queryset):
+        """
+        Selects only the requested columns and annotates the previews.
+        """
+        if self.request.method != 'GET':
+            return queryset
+        requested, length = self.get_sparse_fields(), self.get_preview_length()
+        if requested is None and length is None:
+            return queryset
+
+        fields = self.get_serializer_class()().fields
+        names = requested if requested is not None else set(fields)
+        previewed = {name for name in self.preview_fields if length and name in names}
+        if previewed:
+            queryset = queryset.annotate(**{
+                f'{name}_preview': Substr(self.preview_fields[name], 1, length) for name in previewed
+            })
+        sources = {fields[name].source for name in names - previewed}
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        if sources <= concrete:
+            return queryset.only('pk', *sources)
+        return queryset.defer(*previewed)  # Some fields are computed; at least skip the full text
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.request.method == 'GET':
+            fields = getattr(serializer, 'child', serializer).fields
+            requested = self.get_sparse_fields()
+            if requested is not None:
+                for name in set(fields) - requested:
+                    fields.pop(name)
+            if self.get_preview_length():
+                for name in self.preview_fields:
+                    if name in fields:
+                        fields[name] = serializers.CharField(source=f'{name}_preview', read_only=True)
+        return serializer
@@ -0,0 +1,92 @@
+# mental_health_backend/idempotency.py
+"""
+``Idempotency-Key`` support for create endpoints.
+
+A client sends the same key with every retry of one logical POST. The first successful
+response is cached per user, path and key together with a fingerprint of the request body.
+Repeats are answered from the cache without running the serializer or writing to the
+database. A repeat carrying a different body is rejected, as is a repeat that arrives while
+the first request is still being processed.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# Seconds a key stays claimed by a request that is still running
+IN_PROGRESS_TIMEOUT = 60
+# Response headers kept with the stored response
+STORED_HEADERS = ('Location',)
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still being processed.'
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used with a different request body.'
+    default_code = 'idempotency_key_reused'
+
+
+def idempotency_cache_key(request, key):
+    owner = request.user.pk if request.user.is_authenticated else 'anonymous'
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return f'idempotency:{owner}:{request.path}:{digest}'
+
+
+def request_fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Makes ``create`` honour the ``Idempotency-Key`` header. Requests without it are unaffected.
+    """
+    idempotency_timeout = None  # Defaults to settings.IDEMPOTENCY_KEY_TIMEOUT
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({IDEMPOTENCY_HEADER: [f'Must be at most {MAX_KEY_LENGTH} characters.']})
+
+        cache_key = idempotency_cache_key(request, key)
+        fingerprint = request_fingerprint(request)
+        if not cache.add(cache_key, {'fingerprint': fingerprint, 'status': None}, IN_PROGRESS_TIMEOUT):
+            return self.replay(cache.get(cache_key), fingerprint)
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if status.is_success(response.status_code):
+            cache.set(cache_key, {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'data': response.data,
+                'headers': {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+            }, self.idempotency_timeout or settings.IDEMPOTENCY_KEY_TIMEOUT)
+        else:
+            cache.delete(cache_key)  # Let a corrected retry through
+        return response
+
+    def replay(self, stored, fingerprint):
+        if stored is None:
+            # The first request failed or its entry expired in between
+            raise IdempotencyConflict()
+        if stored['fingerprint'] != fingerprint:
+            raise IdempotencyKeyReused()
+        if stored['status'] is None:
+            raise IdempotencyConflict()
+        return Response(stored['data'], status=stored['status'], headers={**stored['headers'], REPLAYED_HEADER: 'true'})
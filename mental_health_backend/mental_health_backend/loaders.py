@@ -0,0 +1,119 @@
+# mental_health_backend/loaders.py
+"""
+Per-request, DataLoader-style batching for GraphQL resolvers.
+
+graphene-django executes queries synchronously, so instead of deferring keys to the event
+loop, every object handed to GraphQL remembers its *siblings* (the other objects resolved
+in the same list or batch). A child resolver primes its loader with the keys of all
+siblings, so the first ``load()`` fetches the whole level in one query and the rest hit
+the per-request cache.
+"""
+
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+class DataLoader:
+    """
+    Caches ``batch_load_fn(keys) -> {key: value}`` results for the lifetime of one request.
+    """
+
+    def __init__(self, batch_load_fn, default=None):
+        self.batch_load_fn = batch_load_fn
+        self.default = default
+        self._cache = {}
+        self._pending = {}
+
+    def prime(self, keys):
+        """
+        Queues keys to be fetched together with the next batch.
+        """
+        for key in keys:
+            if key not in self._cache:
+                self._pending[key] = None
+
+    def load(self, key):
+        if key not in self._cache:
+            self.prime([key])
+            self.dispatch()
+        return self._cache[key]
+
+    def dispatch(self):
+        keys, self._pending = list(self._pending), {}
+        if not keys:
+            return
+        results = self.batch_load_fn(keys)
+        for key in keys:
+            value = results.get(key)
+            self._cache[key] = value if value is not None else self._copy_default()
+
+    def _copy_default(self):
+        return list(self.default) if isinstance(self.default, list) else self.default
+
+
+def get_loader(info, name, batch_load_fn, default=None):
+    """
+    Returns the loader called ``name`` for the current request, creating it on first use.
+
+    ``name`` must encode anything that changes the query (e.g. filters and limits).
+    """
+    loaders = getattr(info.context, '_graphql_loaders', None)
+    if loaders is None:
+        loaders = info.context._graphql_loaders = {}
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = DataLoader(batch_load_fn, default=default)
+    return loader
+
+
+def mark_siblings(objects):
+    """
+    Records ``objects`` as one batch so their children are loaded together.
+    """
+    objects = list(objects)
+    for obj in objects:
+        obj._graphql_siblings = objects
+    return objects
+
+
+def batch_by_pk(queryset):
+    """
+    Batch function mapping primary keys to single objects.
+    """
+    def load(keys):
+        objects = queryset.in_bulk(keys)
+        mark_siblings(objects.values())
+        return objects
+    return load
+
+
+def batch_by_foreign_key(queryset, field, order_by, limit=None):
+    """
+    Batch function mapping foreign key values to lists of related objects.
+
+    ``field`` is the foreign key column (e.g. ``user_id``). With ``limit``, at most ``limit`` rows per key are returned, ranked in SQL with a
+    ``ROW_NUMBER()`` window so heavy users never pull their whole history.
+    """
+    def load(keys):
+        rows = queryset.filter(**{f'{field}__in': keys})
+        if limit is not None:
+            rows = rows.annotate(
+                _rank=Window(RowNumber(), partition_by=F(field), order_by=order_by)
+            ).filter(_rank__lte=limit)
+        grouped = defaultdict(list)
+        for row in mark_siblings(rows.order_by(field, *order_by)):
+            grouped[getattr(row, field)].append(row)
+        return grouped
+    return load
+
+
+def load_related(info, name, root, key_attr, batch_load_fn, default=None):
+    """
+    Loads the value for ``getattr(root, key_attr)``, batched across ``root``'s siblings.
+    """
+    loader = get_loader(info, name, batch_load_fn, default=default)
+    siblings = getattr(root, '_graphql_siblings', (root,))
+    loader.prime(getattr(sibling, key_attr) for sibling in siblings)
+    return loader.load(getattr(root, key_attr))
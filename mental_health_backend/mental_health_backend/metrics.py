@@ -0,0 +1,169 @@
+# mental_health_backend/metrics.py
+"""
+Prometheus metrics for the web app and the Celery workers.
+
+Metric objects live at module level and are shared by every process. When several worker
+processes run side by side (gunicorn workers, Celery prefork children), set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before starting them: each
+process then writes its samples there and :func:`render_metrics` merges them, so any process
+can serve an accurate ``/metrics`` page. See ``gunicorn.conf.py`` for the dead-worker cleanup.
+
+Task metrics are recorded in the Celery worker processes, not the web app. With
+``WORKER_METRICS_PORT`` set, each worker's main process serves them on that port (see
+:func:`serve_worker_metrics`); the Procfile gives every worker its own port and its own
+multiprocess directory, so the page merges the worker's pool processes.
+"""
+
+import os
+import time
+
+from celery import signals
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time spent serving HTTP requests, by route.',
+    ['method', 'view', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter(
+    'django_db_queries',
+    'Database queries executed while serving HTTP requests.',
+    ['method', 'view'],
+)
+DB_QUERY_TIME = Counter(
+    'django_db_query_duration_seconds',
+    'Time spent in database queries while serving HTTP requests.',
+    ['method', 'view'],
+)
+
+TASK_QUEUE_WAIT = Histogram(
+    'celery_task_queue_wait_seconds',
+    'Time between a task being published and a worker starting it.',
+    ['task'],
+    buckets=TASK_BUCKETS,
+)
+TASK_RUNTIME = Histogram(
+    'celery_task_runtime_seconds',
+    'Time spent executing Celery tasks.',
+    ['task', 'state'],
+    buckets=TASK_BUCKETS,
+)
+TASK_FAILURES = Counter('celery_task_failures', 'Celery tasks that raised an exception.', ['task'])
+TASK_RETRIES = Counter('celery_task_retries', 'Celery task retries.', ['task'])
+
+INSIGHT_API_LATENCY = Histogram(
+    'insight_api_request_duration_seconds',
+    'Latency of calls to the external insight generation API.',
+    ['outcome'],
+    buckets=LATENCY_BUCKETS + (30.0, 60.0),
+)
+
+INSIGHTS_REVIEWED = Counter('insights_reviewed', 'Insights reviewed by admins.', ['decision'])
+INSIGHT_REVIEW_DELAY = Histogram(
+    'insight_review_delay_seconds',
+    'Time from an insight being generated to its review.',
+    buckets=(60.0, 300.0, 900.0, 3600.0, 4 * 3600.0, 12 * 3600.0, 86400.0, 3 * 86400.0, 7 * 86400.0),
+)
+
+PUBLISHED_AT_HEADER = 'published_at'
+
+
+def metrics_registry():
+    """
+    The registry to expose: every process's samples merged in multiprocess mode, else this process's.
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    """
+    Returns ``(body, content_type)`` for the exposition page, merging all processes when
+    multiprocess mode is enabled.
+    """
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """
+    Drops the live-gauge files of an exited worker process (no-op outside multiprocess mode).
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+# ---------------------
+# Celery instrumentation
+# ---------------------
+_task_started = {}
+
+
+@signals.before_task_publish.connect
+def stamp_published_at(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def _published_at(request):
+    # Workers expose custom message headers as request attributes; eager apply() nests them
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (getattr(request, 'headers', None) or {}).get(PUBLISHED_AT_HEADER)
+    return published_at
+
+
+@signals.task_prerun.connect
+def record_task_start(sender=None, task_id=None, task=None, **kwargs):
+    published_at = _published_at(task.request) if task is not None else None
+    if published_at is not None:
+        TASK_QUEUE_WAIT.labels(task=sender.name).observe(max(0.0, time.time() - published_at))
+    _task_started[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def record_task_runtime(sender=None, task_id=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.labels(task=sender.name, state=state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@signals.task_failure.connect
+def record_task_failure(sender=None, **kwargs):
+    TASK_FAILURES.labels(task=sender.name).inc()
+
+
+@signals.task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(task=sender.name).inc()
+
+
+@signals.celeryd_init.connect
+def serve_worker_metrics(sender=None, **kwargs):
+    """
+    Serves the worker's metrics over HTTP on ``WORKER_METRICS_PORT``, from a thread of the main
+    worker process (started before the pool forks, so children do not inherit it).
+    """
+    from django.conf import settings
+    if settings.WORKER_METRICS_PORT:
+        return start_http_server(settings.WORKER_METRICS_PORT, registry=metrics_registry())
+
+
+@signals.worker_process_shutdown.connect
+def cleanup_worker_process(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
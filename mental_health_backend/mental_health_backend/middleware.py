@@ -0,0 +1,142 @@
+# mental_health_backend/middleware.py
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import DB_QUERIES, DB_QUERY_TIME, REQUEST_LATENCY
+from .profiling import RequestProfile, collector, current_profile, install_hooks
+
+
+class RequestProfilingMiddleware:
+    """
+    Records query count, DB time, serializer time and view time for sampled requests.
+
+    Timings are returned in a ``Server-Timing`` header and aggregated per route in memory
+    (see ``mental_health_backend.views.RequestProfileView``). When
+    ``REQUEST_PROFILING_ENABLED`` is off the middleware removes itself from the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        install_hooks()
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.server_timing = settings.REQUEST_PROFILING_SERVER_TIMING
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_sample():
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.should_sample():
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    def should_sample(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+        return None
+
+    def finish(self, request, response, profile):
+        finished = time.perf_counter()
+        total = finished - profile.started
+        view_time = finished - profile.view_started if profile.view_started else 0.0
+
+        match = getattr(request, 'resolver_match', None)
+        route = f"{request.method} /{match.route}" if match else f"{request.method} <unresolved>"
+        collector.record(route, profile, total, view_time)
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={profile.db_time * 1000:.2f};desc="{profile.query_count} queries"',
+                f'serializer;dur={profile.serializer_time * 1000:.2f}',
+                f'view;dur={view_time * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ])
+        return response
+
+
+class PrometheusMetricsMiddleware:
+    """
+    Observes per-route latency and database query counters for every request.
+
+    Must come after ``RequestProfilingMiddleware`` so a profiled request's query timings are
+    shared rather than captured twice; unprofiled requests get a profile of their own, which
+    only counts queries and their time. Off unless ``METRICS_ENABLED``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        # Serializer time is only reported by RequestProfilingMiddleware, which installs its own hook
+        install_hooks(serializers=False)
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                current_profile.reset(token)
+        self.observe(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        profile, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                current_profile.reset(token)
+        self.observe(request, response, profile)
+        return response
+
+    def start(self):
+        profile = current_profile.get()
+        if profile is not None:
+            return profile, None
+        profile = RequestProfile(keep_queries=False)
+        return profile, current_profile.set(profile)
+
+    def observe(self, request, response, profile):
+        match = getattr(request, 'resolver_match', None)
+        view = f"/{match.route}" if match else '<unresolved>'
+        REQUEST_LATENCY.labels(request.method, view, response.status_code).observe(
+            time.perf_counter() - profile.started
+        )
+        DB_QUERIES.labels(request.method, view).inc(profile.query_count)
+        DB_QUERY_TIME.labels(request.method, view).inc(profile.db_time)
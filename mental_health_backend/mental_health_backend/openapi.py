@@ -0,0 +1,113 @@
+# mental_health_backend/openapi.py
+"""
+Prebuilt OpenAPI schema.
+
+drf_yasg introspects every view and serializer to build the schema, so it is generated once
+per code version into ``API_SCHEMA_DIR/openapi-<version>.json`` (at build time through
+``manage.py generate_openapi_schema``, or by the first request that finds it missing) and
+served from that file with an ETag. The Swagger UI and ReDoc pages load it via ``SPEC_URL``.
+"""
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+API_INFO = openapi.Info(
+    title="Mental Health App API",
+    default_version="v1",
+    description="API documentation for the Mental Health App",
+    terms_of_service="https://www.example.com/terms/",
+    contact=openapi.Contact(email="support@mentalhealthapp.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+# Serves the documentation pages only; their spec comes from the artifact (see SPEC_URL in settings)
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+_loaded = {}
+_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    ``CODE_VERSION`` when set, otherwise a digest of the project's Python sources.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(settings.BASE_DIR):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = Path(root, name)
+                digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(version=None):
+    return Path(settings.API_SCHEMA_DIR) / f'openapi-{version or code_version()}.json'
+
+
+def generate_schema():
+    """
+    Introspects the URL conf and returns the schema as JSON bytes.
+    """
+    generator = OpenAPISchemaGenerator(API_INFO)
+    return OpenAPICodecJson(validators=[]).encode(generator.get_schema(request=None, public=True))
+
+
+def write_schema(version=None):
+    """
+    Generates the schema into the artifact for ``version`` and removes artifacts of other versions.
+    """
+    path = artifact_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = generate_schema()
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix='.openapi-', delete=False) as handle:
+        handle.write(body)
+    os.chmod(handle.name, 0o644)
+    os.replace(handle.name, path)  # Readers never see a partial file
+    for stale in path.parent.glob('openapi-*.json'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
+
+
+def load_schema():
+    """
+    Returns ``(body, etag)`` for the current code version, generating the artifact if it is missing.
+    """
+    path = artifact_path()
+    if path not in _loaded:
+        with _lock:
+            if path not in _loaded:
+                if not path.exists():
+                    write_schema()
+                body = path.read_bytes()
+                _loaded.clear()
+                _loaded[path] = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    return _loaded[path]
+
+
+@require_safe
+@condition(etag_func=lambda request: load_schema()[1])
+def schema_json(request):
+    body, _ = load_schema()
+    return HttpResponse(body, content_type='application/json')
@@ -0,0 +1,215 @@
+# mental_health_backend/profiling.py
+"""
+In-process request profiling: per-request timings and per-route aggregates.
+
+The active request's profile lives in a context variable, so database and serializer hooks
+(which run deep inside the view, possibly in a ``sync_to_async`` worker thread) can
+attribute their time to it without any plumbing. When no profile is active the hooks cost
+a single context-variable lookup.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+current_profile = ContextVar('current_profile', default=None)
+
+MAX_FINGERPRINTS_PER_ROUTE = 50
+RECENT_DURATIONS_PER_ROUTE = 256
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN \((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalizes a SQL statement so queries differing only in literals share one fingerprint.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestProfile:
+    """
+    Timings collected for a single request.
+    """
+
+    __slots__ = ('started', 'view_started', 'query_count', 'db_time', 'serializer_time',
+                 'serializer_depth', 'queries')
+
+    def __init__(self, keep_queries=True):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        # Statements are only kept for fingerprinting; metrics need just the count and time
+        self.queries = [] if keep_queries else None
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        if self.queries is not None:
+            self.queries.append((sql, duration))
+
+
+class RouteStats:
+    __slots__ = ('count', 'total', 'max', 'view_time', 'db_time', 'queries', 'serializer_time', 'recent',
+                 'fingerprints')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.view_time = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+        self.recent = deque(maxlen=RECENT_DURATIONS_PER_ROUTE)
+        self.fingerprints = {}
+
+
+class ProfileCollector:
+    """
+    Thread-safe per-route aggregation of request profiles, kept in process memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, profile, total, view_time):
+        grouped = {}
+        for sql, duration in profile.queries:
+            key = fingerprint(sql)
+            count, spent, worst = grouped.get(key, (0, 0.0, 0.0))
+            grouped[key] = (count + 1, spent + duration, max(worst, duration))
+
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.count += 1
+            stats.total += total
+            stats.max = max(stats.max, total)
+            stats.view_time += view_time
+            stats.db_time += profile.db_time
+            stats.queries += profile.query_count
+            stats.serializer_time += profile.serializer_time
+            stats.recent.append(total)
+            for key, (count, spent, worst) in grouped.items():
+                entry = stats.fingerprints.setdefault(key, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += spent
+                entry[2] = max(entry[2], worst)
+            if len(stats.fingerprints) > MAX_FINGERPRINTS_PER_ROUTE:
+                # Keep memory bounded by evicting the cheapest fingerprints
+                ranked = sorted(stats.fingerprints.items(), key=lambda item: item[1][1], reverse=True)
+                stats.fingerprints = dict(ranked[:MAX_FINGERPRINTS_PER_ROUTE])
+
+    def report(self, limit=10, fingerprints=5):
+        """
+        Returns the slowest routes (by mean duration) with their most expensive query fingerprints.
+        """
+        to_ms = lambda seconds: round(seconds * 1000, 2)
+        with self._lock:
+            snapshot = [(route, stats, sorted(stats.recent), list(stats.fingerprints.items()))
+                        for route, stats in self._routes.items()]
+
+        routes = []
+        for route, stats, recent, route_fingerprints in snapshot:
+            route_fingerprints.sort(key=lambda item: item[1][1], reverse=True)
+            routes.append({
+                'route': route,
+                'requests': stats.count,
+                'mean_ms': to_ms(stats.total / stats.count),
+                'p95_ms': to_ms(recent[min(len(recent) - 1, int(len(recent) * 0.95))]),
+                'max_ms': to_ms(stats.max),
+                'mean_view_ms': to_ms(stats.view_time / stats.count),
+                'mean_db_ms': to_ms(stats.db_time / stats.count),
+                'mean_queries': round(stats.queries / stats.count, 2),
+                'mean_serializer_ms': to_ms(stats.serializer_time / stats.count),
+                'worst_queries': [
+                    {
+                        'fingerprint': key,
+                        'count': count,
+                        'total_ms': to_ms(spent),
+                        'max_ms': to_ms(worst),
+                    }
+                    for key, (count, spent, worst) in route_fingerprints[:fingerprints]
+                ],
+            })
+        routes.sort(key=lambda entry: entry['mean_ms'], reverse=True)
+        return routes[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+collector = ProfileCollector()
+
+
+def _query_timer(execute, sql, params, many, context):
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - started)
+
+
+def _install_query_timer(sender=None, connection=None, **kwargs):
+    if _query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_timer)
+
+
+_installed = set()
+
+
+def install_hooks(serializers=True):
+    """
+    Installs the database hook, and the serializer hook unless ``serializers`` is false,
+    once per process.
+    """
+    if 'queries' not in _installed:
+        _installed.add('queries')
+        connection_created.connect(_install_query_timer, weak=False)
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection=connection)
+    if serializers and 'serializers' not in _installed:
+        _installed.add('serializers')
+        _install_serializer_timer()
+
+
+def _install_serializer_timer():
+    from rest_framework.serializers import BaseSerializer
+    data_property = BaseSerializer.data
+
+    def timed_data(serializer):
+        profile = current_profile.get()
+        if profile is None:
+            return data_property.fget(serializer)
+        # Only the outermost .data access is timed; nested serializers run inside it
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data_property.fget(serializer)
+        finally:
+            profile.serializer_depth -= 1
+            if profile.serializer_depth == 0:
+                profile.serializer_time += time.perf_counter() - started
+
+    BaseSerializer.data = property(timed_data)
@@ -0,0 +1,40 @@
+# mental_health_backend/renderers.py
+"""
+JSON rendering with orjson.
+
+``ORJSONRenderer`` writes the same bytes as DRF's compact ``JSONRenderer``: dates, times,
+decimals, lazy strings and the like are handed to DRF's encoder, and U+2028/U+2029 are
+escaped the same way. Two differences remain: floats in exponent notation are written in
+orjson's shorter form (``1e-5`` rather than ``1e-05``, the same number), and non-finite
+floats render as ``null`` instead of raising. Indented output (the browsable API, or an
+``indent`` media type parameter) is left to ``JSONRenderer``.
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .events import format_event
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        body = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        return body.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets a view accept ``Accept: text/event-stream``. The stream itself is a
+    ``StreamingHttpResponse``; this only renders error responses, as one ``error`` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data)
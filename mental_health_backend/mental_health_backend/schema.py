@@ -0,0 +1,25 @@
+# mental_health_backend/schema.py
+"""
+Root GraphQL schema. Every app contributes its own ``Query``; user-owned data hangs off ``me``.
+"""
+import graphene
+
+import goals.schema
+import gratitude.schema
+import journaling.schema
+import moodtracker.schema
+import users.schema
+
+
+class Query(
+    users.schema.Query,
+    journaling.schema.Query,
+    goals.schema.Query,
+    gratitude.schema.Query,
+    moodtracker.schema.Query,
+    graphene.ObjectType,
+):
+    pass
+
+
+schema = graphene.Schema(query=Query)
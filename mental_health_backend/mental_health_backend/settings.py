@@ -3,6 +3,9 @@ from pathlib import Path
 from decouple import config
 from datetime import timedelta
 from celery.schedules import crontab
+from kombu import Queue
+from corsheaders.defaults import default_headers
+from mental_health_backend.structured_logging import build_logging_config
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,15 +49,49 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Queues: model-bound inference, time-sensitive email, and bulk jobs, each consumed by its own
+# worker pool (see WORKER_PROFILES in mental_health_backend/celery.py) so one cannot starve another
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('inference'),
+    Queue('email'),
+    Queue('batch'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'moodtracker.tasks.generate_insight_task': {'queue': 'inference'},
+    'moodtracker.tasks.send_swipe_reminders': {'queue': 'batch'},
+    'goals.tasks.dispatch_activity_reminders': {'queue': 'email'},  # Fan-out for the minute must not wait on batch jobs
+    'goals.tasks.send_activity_reminders': {'queue': 'email'},
+    'journaling.tasks.send_session_reminder': {'queue': 'email'},
+}
+
+# No caller reads task results; a task whose result is needed sets ignore_result=False
+CELERY_TASK_IGNORE_RESULT = True
+
+# Acknowledge after the task runs, so a message held by a worker that stops is redelivered.
+# Tasks must therefore be safe to run twice: emails go out once per recipient and occurrence
+# (see mental_health_backend.delivery) and an insight job that already started is not rerun.
+CELERY_TASK_ACKS_LATE = True
+# Reserve one message per process unless a worker profile says otherwise; with late acks a
+# long task would otherwise hold prefetched messages that idle processes could run
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 # Celery Beat Schedule
 CELERY_BEAT_SCHEDULE = {
     'send-daily-swipe-reminders': {
         'task': 'moodtracker.tasks.send_swipe_reminders',
         'schedule': crontab(hour=8, minute=0),  # Every day at 8 AM
     },
+    'dispatch-activity-reminders': {
+        'task': 'goals.tasks.dispatch_activity_reminders',
+        'schedule': crontab(),  # Every minute
+    },
 }
 
 MIDDLEWARE = [
+    'mental_health_backend.middleware.RequestProfilingMiddleware',  # No-op unless REQUEST_PROFILING_ENABLED
+    'mental_health_backend.middleware.PrometheusMetricsMiddleware',  # Must follow the profiling middleware
     'corsheaders.middleware.CorsMiddleware',  # For handling CORS
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,8 +102,39 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request profiling (query count, DB/serializer/view time per request)
+# Disabled by default; in production enable with a low sample rate, e.g. 0.01
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+REQUEST_PROFILING_SERVER_TIMING = config('REQUEST_PROFILING_SERVER_TIMING', default=True, cast=bool)
+
+# Prometheus metrics served at /metrics (404 while disabled)
+# Set PROMETHEUS_MULTIPROC_DIR in the environment when running several worker processes
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')  # Optional bearer token required by /metrics
+# Port a Celery worker serves its task metrics on (0: not served); set per worker in the Procfile
+WORKER_METRICS_PORT = config('WORKER_METRICS_PORT', default=0, cast=int)
+
+# Cache Configuration
+# Uses Redis when CACHE_URL is set, otherwise falls back to per-process memory.
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 # For CORS during development
 CORS_ALLOW_ALL_ORIGINS = True  # Allow all origins during development
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 ROOT_URLCONF = 'mental_health_backend.urls'
 
@@ -89,27 +157,39 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'mental_health_backend.wsgi.application'
+ASGI_APPLICATION = 'mental_health_backend.asgi.application'
 
 # Database Configuration
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('DATABASE_NAME'),  # Reuse the main database
-        'USER': config('DATABASE_USER'),
-        'PASSWORD': config('DATABASE_PASSWORD'),
-        'HOST': config('DATABASE_HOST'),
-        'PORT': config('DATABASE_PORT'),
-        'OPTIONS': {
-            'sslmode': 'require',
-            'gssencmode': 'disable',
-        },
-        'TEST': {
-            'MIRROR': 'default',  # Reuse the main database for tests
-        },
+# DATABASE_ENGINE=sqlite3 runs against a local SQLite file (benchmarks, offline development)
+DATABASE_ENGINE = config('DATABASE_ENGINE', default='postgresql')
+
+if DATABASE_ENGINE == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DATABASE_NAME'),  # Reuse the main database
+            'USER': config('DATABASE_USER'),
+            'PASSWORD': config('DATABASE_PASSWORD'),
+            'HOST': config('DATABASE_HOST'),
+            'PORT': config('DATABASE_PORT'),
+            'OPTIONS': {
+                'sslmode': config('DATABASE_SSLMODE', default='require'),  # 'disable' for a local Postgres
+                'gssencmode': 'disable',
+            },
+            'TEST': {
+                'MIRROR': 'default',  # Reuse the main database for tests
+            },
+        }
     }
-}
 
 
 
@@ -148,20 +228,19 @@ GRAPHENE = {
     'SCHEMA': 'mental_health_backend.schema.schema',
 }
 
-# Logging Configuration (optional for debugging)
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-        },
-    },
-    'root': {
-        'handlers': ['console'],
-        'level': 'DEBUG',
-    },
-}
+# Logging Configuration
+# Log I/O runs on a background queue listener; see mental_health_backend.structured_logging.
+# LOG_PROFILE 'dev' prints text at DEBUG (including SQL), 'prod' emits JSON lines at INFO.
+# LOG_SQL forces SQL statement logging on/off; it is subject to the profile's sample rate.
+LOG_PROFILE = config('LOG_PROFILE', default='dev' if DEBUG else 'prod')
+LOG_SQL = config('LOG_SQL', default='')  # Empty keeps the profile's default
+LOG_SQL_SAMPLE_RATE = config('LOG_SQL_SAMPLE_RATE', default='')  # e.g. 0.01 keeps 1% of SQL statements
+
+LOGGING = build_logging_config(
+    LOG_PROFILE,
+    sql=LOG_SQL.lower() in ('1', 'true', 'yes', 'on') if LOG_SQL else None,
+    sample_rates={'django.db.backends': float(LOG_SQL_SAMPLE_RATE)} if LOG_SQL_SAMPLE_RATE else None,
+)
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework_simplejwt.authentication.JWTAuthentication',],
@@ -171,10 +250,74 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'mental_health_backend.utils.custom_exception_handler',  # Update to correct project path
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'mental_health_backend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 AUTH_USER_MODEL = 'users.User'
 
+# External API keys
+OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+HUGGINGFACE_API_KEY = config('HUGGINGFACE_API_KEY', default='')
+
+# Prompt catalog cache lifetime (seconds); invalidated on any Prompt write
+PROMPT_CATALOG_CACHE_TIMEOUT = config('PROMPT_CATALOG_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Insight generation jobs (see moodtracker.jobs): how long a user's in-flight lock can outlive a
+# lost task, and how long a job's status stays readable
+INSIGHT_JOB_LOCK_TIMEOUT = config('INSIGHT_JOB_LOCK_TIMEOUT', default=600, cast=int)
+INSIGHT_JOB_TIMEOUT = config('INSIGHT_JOB_TIMEOUT', default=3600, cast=int)
+
+# Insight text generation: 'api' (Hugging Face Inference API) or 'local' (transformers in the
+# worker, streaming text to the user's event stream as it is generated)
+INSIGHT_MODEL_BACKEND = config('INSIGHT_MODEL_BACKEND', default='api')
+INSIGHT_LOCAL_MODEL = config('INSIGHT_LOCAL_MODEL', default='gpt2')
+
+# Server-sent events (see mental_health_backend.events): Redis pub/sub when set, so workers reach
+# streams on every web process; otherwise events stay within the publishing process
+EVENTS_REDIS_URL = config('EVENTS_REDIS_URL', default=CACHE_URL)
+# Idle seconds before an event stream sends a keep-alive comment
+EVENTS_KEEPALIVE = config('EVENTS_KEEPALIVE', default=15, cast=int)
+
+# Semantic search (see mental_health_backend.embeddings): the sentence-embedding model, where the
+# indexes are written, texts embedded per batch and rows per shard file
+EMBEDDING_MODEL = config('EMBEDDING_MODEL', default='sentence-transformers/all-MiniLM-L6-v2')
+EMBEDDING_INDEX_DIR = config('EMBEDDING_INDEX_DIR', default=str(BASE_DIR / 'embeddings'))
+EMBEDDING_BATCH_SIZE = config('EMBEDDING_BATCH_SIZE', default=64, cast=int)
+EMBEDDING_SHARD_SIZE = config('EMBEDDING_SHARD_SIZE', default=100000, cast=int)
+# Rows from which an index gets an IVF layer, and how many of its lists a search reads
+EMBEDDING_IVF_MIN_ROWS = config('EMBEDDING_IVF_MIN_ROWS', default=200000, cast=int)
+EMBEDDING_NPROBE = config('EMBEDDING_NPROBE', default=16, cast=int)
+
+# Minimum delay (seconds) between two password reset emails for the same account
+PASSWORD_RESET_EMAIL_COOLDOWN = config('PASSWORD_RESET_EMAIL_COOLDOWN', default=60, cast=int)
+
+# Activity reminders: emails per send task, and how late (seconds) a missed reminder may still go out
+ACTIVITY_REMINDER_BATCH_SIZE = config('ACTIVITY_REMINDER_BATCH_SIZE', default=500, cast=int)
+ACTIVITY_REMINDER_GRACE = config('ACTIVITY_REMINDER_GRACE', default=900, cast=int)
+
+# Problem-solving session reminders: seconds of upcoming sessions the scheduler holds in memory,
+# and how long before the due time each reminder is handed to Celery (with an exact eta)
+SESSION_REMINDER_HORIZON = config('SESSION_REMINDER_HORIZON', default=3600, cast=int)
+SESSION_REMINDER_LEAD = config('SESSION_REMINDER_LEAD', default=300, cast=int)
+
+# Upper bound on dashboard staleness for time-relative fields (writes invalidate it immediately)
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+
+# OpenAPI schema artifact (see mental_health_backend.openapi), written once per code version.
+# Set CODE_VERSION (e.g. the deployed commit) to skip hashing the source tree at startup.
+CODE_VERSION = config('CODE_VERSION', default='')
+API_SCHEMA_DIR = config('API_SCHEMA_DIR', default=str(BASE_DIR / 'openapi'))
+
+# The documentation pages load the prebuilt schema instead of generating their own
+SWAGGER_SETTINGS = {'SPEC_URL': 'schema-json'}
+REDOC_SETTINGS = {'SPEC_URL': 'schema-json'}
+
+# Seconds a create response is replayed for repeats of its Idempotency-Key (see mental_health_backend.idempotency)
+IDEMPOTENCY_KEY_TIMEOUT = config('IDEMPOTENCY_KEY_TIMEOUT', default=86400, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),  # Ensure timedelta is used correctly
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -197,12 +340,3 @@ TEMPLATES = [
     },
 ]
 
-
-# Debugging the environment variable loading (optional)
-print("DEBUG: DATABASE_NAME =", config('DATABASE_NAME'))
-print("DEBUG: DATABASE_USER =", config('DATABASE_USER'))
-print("DEBUG: DATABASE_PASSWORD =", config('DATABASE_PASSWORD'))
-print("DEBUG: DATABASE_HOST =", config('DATABASE_HOST'))
-print("DEBUG: DATABASE_PORT =", config('DATABASE_PORT'))
-print("DEBUG: Final DATABASES =", DATABASES)
-print("Template directories:", BASE_DIR / 'mental_health_backend' / 'templates')
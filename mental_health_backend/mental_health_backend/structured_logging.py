@@ -0,0 +1,232 @@
+# mental_health_backend/structured_logging.py
+"""
+Logging building blocks: JSON lines, per-logger sampling and a queue-backed handler.
+
+Request threads only filter the record and push it onto an in-memory queue; formatting
+and stream I/O happen on a background ``QueueListener`` thread, one per process.
+``build_logging_config``
+assembles these into a ``LOGGING`` dict for the ``dev`` or ``prod`` profile.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes present on every LogRecord; anything else was passed via ``extra=``
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects, including any ``extra=`` fields.
+    """
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records per logger, e.g. ``{'django.db.backends': 0.01}``.
+
+    The most specific configured logger prefix wins. Records at WARNING and above are never
+    dropped. Sampling is deterministic (every Nth record) so it needs no random numbers.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._resolved = {}
+        self._counters = {}
+
+    def rate_for(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = float(self.rates[candidate])
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        every = round(1 / rate)
+        counter = self._counters.get(record.name)
+        if counter is None:
+            # setdefault and next() on a count are atomic, so request threads share counters safely
+            counter = self._counters.setdefault(record.name, itertools.count())
+        return next(counter) % every == 0
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    A ``QueueHandler`` that owns its ``QueueListener`` and target stream handler.
+
+    ``fmt`` selects ``'json'`` or ``'text'`` output. When the queue is full, records are
+    dropped (and counted in ``dropped``) rather than blocking the caller.
+
+    A forked child (Celery prefork, a preloading server) inherits the handler but not the
+    listener thread, so the first record a process logs after a fork starts a fresh queue
+    and listener there.
+    """
+
+    def __init__(self, stream=None, fmt='json', queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.queue_size = queue_size
+        self.dropped = 0
+        target = logging.StreamHandler(stream or sys.stderr)
+        if fmt == 'json':
+            target.setFormatter(JsonFormatter())
+        else:
+            target.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        self.target = target
+        self.start()
+        atexit.register(self.stop)
+
+    def start(self):
+        self.pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Only merge the message arguments here; formatting runs on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # Runs under the handler lock, which logging re-creates in a forked child
+        if self.pid != os.getpid():
+            # The inherited queue's locks may have been held by a thread that did not survive the fork
+            self.queue = queue.Queue(maxsize=self.queue_size)
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """
+        Blocks until every queued record has been written.
+        """
+        if self.pid == os.getpid() and self.listener._thread is not None:
+            self.stop()
+            self.listener.start()
+
+    def stop(self):
+        if self.pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+            self.target.flush()
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+PROFILES = {
+    'dev': {
+        'format': 'text',
+        'root_level': 'DEBUG',
+        'levels': {
+            # Explicit: Django's default logging config has already set 'django' to INFO
+            'django': 'DEBUG',
+            'django.db.backends': 'DEBUG',
+        },
+        'sample_rates': {},
+    },
+    'prod': {
+        'format': 'json',
+        'root_level': 'INFO',
+        'levels': {
+            'django': 'INFO',
+            'django.db.backends': 'WARNING',
+            'django.utils.autoreload': 'WARNING',
+        },
+        'sample_rates': {
+            'django.db.backends': 0.01,
+        },
+    },
+}
+
+
+def build_logging_config(profile='prod', sql=None, sample_rates=None, levels=None, queue_size=10000):
+    """
+    Returns a ``LOGGING`` dict for the named profile.
+
+    ``sql`` forces SQL statement logging (``django.db.backends`` at DEBUG) on or off; the
+    profile's sample rate still applies. ``sample_rates`` and ``levels`` override per-logger
+    settings of the profile.
+    """
+    settings = PROFILES[profile]
+    rates = {**settings['sample_rates'], **(sample_rates or {})}
+    logger_levels = {**settings['levels'], **(levels or {})}
+    if sql is not None:
+        logger_levels['django.db.backends'] = 'DEBUG' if sql else 'WARNING'
+
+    return {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'filters': {
+            'sampling': {
+                '()': 'mental_health_backend.structured_logging.SamplingFilter',
+                'rates': rates,
+            },
+        },
+        'handlers': {
+            'console': {
+                '()': 'mental_health_backend.structured_logging.QueueListenerHandler',
+                'stream': 'ext://sys.stderr',
+                'fmt': settings['format'],
+                'queue_size': queue_size,
+                'filters': ['sampling'],
+            },
+        },
+        'root': {
+            'handlers': ['console'],
+            'level': settings['root_level'],
+        },
+        'loggers': {
+            # Replace Django's own synchronous console/mail handlers; records propagate to the queue
+            'django': {'handlers': [], 'level': logger_levels.pop('django'), 'propagate': True},
+            **{name: {'level': level} for name, level in logger_levels.items()},
+        },
+    }
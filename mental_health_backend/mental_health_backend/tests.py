@@ -0,0 +1,959 @@
+import io
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import zlib
+from unittest import mock
+
+import numpy as np
+
+from celery import Celery, shared_task
+from celery.contrib.testing.worker import start_worker
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from goals.models import Goals
+from gratitude.models import Gratitude
+from journaling.models import CognitiveExercise, Journaling, Meditation
+from journaling.serializers import CognitiveExerciseSerializer, JournalingSerializer, MeditationSerializer
+from moodtracker.models import Insight, Prompt, SwipeSession, UserResponse
+from moodtracker.serializers import InsightSerializer
+from moodtracker.tasks import send_swipe_reminders
+from prometheus_client import REGISTRY
+from .celery import WORKER_PROFILES, app as celery_app, apply_worker_profile
+from . import embeddings
+from .events import LocalEventBus
+from .fastpath import compile_rows
+from .fields import RAW, ZLIB, StoredText, decompress_text
+from . import admin as admin_helpers
+from . import openapi
+from .idempotency import idempotency_cache_key
+from .metrics import serve_worker_metrics
+from .profiling import RequestProfile, collector, fingerprint
+from .renderers import ORJSONRenderer
+from .structured_logging import JsonFormatter, QueueListenerHandler, SamplingFilter, build_logging_config
+from .vectors import IndexBusy, IndexWriter, VectorIndex, build_lock, current_version, publish_version
+
+User = get_user_model()
+
+DASHBOARD_QUERY = """
+{
+  me {
+    username
+    journals(limit: 5) { id entryText }
+    gratitudeEntries { id }
+    goals { goalName status }
+    swipeSessions {
+      id
+      responses { response prompt { text category } }
+    }
+  }
+  prompts { id }
+}
+"""
+
+class FingerprintTestCase(SimpleTestCase):
+
+    def test_literals_are_normalized(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'bob'"),
+            fingerprint("SELECT  *  FROM t WHERE id = 7 AND name = 'alice'"),
+        )
+
+    def test_in_lists_are_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s)'),
+        )
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SAMPLE_RATE=1.0)
+class RequestProfilingTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        cls.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="password123", is_staff=True
+        )
+        Gratitude.objects.bulk_create([Gratitude(user=cls.user, entry_text=f"Entry {i}") for i in range(3)])
+
+    def setUp(self):
+        collector.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('gratitude-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header = response['Server-Timing']
+        for metric in ('db;dur=', 'serializer;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, header)
+        self.assertIn('desc="1 queries"', header)
+
+    def test_routes_are_aggregated(self):
+        for _ in range(3):
+            self.client.get(reverse('gratitude-list'))
+        routes = {entry['route']: entry for entry in collector.report()}
+        entry = routes['GET /gratitude/']
+        self.assertEqual(entry['requests'], 3)
+        self.assertEqual(entry['mean_queries'], 1)
+        self.assertIn('gratitude_gratitude', entry['worst_queries'][0]['fingerprint'])
+
+    def test_profiling_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('request-profiling'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profiling_endpoint(self):
+        self.client.get(reverse('gratitude-list'))
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(reverse('request-profiling'), {'limit': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('GET /gratitude/', [entry['route'] for entry in response.data['routes']])
+
+        response = self.client.delete(reverse('request-profiling'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertNotIn('GET /gratitude/', [entry['route'] for entry in collector.report()])
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(reverse('gratitude-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(collector.report(), [])
+
+
+class RequestProfilingDisabledTestCase(APITestCase):
+
+    def test_disabled_by_default(self):
+        user = User.objects.create_user(username="plain", email="plain@example.com", password="password123")
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('gratitude-list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_metrics_disabled_by_default(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+
+
+@celery_app.task(name='mental_health_backend.tests.failing_task')
+def failing_task():
+    raise RuntimeError("boom")
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_latency_and_query_counters(self):
+        labels = {'method': 'GET', 'view': '/gratitude/'}
+        before_requests = self.sample('http_request_duration_seconds_count', status='200', **labels)
+        before_queries = self.sample('django_db_queries_total', **labels)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('gratitude-list'))
+
+        self.assertEqual(self.sample('http_request_duration_seconds_count', status='200', **labels), before_requests + 1)
+        self.assertEqual(self.sample('django_db_queries_total', **labels), before_queries + 1)
+
+    def test_unprofiled_requests_keep_no_statements(self):
+        profile = RequestProfile(keep_queries=False)
+        profile.record_query('SELECT 1', 0.5)
+        self.assertEqual((profile.query_count, profile.db_time, profile.queries), (1, 0.5, None))
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('gratitude-list'))  # Observed even when unauthorized
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'http_request_duration_seconds_bucket', response.content)
+        self.assertIn(b'celery_task_runtime_seconds', response.content)
+
+    @override_settings(METRICS_AUTH_TOKEN='scrape-secret')
+    def test_metrics_endpoint_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @mock.patch('moodtracker.tasks.send_mail')
+    @mock.patch('moodtracker.tasks.render_to_string', return_value="reminder")
+    def test_task_runtime_and_queue_wait(self, mock_render, mock_send_mail):
+        task = 'moodtracker.tasks.send_swipe_reminders'
+        before_runs = self.sample('celery_task_runtime_seconds_count', task=task, state='SUCCESS')
+        before_waits = self.sample('celery_task_queue_wait_seconds_count', task=task)
+
+        send_swipe_reminders.apply(headers={'published_at': time.time() - 2})
+
+        self.assertEqual(self.sample('celery_task_runtime_seconds_count', task=task, state='SUCCESS'), before_runs + 1)
+        self.assertEqual(self.sample('celery_task_queue_wait_seconds_count', task=task), before_waits + 1)
+        self.assertGreaterEqual(self.sample('celery_task_queue_wait_seconds_sum', task=task), 2)
+
+    def test_task_failures_and_retries(self):
+        task = failing_task.name
+        before_failures = self.sample('celery_task_failures_total', task=task)
+        failing_task.apply()
+        self.assertEqual(self.sample('celery_task_failures_total', task=task), before_failures + 1)
+
+        before_retries = self.sample('celery_task_retries_total', task=task)
+        from celery import signals
+        signals.task_retry.send(sender=failing_task, request=None, reason='retrying')
+        self.assertEqual(self.sample('celery_task_retries_total', task=task), before_retries + 1)
+
+    @mock.patch('moodtracker.tasks.send_mail')
+    @mock.patch('moodtracker.tasks.render_to_string', return_value="insight")
+    @mock.patch('moodtracker.tasks.requests.post')
+    def test_insight_api_latency(self, mock_post, mock_render, mock_send_mail):
+        from moodtracker.tasks import generate_insight_task
+        mock_post.return_value.json.return_value = [{'generated_text': 'Be kind to yourself.'}]
+        before = self.sample('insight_api_request_duration_seconds_count', outcome='success')
+        generate_insight_task.apply(args=(self.user.id, "prompt"))
+        self.assertEqual(self.sample('insight_api_request_duration_seconds_count', outcome='success'), before + 1)
+
+    def test_worker_metrics_server(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        with override_settings(WORKER_METRICS_PORT=port):
+            server, _ = serve_worker_metrics()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        failing_task.apply()
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            body = response.read()
+        self.assertIn(f'celery_task_failures_total{{task="{failing_task.name}"}}'.encode(), body)
+        with override_settings(WORKER_METRICS_PORT=0):
+            self.assertIsNone(serve_worker_metrics())
+
+    def test_multiprocess_aggregation(self):
+        increment = (
+            "from mental_health_backend.metrics import TASK_RETRIES;"
+            "TASK_RETRIES.labels(task='aggregated').inc()"
+        )
+        render = (
+            "import sys; from mental_health_backend.metrics import render_metrics;"
+            "sys.stdout.write(render_metrics()[0].decode())"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+            for _ in range(3):
+                subprocess.run([sys.executable, '-c', increment], env=env, check=True)
+            output = subprocess.run(
+                [sys.executable, '-c', render], env=env, check=True, capture_output=True, text=True
+            ).stdout
+        self.assertIn('celery_task_retries_total{task="aggregated"} 3.0', output)
+
+
+class StructuredLoggingTestCase(SimpleTestCase):
+
+    def make_record(self, name='app', level=logging.INFO, msg='hello %s', args=('world',), **extra):
+        record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter_includes_extras(self):
+        line = JsonFormatter().format(self.make_record(user_id=7))
+        payload = json.loads(line)
+        self.assertEqual(payload['message'], 'hello world')
+        self.assertEqual(payload['level'], 'INFO')
+        self.assertEqual(payload['user_id'], 7)
+        self.assertNotIn('\n', line)
+
+    def test_sampling_filter(self):
+        sampling = SamplingFilter({'django.db.backends': 0.1, 'django.db.backends.schema': 0})
+        kept = sum(sampling.filter(self.make_record('django.db.backends')) for _ in range(100))
+        self.assertEqual(kept, 10)
+        self.assertFalse(sampling.filter(self.make_record('django.db.backends.schema')))
+        # Warnings and errors are never sampled away, and unconfigured loggers pass through
+        self.assertTrue(sampling.filter(self.make_record('django.db.backends.schema', level=logging.WARNING)))
+        self.assertTrue(sampling.filter(self.make_record('django.request')))
+
+    def test_queue_handler_writes_off_thread(self):
+        stream = io.StringIO()
+        handler = QueueListenerHandler(stream=stream, fmt='json')
+        try:
+            handler.handle(self.make_record())
+            handler.flush()
+            self.assertEqual(json.loads(stream.getvalue())['message'], 'hello world')
+        finally:
+            handler.close()
+
+    def test_sampling_filter_is_thread_safe(self):
+        sampling = SamplingFilter({'app': 0.1})
+        kept = []
+
+        def log():
+            kept.append(sum(sampling.filter(self.make_record()) for _ in range(1000)))
+
+        threads = [threading.Thread(target=log) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(kept), 800)
+
+    def test_queue_handler_writes_after_fork(self):
+        with tempfile.TemporaryFile('w+') as stream:
+            handler = QueueListenerHandler(stream=stream, fmt='json')
+            try:
+                pid = os.fork()
+                if pid == 0:
+                    handler.handle(self.make_record(args=('child',)))
+                    handler.flush()
+                    os._exit(0)
+                os.waitpid(pid, 0)
+                stream.seek(0)
+                self.assertEqual(json.loads(stream.read())['message'], 'hello child')
+            finally:
+                handler.close()
+
+    def test_queue_handler_drops_when_full(self):
+        handler = QueueListenerHandler(stream=io.StringIO(), queue_size=1)
+        handler.stop()  # No consumer, so the queue fills up
+        try:
+            handler.handle(self.make_record())
+            handler.handle(self.make_record())
+            self.assertEqual(handler.dropped, 1)
+        finally:
+            handler.close()
+
+    def effective_level(self, config, name):
+        while name:
+            level = config['loggers'].get(name, {}).get('level')
+            if level:
+                return level
+            name = name.rpartition('.')[0]
+        return config['root']['level']
+
+    def test_profile_logger_levels(self):
+        dev, prod = build_logging_config('dev'), build_logging_config('prod')
+        self.assertEqual(self.effective_level(dev, 'django.db.backends'), 'DEBUG')
+        self.assertEqual(self.effective_level(dev, 'django.request'), 'DEBUG')
+        self.assertEqual(self.effective_level(dev, 'moodtracker.tasks'), 'DEBUG')
+        self.assertEqual(self.effective_level(prod, 'django.db.backends'), 'WARNING')
+        self.assertEqual(self.effective_level(prod, 'django.request'), 'INFO')
+        self.assertEqual(self.effective_level(prod, 'moodtracker.tasks'), 'INFO')
+        self.assertEqual(self.effective_level(build_logging_config('dev', sql=False), 'django.db.backends'), 'WARNING')
+
+    def test_profiles(self):
+        prod = build_logging_config('prod')
+        self.assertEqual(prod['root']['level'], 'INFO')
+        self.assertEqual(prod['loggers']['django.db.backends']['level'], 'WARNING')
+        self.assertEqual(prod['handlers']['console']['fmt'], 'json')
+
+        dev_sql = build_logging_config('dev', sql=True, sample_rates={'django.db.backends': 0.5})
+        self.assertEqual(dev_sql['loggers']['django.db.backends']['level'], 'DEBUG')
+        self.assertEqual(dev_sql['filters']['sampling']['rates'], {'django.db.backends': 0.5})
+
+
+class GraphQLTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        cls.prompts = Prompt.objects.bulk_create(
+            [Prompt(text=f"Prompt {i}", category='mood') for i in range(4)]
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def add_sessions(self, count, responses_per_session):
+        for _ in range(count):
+            session = SwipeSession.objects.create(user=self.user)
+            UserResponse.objects.bulk_create([
+                UserResponse(user=self.user, session=session, prompt=self.prompts[i % len(self.prompts)], response=True)
+                for i in range(responses_per_session)
+            ])
+
+    def query(self, query):
+        response = self.client.post(reverse('graphql'), {'query': query}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        body = response.json()
+        self.assertNotIn('errors', body)
+        return body['data']
+
+    def test_requires_authentication(self):
+        response = APIClient().post(reverse('graphql'), {'query': '{ me { id } }'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_dashboard_shape(self):
+        self.add_sessions(2, 3)
+        Journaling.objects.bulk_create([Journaling(user=self.user, entry_text=f"Entry {i}") for i in range(8)])
+        Goals.objects.create(user=self.user, goal_name="Run", description="5k", due_date='2030-01-01', status='in-progress')
+        data = self.query(DASHBOARD_QUERY)['me']
+        self.assertEqual(data['username'], 'testuser')
+        self.assertEqual(len(data['journals']), 5)
+        self.assertEqual(data['goals'], [{'goalName': 'Run', 'status': 'in-progress'}])
+        self.assertEqual([len(s['responses']) for s in data['swipeSessions']], [3, 3])
+        self.assertEqual(data['swipeSessions'][0]['responses'][0]['prompt']['category'], 'mood')
+
+    def test_nested_queries_do_not_scale_with_rows(self):
+        self.add_sessions(1, 1)
+        with self.assertNumQueries(7) as small:
+            self.query(DASHBOARD_QUERY)
+        self.add_sessions(10, 4)
+        # Same number of queries regardless of how many sessions and responses there are
+        with self.assertNumQueries(len(small.captured_queries)):
+            self.query(DASHBOARD_QUERY)
+
+    def test_other_users_data_is_not_visible(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        Gratitude.objects.create(user=other, entry_text="Not yours")
+        data = self.query('{ me { gratitudeEntries { entryText } } }')
+        self.assertEqual(data['me']['gratitudeEntries'], [])
+
+
+class CompressedTextFieldTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stored(self, entry):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT entry_text FROM journaling_journaling WHERE id = %s", [entry.pk])
+            return bytes(cursor.fetchone()[0])
+
+    def test_short_text_is_stored_raw(self):
+        entry = Journaling.objects.create(user=self.user, entry_text="Short")
+        self.assertEqual(self.stored(entry), RAW + b"Short")
+
+    def test_long_text_is_compressed(self):
+        text = "Today I went for a walk and felt calmer. " * 50
+        entry = Journaling.objects.create(user=self.user, entry_text=text)
+        stored = self.stored(entry)
+        self.assertEqual(stored[:1], ZLIB)
+        self.assertLess(len(stored), len(text) // 5)
+        self.assertEqual(Journaling.objects.get(pk=entry.pk).entry_text, text)
+
+    def test_value_is_decoded_on_first_access(self):
+        text = "Ünïcode and emoji 🙂 " * 30
+        entry = Journaling.objects.create(user=self.user, entry_text=text)
+        loaded = Journaling.objects.get(pk=entry.pk)
+        self.assertIsInstance(loaded.__dict__['entry_text'], StoredText)
+        self.assertEqual(loaded.entry_text, text)
+        self.assertIsInstance(loaded.__dict__['entry_text'], str)
+        raw = Journaling.objects.values_list('entry_text', flat=True).get(pk=entry.pk)
+        self.assertEqual(decompress_text(raw), text)
+
+    def test_untouched_value_is_written_back_as_is(self):
+        text = "Same text again. " * 40
+        entry = Journaling.objects.create(user=self.user, entry_text=text)
+        before = self.stored(entry)
+        loaded = Journaling.objects.get(pk=entry.pk)
+        loaded.word_count = 1
+        loaded.save()
+        self.assertEqual(self.stored(entry), before)
+        self.assertEqual(Journaling.objects.get(pk=entry.pk).entry_text, text)
+
+    def test_serializers_see_plain_text(self):
+        text = ("A long reflection about the week. " * 20).strip()
+        response = self.client.post(reverse('journaling-list-create'), {'entry_text': text}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['entry_text'], text)
+        response = self.client.get(reverse('journaling-detail', args=[response.data['id']]))
+        self.assertEqual(response.data['entry_text'], text)
+
+
+class OpenAPISchemaTestCase(SimpleTestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        self.use_version('v1')
+
+    def use_version(self, version):
+        override = override_settings(API_SCHEMA_DIR=self.schema_dir.name, CODE_VERSION=version)
+        override.enable()
+        self.addCleanup(override.disable)
+        openapi.code_version.cache_clear()
+        self.addCleanup(openapi.code_version.cache_clear)
+        openapi._loaded.clear()
+        self.addCleanup(openapi._loaded.clear)
+
+    def artifacts(self):
+        return sorted(os.listdir(self.schema_dir.name))
+
+    def test_schema_is_generated_once_and_served_from_the_artifact(self):
+        with mock.patch.object(openapi, 'generate_schema', wraps=openapi.generate_schema) as generate:
+            first = self.client.get(reverse('schema-json'))
+            second = self.client.get(reverse('schema-json'))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(self.artifacts(), ['openapi-v1.json'])
+        self.assertEqual(first.content, second.content)
+        self.assertIn('/journaling/', json.loads(first.content)['paths'])
+
+    def test_etag_revalidation(self):
+        response = self.client.get(reverse('schema-json'))
+        etag = response['ETag']
+        self.assertTrue(etag)
+        response = self.client.get(reverse('schema-json'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_new_code_version_regenerates(self):
+        etag = self.client.get(reverse('schema-json'))['ETag']
+        self.use_version('v2')
+        with mock.patch.object(openapi, 'generate_schema', return_value=b'{"paths": {}}') as generate:
+            response = self.client.get(reverse('schema-json'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(generate.call_count, 1)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.artifacts(), ['openapi-v2.json'])
+
+    def test_documentation_pages_load_the_prebuilt_schema(self):
+        with mock.patch.object(openapi.OpenAPISchemaGenerator, 'get_operation') as get_operation:
+            for name in ('schema-swagger-ui', 'schema-redoc'):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, reverse('schema-json'))
+        get_operation.assert_not_called()
+
+
+class IdempotencyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        self.client.force_authenticate(self.user)
+        self.url = reverse('gratitude-list')
+
+    def post(self, body, key=None, client=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return (client or self.client).post(self.url, body, format='json', **headers)
+
+    def test_repeat_is_replayed_without_database_work(self):
+        first = self.post({'entry_text': "Sunshine"}, key='abc')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            second = self.post({'entry_text': "Sunshine"}, key='abc')
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Gratitude.objects.filter(user=self.user).count(), 1)
+
+    def test_requests_without_key_or_with_new_key_create(self):
+        self.post({'entry_text': "One"})
+        self.post({'entry_text': "One"})
+        self.post({'entry_text': "One"}, key='first')
+        self.post({'entry_text': "One"}, key='second')
+        self.assertEqual(Gratitude.objects.filter(user=self.user).count(), 4)
+
+    def test_key_reused_with_different_body(self):
+        self.post({'entry_text': "Sunshine"}, key='abc')
+        response = self.post({'entry_text': "Rain"}, key='abc')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Gratitude.objects.filter(user=self.user).count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        other_client = APIClient()
+        other_client.force_authenticate(other)
+        self.post({'entry_text': "Sunshine"}, key='abc')
+        response = self.post({'entry_text': "Sunshine"}, key='abc', client=other_client)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Gratitude.objects.get(user=other).entry_text, "Sunshine")
+
+    def test_request_in_progress_conflicts(self):
+        request = mock.Mock(user=self.user, path=self.url)
+        cache.add(idempotency_cache_key(request, 'abc'), {'fingerprint': 'same', 'status': None})
+        with mock.patch('mental_health_backend.idempotency.request_fingerprint', return_value='same'):
+            response = self.post({'entry_text': "Sunshine"}, key='abc')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Gratitude.objects.exists())
+
+    def test_failed_request_is_not_stored(self):
+        response = self.post({}, key='abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post({}, key='abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+
+class RowSerializationTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="rows", password="password123")
+        Journaling.objects.create(user=cls.user, entry_text="Short")
+        Journaling.objects.create(user=cls.user, entry_text="Long and compressed, caf\u00e9 \u2028 " * 40)
+        Insight.objects.create(user=cls.user, content="Sleep helps " * 30, confidence_score=0.125)
+        Insight.objects.create(user=cls.user, content="Null score", confidence_score=None, reviewed=True)
+        Meditation.objects.create(title="Breathe", description="In and out", duration=5)
+        Meditation.objects.create(title="Scan", description="Body", duration=12, audio_url="https://example.com/a.mp3")
+        CognitiveExercise.objects.create(title="Reframe", prompt="What else?", example="\u2014 an example")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def assertSameJSON(self, serializer_class, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        row_serializer = compile_rows(serializer_class(), queryset)
+        self.assertIsNotNone(row_serializer)
+        actual = ORJSONRenderer().render(row_serializer.to_representation(row_serializer.rows(queryset)))
+        self.assertEqual(actual, expected)
+
+    def test_rows_match_serializers(self):
+        self.assertSameJSON(JournalingSerializer, Journaling.objects.order_by('id'))
+        self.assertSameJSON(InsightSerializer, Insight.objects.order_by('id'))
+        self.assertSameJSON(MeditationSerializer, Meditation.objects.order_by('id'))
+        self.assertSameJSON(CognitiveExerciseSerializer, CognitiveExercise.objects.order_by('id'))
+
+    def test_list_views_match_serializers(self):
+        for url, serializer_class, queryset in [
+            (reverse('journaling-list-create'), JournalingSerializer, Journaling.objects.order_by('-created_at')),
+            (reverse('insight-list'), InsightSerializer, Insight.objects.order_by('-generated_at')),
+        ]:
+            # The fast path never reads attributes off model instances
+            with mock.patch.object(serializers.Field, 'get_attribute', side_effect=AssertionError):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+            self.assertIn(expected, response.content)
+
+    def test_uncompilable_serializer_is_not_compiled(self):
+        class SummarySerializer(serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Journaling
+                fields = ['id', 'summary']
+
+            def get_summary(self, obj):
+                return obj.entry_text[:3]
+
+        self.assertIsNone(compile_rows(SummarySerializer(), Journaling.objects.all()))
+
+    def test_renderer_matches_json_renderer(self):
+        from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+        from decimal import Decimal
+        from uuid import UUID
+        from django.utils.translation import gettext_lazy
+        from rest_framework.exceptions import ErrorDetail
+
+        data = {
+            'when': datetime(2024, 5, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            'day': date(2024, 5, 1),
+            'at': dt_time(8, 15, 30, 250000),
+            'span': timedelta(minutes=90),
+            'amount': Decimal('12.50'),
+            'id': UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Not found.'),
+            'error': [ErrorDetail('Invalid.', code='invalid')],
+            'text': 'caf\u00e9 \u2028 \u2029 "quoted" \\ \n',
+            'numbers': [1, 0.1, 0.125, -3, None, True],
+            7: 'int key',
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        self.assertEqual(ORJSONRenderer().render(data, 'application/json; indent=2'), JSONRenderer().render(data, 'application/json; indent=2'))
+
+
+class LargeTableAdminTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="password123")
+        prompt = Prompt.objects.create(text="Rested?", category="mood")
+        for i in range(3):
+            user = User.objects.create_user(username=f"member{i}", email=f"member{i}@example.com", password="password123")
+            session = SwipeSession.objects.create(user=user)
+            UserResponse.objects.create(user=user, prompt=prompt, response=True, session=session)
+            Insight.objects.create(user=user, content="Long insight text " * 40, confidence_score=0.4 * i)
+            Journaling.objects.create(user=user, entry_text="Entry")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist(self, model, query=None):
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, query or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [q['sql'] for q in queries.captured_queries]
+
+    def test_changelists_avoid_per_row_and_distinct_queries(self):
+        _, few = self.changelist(UserResponse)
+        UserResponse.objects.create(user=self.admin, prompt=Prompt.objects.get(), response=False,
+                                    session=SwipeSession.objects.create(user=self.admin))
+        _, more = self.changelist(UserResponse)
+        self.assertEqual(len(few), len(more))
+        self.assertFalse(any('DISTINCT' in sql for sql in more))
+        self.assertEqual(sum('COUNT(' in sql for sql in more), 1)  # No separate full count
+
+        today = timezone.localdate()
+        for drilldown in ({'timestamp__year': today.year}, {'timestamp__year': today.year, 'timestamp__month': today.month}):
+            response, queries = self.changelist(UserResponse, drilldown)
+            self.assertContains(response, 'date-back')
+            self.assertFalse(any('DISTINCT' in sql for sql in queries))
+
+    def test_changelists_defer_long_text(self):
+        response, queries = self.changelist(Insight)
+        self.assertContains(response, "Long insight text Long insight text Long insight t...")
+        listed = [sql for sql in queries if 'FROM "moodtracker_insight"' in sql and 'COUNT(' not in sql]
+        self.assertTrue(listed)
+        self.assertFalse(any('"moodtracker_insight"."content"' in sql for sql in listed))
+        for model in (Journaling, Gratitude, Goals, SwipeSession):
+            self.changelist(model)
+
+    def test_confidence_filter_uses_bands(self):
+        response, _ = self.changelist(Insight, {'confidence': 'high'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_paginator_estimates_unfiltered_counts(self):
+        queryset = UserResponse.objects.order_by('-timestamp')
+        with mock.patch.object(admin_helpers, 'estimated_row_count', return_value=2_000_000):
+            self.assertEqual(admin_helpers.EstimatedCountPaginator(queryset, 100).count, 2_000_000)
+            self.assertEqual(admin_helpers.EstimatedCountPaginator(queryset.filter(response=True), 100).count, 3)
+        with mock.patch.object(admin_helpers, 'estimated_row_count', return_value=500):
+            self.assertEqual(admin_helpers.EstimatedCountPaginator(queryset, 100).count, 3)
+        self.assertIsNone(admin_helpers.estimated_row_count(UserResponse))  # Not PostgreSQL
+
+
+probe_ran = threading.Event()
+
+
+@shared_task(name='mental_health_backend.tests.probe_task')
+def probe_task():
+    probe_ran.set()
+
+
+@override_settings(
+    CELERY_BROKER_URL='memory://',
+    CELERY_WORKER_HIJACK_ROOT_LOGGER=False,
+    CELERY_TASK_ROUTES={**settings.CELERY_TASK_ROUTES, probe_task.name: {'queue': 'email'}},
+)
+class CeleryTopologyTestCase(SimpleTestCase):
+    """
+    Routes and worker profiles against kombu's in-memory broker, with a worker running in a thread.
+    """
+
+    def setUp(self):
+        self.app = Celery('topology', set_as_current=False)
+        self.app.config_from_object('django.conf:settings', namespace='CELERY')
+        self.app.autodiscover_tasks(force=True)
+        # The embedded worker makes its app the current one
+        self.addCleanup(celery_app.set_default)
+        self.addCleanup(celery_app.set_current)
+        probe_ran.clear()
+        with self.app.connection_for_write() as conn:
+            for queue in self.app.amqp.queues.values():
+                queue(conn.default_channel).declare()
+                queue(conn.default_channel).purge()
+
+    def queued_tasks(self, queue):
+        names = []
+        with self.app.connection_for_read() as conn:
+            with conn.SimpleQueue(queue) as simple:
+                while simple.qsize():
+                    message = simple.get(timeout=1)
+                    names.append(message.headers['task'])
+                    message.ack()
+        return names
+
+    def test_routes(self):
+        args = {
+            'moodtracker.tasks.generate_insight_task': [1, 'prompt'],
+            'goals.tasks.send_activity_reminders': [[1, 2], '2026-01-01T09:00:00+00:00'],
+            'journaling.tasks.send_session_reminder': [1, '2026-01-01T09:00:00+00:00'],
+        }
+        for name, route in settings.CELERY_TASK_ROUTES.items():
+            self.app.tasks[name].apply_async(args=args.get(name, []))
+            self.assertEqual(self.queued_tasks(route['queue']), [name])
+
+    def test_tasks_ignore_results_and_ack_late(self):
+        for name in settings.CELERY_TASK_ROUTES:
+            task = self.app.tasks[name]
+            self.assertTrue(task.ignore_result, name)
+            self.assertTrue(task.acks_late, name)
+
+    def test_email_worker_not_blocked_by_inference_backlog(self):
+        for _ in range(3):
+            self.app.tasks['moodtracker.tasks.generate_insight_task'].delay(1, 'prompt')
+        self.app.tasks['moodtracker.tasks.send_swipe_reminders'].delay()
+        self.app.tasks[probe_task.name].delay()
+        worker = mock.Mock(app=self.app)
+        with mock.patch.dict(os.environ, {'CELERY_WORKER_PROFILE': 'email'}):
+            apply_worker_profile(instance=worker, conf=self.app.conf)
+        self.assertEqual(set(self.app.amqp.queues.consume_from), set(WORKER_PROFILES['email']['queues']))
+        self.assertEqual(self.app.conf.worker_prefetch_multiplier, WORKER_PROFILES['email']['prefetch_multiplier'])
+
+        with start_worker(self.app, perform_ping_check=False, shutdown_timeout=10):
+            self.assertTrue(probe_ran.wait(10))
+        self.assertEqual(len(self.queued_tasks('inference')), 3)
+        self.assertEqual(self.queued_tasks('batch'), ['moodtracker.tasks.send_swipe_reminders'])
+
+
+class LocalEventBusTestCase(SimpleTestCase):
+
+    async def test_publish_from_another_thread(self):
+        bus = LocalEventBus()
+        async with bus.subscribe('events:user:1') as subscription:
+            async with bus.subscribe('events:user:2') as other:
+                thread = threading.Thread(target=bus.publish, args=('events:user:1', b'event'))
+                thread.start()
+                thread.join()
+                self.assertEqual(await subscription.get(1), b'event')
+                self.assertIsNone(await other.get(0.01))
+        self.assertEqual(dict(bus.subscribers), {})
+        bus.publish('events:user:1', b'nobody listening')
+
+
+def embed_words(texts):
+    """
+    Stands in for the sentence model: a normalised bag of hashed words.
+    """
+    vectors = np.zeros((len(texts), 32), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.encode()) % 32] += 1
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+class VectorIndexTestCase(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        rng = np.random.default_rng(0)
+        # Points around 20 centres, as real embeddings cluster by topic
+        centres = rng.normal(size=(20, 16))
+        vectors = centres[rng.integers(0, 20, 3000)] + 0.2 * rng.normal(size=(3000, 16))
+        self.vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+        self.ids = np.arange(1, 3001)
+
+    def write(self, name, **finish):
+        writer = IndexWriter(os.path.join(self.root, name), 16, shard_size=1000)
+        for start in range(0, 3000, 700):  # Batches straddle shard boundaries
+            end = start + 700
+            writer.add(self.ids[start:end], self.ids[start:end] % 7, self.vectors[start:end])
+        writer.finish(**finish)
+        return VectorIndex(os.path.join(self.root, name))
+
+    def test_brute_force_is_exact(self):
+        index = self.write('flat', ivf_min_rows=10_000)
+        self.assertIsNone(index.centroids)
+        self.assertEqual([len(shard.ids) for shard in index.shards], [1000, 1000, 1000])
+        self.assertEqual(index.shards[0].vectors.dtype, np.float16)
+
+        query = self.vectors[42]
+        expected = self.ids[np.argsort(-(self.vectors @ query))[:5]]
+        results = index.search(query, k=5)
+        self.assertEqual([id for id, _ in results], list(expected))
+        self.assertAlmostEqual(results[0][1], 1.0, places=2)
+        np.testing.assert_allclose(index.vector(43), self.vectors[42], atol=1e-3)
+        self.assertIsNone(index.vector(99999))
+
+    def test_ivf_recall_and_owner_search(self):
+        index = self.write('ivf', ivf_min_rows=1000)
+        self.assertEqual(len(index.centroids), int(4 * np.sqrt(3000)))
+        hits = 0
+        for row in range(0, 3000, 100):
+            exact = set(self.ids[np.argsort(-(self.vectors @ self.vectors[row]))[:10]])
+            hits += len(exact & {id for id, _ in index.search(self.vectors[row], k=10, nprobe=16)})
+        self.assertGreater(hits / 300, 0.9)
+        # Rows were reordered by list within each shard
+        for id in (1, 1000, 1001, 3000):
+            np.testing.assert_allclose(index.vector(id), self.vectors[id - 1], atol=1e-3)
+
+        results = index.search(self.vectors[0], k=5, owner=3, exclude=[3])
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(id % 7 == 3 and id != 3 for id, _ in results))
+        owned = self.ids % 7 == 3
+        best = self.ids[owned][np.argsort(-(self.vectors[owned] @ self.vectors[0]))]
+        self.assertEqual([id for id, _ in results], [id for id in best if id != 3][:5])
+
+    def test_publish_version(self):
+        self.assertIsNone(current_version(self.root))
+        self.write('v1', ivf_min_rows=10_000)
+        publish_version(self.root, 'v1')
+        self.write('v3', ivf_min_rows=10_000)  # A newer build still being written
+        self.write('v2', ivf_min_rows=10_000)
+        publish_version(self.root, 'v2')
+        self.assertEqual(current_version(self.root), 'v2')
+        self.assertEqual(sorted(os.listdir(self.root)), ['CURRENT', 'v2', 'v3'])
+
+    def test_build_lock(self):
+        with build_lock(self.root):
+            with self.assertRaises(IndexBusy), build_lock(self.root):
+                pass
+        with build_lock(self.root):
+            pass
+
+
+class SemanticSearchTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="searcher", email="searcher@example.com", password="password123")
+        cls.other_user = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        cls.prompts = Prompt.objects.bulk_create([
+            Prompt(text="I slept well last night", category="mood"),
+            Prompt(text="I slept badly last night", category="mood"),
+            Prompt(text="Work deadlines stress me", category="stress"),
+        ])
+        cls.entries = Journaling.objects.bulk_create([
+            Journaling(user=cls.user, entry_text="Long walk by the sea today"),
+            Journaling(user=cls.user, entry_text="Another walk by the sea"),
+            Journaling(user=cls.user, entry_text="Meetings all day at work"),
+            Journaling(user=cls.other_user, entry_text="Long walk by the sea today"),
+        ])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(EMBEDDING_INDEX_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(user=self.user)
+
+    def test_related_prompts(self):
+        url = reverse('prompt-related', args=[self.prompts[0].pk])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)  # Not built yet
+
+        with mock.patch.object(embeddings, 'get_embedder', return_value=embed_words):
+            call_command('build_embedding_index', 'prompts', stdout=io.StringIO())
+        response = self.client.get(url, {'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [related] = response.data['results']
+        self.assertEqual(related['id'], self.prompts[1].pk)
+        self.assertEqual(related['text'], "I slept badly last night")
+        self.assertGreater(related['score'], 0.5)
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_similar_journal_entries_are_the_users_own(self):
+        embeddings.build_index('journals', embed=embed_words)
+        response = self.client.get(reverse('journaling-similar', args=[self.entries[0].pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, [self.entries[1].pk, self.entries[2].pk])
+        self.assertEqual(response.data['results'][0]['preview'], "Another walk by the sea")
+
+        other = reverse('journaling-similar', args=[self.entries[3].pk])
+        self.assertEqual(self.client.get(other).status_code, status.HTTP_404_NOT_FOUND)
+        newer = Journaling.objects.create(user=self.user, entry_text="Written after the build")
+        response = self.client.get(reverse('journaling-similar', args=[newer.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -10,24 +10,12 @@ from django_rest_passwordreset.views import (
     reset_password_confirm,
 )
 
-from mental_health_backend.views import home  # Ensure you have a home view
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
-
-# Swagger schema configuration
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Mental Health App API",
-        default_version="v1",
-        description="API documentation for the Mental Health App",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="support@mentalhealthapp.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from django.conf import settings
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from django.views.decorators.csrf import csrf_exempt
+from users.views import BatchView, DashboardView, SyncView
+from mental_health_backend.views import home, metrics, RequestProfileView, AuthenticatedGraphQLView  # Ensure you have a home view
+from mental_health_backend.openapi import schema_json, schema_view
 
 urlpatterns = [
     # Admin site
@@ -45,13 +33,32 @@ urlpatterns = [
     # Gratitude-related URLs
     path('gratitude/', include('gratitude.urls')),  # Gratitude entries, compassion exercises
     
+    # Home screen summary
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+
+    # Delta sync for offline clients
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('batch/', BatchView.as_view(), name='batch'),
+
+    # Mood tracker URLs
+    path('moodtracker/', include('moodtracker.urls')),  # Swipe prompts, sessions, insights, progress
+
+    # GraphQL (token-authenticated, so CSRF does not apply)
+    path('graphql/', csrf_exempt(AuthenticatedGraphQLView.as_view(graphiql=settings.DEBUG)), name='graphql'),
+
     # Home view (optional, serves a landing page or basic response)
     path('', home, name='home'),
     
+    # Prometheus metrics
+    path('metrics', metrics, name='metrics'),
+
+    # Request profiling dump (staff only)
+    path('debug/profiling/', RequestProfileView.as_view(), name='request-profiling'),
+
     # API documentation
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),  # Swagger UI
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),  # ReDoc documentation
-    path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),  # Raw JSON schema
+    path('swagger.json', schema_json, name='schema-json'),  # Raw JSON schema, prebuilt (see mental_health_backend.openapi)
     
     # JWT Authentication Endpoints
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -63,3 +70,5 @@ urlpatterns = [
     path('api/password_reset/confirm/', reset_password_confirm, name='reset_password_confirm'),
 ]
 
+# Static files in development (DEBUG only), now that the web process is not runserver
+urlpatterns += staticfiles_urlpatterns()
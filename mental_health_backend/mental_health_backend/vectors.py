@@ -0,0 +1,289 @@
+# mental_health_backend/vectors.py
+"""
+Nearest-neighbour search over float16 vectors in memory-mapped NumPy files.
+
+An index is a directory written by :class:`IndexWriter`. It holds shards of up to
+``shard_size`` rows, each in ``.npy`` files: the vectors (float16, L2-normalised, so the dot
+product is the cosine similarity), the row IDs and the owner IDs (int64). Readers open them
+with ``mmap_mode='r'``, so opening is immediate and a search only reads the pages it scores.
+
+Until an index has ``ivf_min_rows`` rows, a search scores every row (brute force, in blocks
+converted to float32). From there on, :meth:`IndexWriter.finish` adds an IVF layer: k-means
+centroids trained on a sample, with each shard's rows reordered so every inverted list is a
+contiguous slice. A query then scores only the ``nprobe`` lists whose centroids are nearest,
+which trades a little recall for reading a small fraction of the index. Searching one
+owner's rows (``owner=``) skips the lists: the owner column is scanned and that owner's rows
+are scored exactly.
+"""
+import fcntl
+import json
+import math
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+META_FILE = 'meta.json'
+# Held (flock) by the process writing a new version under an index root
+LOCK_FILE = 'BUILD.lock'
+# Rows converted to float32 and scored at a time
+BLOCK_ROWS = 65536
+KMEANS_ITERATIONS = 10
+# Sample rows per centroid used to train the IVF layer
+SAMPLE_PER_LIST = 64
+
+
+def top_k(scores, ids, k):
+    """
+    The ``k`` highest ``scores`` and their ``ids``, best first.
+    """
+    if scores.size > k:
+        keep = np.argpartition(scores, -k)[-k:]
+        scores, ids = scores[keep], ids[keep]
+    order = np.argsort(-scores, kind='stable')
+    return scores[order], ids[order]
+
+
+def train_centroids(sample, nlist, seed=0):
+    """
+    Spherical k-means: ``nlist`` unit-length centroids for the float32 rows of ``sample``.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # A list left empty is restarted on a random row
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms[empty] = 1
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+def assign_lists(vectors, centroids):
+    return np.concatenate([
+        np.argmax(np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float32) @ centroids.T, axis=1)
+        for start in range(0, len(vectors), BLOCK_ROWS)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+
+class IndexWriter:
+    """
+    Writes an index to ``path`` (a new directory). Call :meth:`add` with batches of rows, then
+    :meth:`finish` once.
+    """
+
+    def __init__(self, path, dim, shard_size=100_000):
+        self.path = Path(path)
+        self.dim = dim
+        self.shard_size = shard_size
+        self.path.mkdir(parents=True)
+        self.pending = []
+        self.pending_rows = 0
+        self.shards = []
+
+    def add(self, ids, owners, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        self.pending.append((np.asarray(ids, dtype=np.int64), np.asarray(owners, dtype=np.int64), vectors))
+        self.pending_rows += len(vectors)
+        while self.pending_rows >= self.shard_size:
+            self.flush(self.shard_size)
+
+    def flush(self, rows):
+        ids, owners, vectors = (np.concatenate(parts) for parts in zip(*self.pending))
+        rest = (ids[rows:], owners[rows:], vectors[rows:])
+        self.pending = [rest] if len(rest[0]) else []
+        self.pending_rows = len(rest[0])
+
+        name = f'shard-{len(self.shards):05d}'
+        np.save(self.path / f'{name}.vectors.npy', vectors[:rows].astype(np.float16))
+        np.save(self.path / f'{name}.ids.npy', ids[:rows])
+        np.save(self.path / f'{name}.owners.npy', owners[:rows])
+        self.shards.append({'name': name, 'rows': int(min(rows, len(ids)))})
+
+    def finish(self, ivf_min_rows=200_000, nlist=None, seed=0):
+        """
+        Writes the remaining rows and the metadata, and adds the IVF layer once the index has
+        ``ivf_min_rows`` rows (``nlist`` lists, by default about ``4 * sqrt(rows)``).
+        """
+        if self.pending_rows:
+            self.flush(self.pending_rows)
+        rows = sum(shard['rows'] for shard in self.shards)
+        if rows and rows >= ivf_min_rows:
+            nlist = self.build_ivf(rows, nlist or max(1, int(4 * math.sqrt(rows))), seed)
+        else:
+            nlist = None
+        with open(self.path / META_FILE, 'w') as handle:
+            json.dump({'dim': self.dim, 'rows': rows, 'nlist': nlist, 'shards': self.shards}, handle)
+
+    def build_ivf(self, rows, nlist, seed):
+        rng = np.random.default_rng(seed)
+        share = min(1.0, nlist * SAMPLE_PER_LIST / rows)
+        sample = np.concatenate([
+            np.load(self.path / f"{shard['name']}.vectors.npy", mmap_mode='r')[
+                np.sort(rng.choice(shard['rows'], max(1, int(shard['rows'] * share)), replace=False))
+            ].astype(np.float32)
+            for shard in self.shards
+        ])
+        centroids = train_centroids(sample, min(nlist, len(sample)), seed)
+        np.save(self.path / 'centroids.npy', centroids)
+
+        for shard in self.shards:
+            base = self.path / shard['name']
+            vectors = np.load(f'{base}.vectors.npy')
+            assignment = assign_lists(vectors, centroids)
+            order = np.argsort(assignment, kind='stable')
+            for suffix, values in (('vectors', vectors), ('ids', np.load(f'{base}.ids.npy')), ('owners', np.load(f'{base}.owners.npy'))):
+                np.save(f'{base}.{suffix}.npy', values[order])
+            offsets = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+            np.save(f'{base}.offsets.npy', offsets)
+        return len(centroids)
+
+
+class Shard:
+
+    def __init__(self, base, ivf):
+        self.vectors = np.load(f'{base}.vectors.npy', mmap_mode='r')
+        self.ids = np.load(f'{base}.ids.npy', mmap_mode='r')
+        self.owners = np.load(f'{base}.owners.npy', mmap_mode='r')
+        self.offsets = np.load(f'{base}.offsets.npy') if ivf else None
+
+
+class VectorIndex:
+    """
+    A read-only index written by :class:`IndexWriter`.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE) as handle:
+            meta = json.load(handle)
+        self.dim = meta['dim']
+        self.rows = meta['rows']
+        ivf = meta['nlist'] is not None
+        self.centroids = np.load(self.path / 'centroids.npy') if ivf else None
+        self.shards = [Shard(self.path / shard['name'], ivf) for shard in meta['shards']]
+        # First row of each shard, counting across shards
+        self.starts = np.cumsum([0] + [shard['rows'] for shard in meta['shards']])
+        self.lookup = None
+
+    def __len__(self):
+        return self.rows
+
+    def vector(self, id):
+        """
+        The stored vector for ``id`` (as float32), or ``None`` if it is not in the index.
+        """
+        if self.lookup is None:
+            # Built on first use: every ID sorted, with its row across shards
+            ids = np.concatenate([np.asarray(shard.ids) for shard in self.shards]) if self.shards else np.empty(0, dtype=np.int64)
+            order = np.argsort(ids, kind='stable')
+            self.lookup = ids[order], order
+        sorted_ids, order = self.lookup
+        position = int(np.searchsorted(sorted_ids, id))
+        if position == len(sorted_ids) or sorted_ids[position] != id:
+            return None
+        row = int(order[position])
+        shard = int(np.searchsorted(self.starts, row, side='right')) - 1
+        return np.asarray(self.shards[shard].vectors[row - self.starts[shard]], dtype=np.float32)
+
+    def search(self, query, k=10, nprobe=8, owner=None, exclude=()):
+        """
+        The ``k`` rows most similar to ``query`` as ``[(id, score), ...]``, best first.
+
+        ``owner`` restricts the search to that owner's rows (scored exactly), ``exclude`` drops
+        the given IDs. Otherwise, with an IVF layer, only the ``nprobe`` nearest lists are scored.
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        exclude = np.asarray(list(exclude), dtype=np.int64)
+        best_scores, best_ids = np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        def consider(vectors, ids):
+            nonlocal best_scores, best_ids
+            scores = np.asarray(vectors, dtype=np.float32) @ query
+            ids = np.asarray(ids)
+            if exclude.size:
+                keep = ~np.isin(ids, exclude)
+                scores, ids = scores[keep], ids[keep]
+            best_scores, best_ids = top_k(np.concatenate([best_scores, scores]), np.concatenate([best_ids, ids]), k)
+
+        for shard, rows in self.candidates(query, nprobe, owner):
+            if isinstance(rows, slice):
+                for start in range(rows.start, rows.stop, BLOCK_ROWS):
+                    block = slice(start, min(start + BLOCK_ROWS, rows.stop))
+                    consider(shard.vectors[block], shard.ids[block])
+            else:
+                consider(shard.vectors[rows], shard.ids[rows])
+        return [(int(id), float(score)) for id, score in zip(best_ids, best_scores)]
+
+    def candidates(self, query, nprobe, owner):
+        """
+        Yields ``(shard, rows)`` to score: a slice of rows, or an array of row numbers.
+        """
+        if owner is not None:
+            for shard in self.shards:
+                rows = np.flatnonzero(shard.owners == owner)
+                if rows.size:
+                    yield shard, rows
+        elif self.centroids is not None:
+            lists = np.argsort(-(self.centroids @ query))[:nprobe]
+            for shard in self.shards:
+                for index in lists:
+                    start, end = int(shard.offsets[index]), int(shard.offsets[index + 1])
+                    if end > start:
+                        yield shard, slice(start, end)
+        else:
+            for shard in self.shards:
+                yield shard, slice(0, len(shard.ids))
+
+
+class IndexBusy(Exception):
+    """
+    Another process is writing a version under the same index root.
+    """
+
+
+@contextmanager
+def build_lock(root):
+    """
+    Held while a new version is written and published under ``root``. Raises
+    :class:`IndexBusy` at once, rather than waiting, when another build holds it.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK_FILE, 'w') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise IndexBusy(f'{root} is being built by another process') from None
+        yield  # Released when the file is closed
+
+
+def publish_version(root, version):
+    """
+    Makes ``root/version`` the current index under ``root`` and removes the versions older
+    than it (version names sort by age).
+
+    ``CURRENT`` is replaced atomically; processes that already mapped an older version keep
+    reading it until they reopen.
+    """
+    root = Path(root)
+    temporary = root / 'CURRENT.tmp'
+    temporary.write_text(version)
+    os.replace(temporary, root / 'CURRENT')
+    for path in root.iterdir():
+        if path.is_dir() and path.name < version:
+            for child in path.iterdir():
+                child.unlink()
+            path.rmdir()
+
+
+def current_version(root):
+    try:
+        return (Path(root) / 'CURRENT').read_text().strip() or None
+    except FileNotFoundError:
+        return None
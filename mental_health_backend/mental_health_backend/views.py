@@ -1,4 +1,76 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from graphene_django.views import GraphQLView
+from rest_framework import exceptions, permissions, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .metrics import render_metrics
+from .profiling import collector
 
 def home(request):
     return render(request, "home.html", {})
+
+
+def metrics(request):
+    """
+    Prometheus exposition endpoint, only served when ``METRICS_ENABLED``. Guarded by
+    ``METRICS_AUTH_TOKEN`` when it is set.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_AUTH_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not constant_time_compare(supplied, settings.METRICS_AUTH_TOKEN):
+            return HttpResponseForbidden()
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+class RequestProfileView(APIView):
+    """
+    Staff-only dump of the slowest routes and their worst query fingerprints.
+
+    Query parameters: ``limit`` (routes, default 10) and ``queries`` (fingerprints per route, default 5).
+    DELETE clears the collected data.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            queries = int(request.query_params.get('queries', 5))
+        except ValueError:
+            return Response({'error': 'limit and queries must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'routes': collector.report(limit=limit, fingerprints=queries)}, status=status.HTTP_200_OK)
+
+    def delete(self, request, format=None):
+        collector.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AuthenticatedGraphQLView(GraphQLView):
+    """
+    GraphQL endpoint authenticated the same way as the REST API (JWT by default).
+
+    The GraphiQL page itself renders without credentials when enabled; queries always need a user.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not (self.graphiql and request.method == 'GET' and self.request_wants_html(request)):
+            authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+            try:
+                user = Request(request, authenticators=authenticators).user
+            except exceptions.AuthenticationFailed as exc:
+                return JsonResponse({'errors': [{'message': str(exc.detail)}]}, status=status.HTTP_401_UNAUTHORIZED)
+            if not user.is_authenticated:
+                return JsonResponse(
+                    {'errors': [{'message': 'Authentication credentials were not provided.'}]},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            request.user = user
+        return super().dispatch(request, *args, **kwargs)
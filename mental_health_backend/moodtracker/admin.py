@@ -1,5 +1,30 @@
 from django.contrib import admin
+from mental_health_backend.admin import LargeTableAdmin
 from .models import Prompt, UserResponse, Insight, SwipeSession
+from .review import review_insights
+
+
+class ConfidenceFilter(admin.SimpleListFilter):
+    """
+    Filters insights by confidence band instead of listing every distinct score.
+    """
+    title = 'confidence'
+    parameter_name = 'confidence'
+    BANDS = {
+        'low': ('Low (< 0.4)', {'confidence_score__lt': 0.4}),
+        'medium': ('Medium (0.4 - 0.7)', {'confidence_score__gte': 0.4, 'confidence_score__lt': 0.7}),
+        'high': ('High (>= 0.7)', {'confidence_score__gte': 0.7}),
+        'none': ('Not scored', {'confidence_score__isnull': True}),
+    }
+
+    def lookups(self, request, model_admin):
+        return [(value, label) for value, (label, _) in self.BANDS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() in self.BANDS:
+            return queryset.filter(**self.BANDS[self.value()][1])
+        return queryset
+
 
 @admin.register(Prompt)
 class PromptAdmin(admin.ModelAdmin):
@@ -22,45 +47,65 @@ class PromptAdmin(admin.ModelAdmin):
     )
 
 @admin.register(UserResponse)
-class UserResponseAdmin(admin.ModelAdmin):
+class UserResponseAdmin(LargeTableAdmin):
     """
     Admin interface for the UserResponse model.
     """
     list_display = ('user', 'prompt', 'response', 'timestamp', 'session')
+    list_select_related = ('user', 'prompt', 'session__user')
     search_fields = ('user__username', 'prompt__text')
-    list_filter = ('response', 'timestamp', 'session')
+    list_filter = ('response',)
+    date_hierarchy = 'timestamp'
     ordering = ('-timestamp',)
+    raw_id_fields = ('user', 'session')
     readonly_fields = ('timestamp',)
     fields = ('user', 'prompt', 'response', 'session', 'timestamp', 'feedback')
 
 @admin.register(Insight)
-class InsightAdmin(admin.ModelAdmin):
+class InsightAdmin(LargeTableAdmin):
     """
     Admin interface for the Insight model.
     """
-    list_display = ('user', 'short_content', 'generated_at', 'confidence_score', 'reviewed')
-    search_fields = ('user__username', 'content')
-    list_filter = ('generated_at', 'confidence_score', 'reviewed')
+    list_display = ('user', 'short_content', 'generated_at', 'confidence_score', 'reviewed', 'approved')
+    list_select_related = ('user',)
+    list_defer = ('content',)
+    search_fields = ('user__username',)
+    list_filter = (ConfidenceFilter, 'reviewed', 'approved')
+    date_hierarchy = 'generated_at'
     ordering = ('-generated_at',)
-    readonly_fields = ('user', 'content', 'generated_at', 'confidence_score', 'reviewed')
-    fields = ('user', 'content', 'confidence_score', 'generated_at', 'reviewed')
+    readonly_fields = ('user', 'content', 'generated_at', 'confidence_score', 'reviewed', 'approved', 'reviewed_at', 'reviewed_by')
+    fields = ('user', 'content', 'confidence_score', 'generated_at', 'reviewed', 'approved', 'reviewed_at', 'reviewed_by')
+    actions = ('approve_insights', 'reject_insights')
+
+    @admin.action(description='Approve selected insights')
+    def approve_insights(self, request, queryset):
+        count = review_insights(queryset, True, request.user)
+        self.message_user(request, f"{count} insights approved.")
+
+    @admin.action(description='Reject selected insights')
+    def reject_insights(self, request, queryset):
+        count = review_insights(queryset, False, request.user)
+        self.message_user(request, f"{count} insights rejected.")
 
     def short_content(self, obj):
         """
-        Returns a truncated version of the insight content for display.
+        Returns a truncated version of the insight content for display, from the stored preview.
         """
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
+        return obj.preview[:50] + "..." if len(obj.preview) > 50 else obj.preview
 
     short_content.short_description = 'Content Preview'
 
 @admin.register(SwipeSession)
-class SwipeSessionAdmin(admin.ModelAdmin):
+class SwipeSessionAdmin(LargeTableAdmin):
     """
     Admin interface for the SwipeSession model.
     """
     list_display = ('user', 'created_at', 'completed')
+    list_select_related = ('user',)
     search_fields = ('user__username',)
-    list_filter = ('completed', 'created_at')
+    list_filter = ('completed',)
+    date_hierarchy = 'created_at'
     ordering = ('-created_at',)
     readonly_fields = ('created_at',)
+    raw_id_fields = ('user',)
     fields = ('user', 'created_at', 'completed')
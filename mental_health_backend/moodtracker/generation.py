@@ -0,0 +1,64 @@
+# moodtracker/generation.py
+"""
+Insight text from a model loaded in the worker (``INSIGHT_MODEL_BACKEND = 'local'``).
+
+The model named by ``INSIGHT_LOCAL_MODEL`` is loaded once per worker process, on first use.
+Generation runs in a background thread and :func:`stream_generation` yields the text in
+pieces as the model produces them, so callers can forward them before the insight is done.
+Sampling parameters match those sent to the Inference API by the ``api`` backend.
+"""
+from functools import lru_cache
+from threading import Thread
+
+from django.conf import settings
+
+MAX_NEW_TOKENS = 150
+# Seconds to wait for the next piece of text before giving up on a stalled generation
+PIECE_TIMEOUT = 60
+
+
+@lru_cache(maxsize=None)
+def load_model(name):
+    # transformers (and torch) are only needed by workers running the local backend
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForCausalLM.from_pretrained(name)
+    return tokenizer, model
+
+
+def stream_generation(prompt_text):
+    """
+    Yields the text generated for ``prompt_text`` (without the prompt) piece by piece.
+
+    Re-raises an exception raised by the model, and raises ``queue.Empty`` when no piece
+    arrives within ``PIECE_TIMEOUT`` seconds.
+    """
+    from transformers import TextIteratorStreamer
+    tokenizer, model = load_model(settings.INSIGHT_LOCAL_MODEL)
+    inputs = tokenizer(prompt_text, return_tensors='pt')
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=PIECE_TIMEOUT)
+    errors = []
+
+    def generate():
+        try:
+            model.generate(
+                **inputs,
+                streamer=streamer,
+                max_new_tokens=MAX_NEW_TOKENS,
+                do_sample=True,
+                temperature=0.7,
+                top_p=0.9,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+        except Exception as err:
+            errors.append(err)
+            streamer.end()  # Otherwise the reader waits for text that never comes
+
+    thread = Thread(target=generate, daemon=True)
+    thread.start()
+    try:
+        yield from streamer
+    finally:
+        thread.join(PIECE_TIMEOUT)
+    if errors:
+        raise errors[0]
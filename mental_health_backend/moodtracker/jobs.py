@@ -0,0 +1,89 @@
+# moodtracker/jobs.py
+"""
+In-flight tracking for insight generation.
+
+A user has at most one generation queued or running. The first request claims a per-user
+lock with ``cache.add`` (only one caller can win it) holding a new job ID, and enqueues the
+task; requests arriving while the lock is held are given the same job ID instead of another
+model call. The job's state is kept in the cache under its ID for ``INSIGHT_JOB_TIMEOUT``
+seconds so clients can poll it, and each change is pushed to the user's event stream as a
+``job`` event (see mental_health_backend.events). The task releases the lock when it
+finishes, and ``INSIGHT_JOB_LOCK_TIMEOUT`` bounds how long a lost task (its worker died)
+blocks new requests.
+"""
+from uuid import uuid4
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from mental_health_backend.events import publish
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+
+def lock_key(user_id):
+    return f'insight-job:lock:{user_id}'
+
+
+def job_key(job_id):
+    return f'insight-job:{job_id}'
+
+
+def job_state(user_id, status, **fields):
+    return {'user_id': user_id, 'status': status, **fields}
+
+
+def job_event(job_id, status, insight_id=None):
+    return {'job_id': job_id, 'status': status, 'insight_id': insight_id}
+
+
+async def aclaim_job(user_id):
+    """
+    Returns ``(job_id, created)``: a new pending job for the caller to enqueue, or the job
+    already in flight for this user.
+    """
+    job_id = str(uuid4())
+    # Written first, so a duplicate request polling the ID it is given always finds it
+    await cache.aset(job_key(job_id), job_state(user_id, PENDING), settings.INSIGHT_JOB_TIMEOUT)
+    while True:
+        if await cache.aadd(lock_key(user_id), job_id, settings.INSIGHT_JOB_LOCK_TIMEOUT):
+            return job_id, True
+        pending = await cache.aget(lock_key(user_id))
+        if pending is not None:
+            await cache.adelete(job_key(job_id))
+            return pending, False
+        # Released between the two calls; claim it again
+
+
+def get_job(job_id):
+    return cache.get(job_key(job_id))
+
+
+async def aget_job(job_id):
+    return await cache.aget(job_key(job_id))
+
+
+def set_job_status(job_id, user_id, status, **fields):
+    cache.set(job_key(job_id), job_state(user_id, status, **fields), settings.INSIGHT_JOB_TIMEOUT)
+    publish(user_id, 'job', job_event(job_id, status, fields.get('insight_id')))
+
+
+def release_job(user_id, job_id):
+    # Only the lock's own job releases it: once this job's lock expired, a newer job may hold it
+    if cache.get(lock_key(user_id)) == job_id:
+        cache.delete(lock_key(user_id))
+
+
+async def afail_job(user_id, job_id):
+    """
+    Marks a job that could not be enqueued as failed and frees the user's lock.
+    """
+    await cache.aset(job_key(job_id), job_state(user_id, FAILED), settings.INSIGHT_JOB_TIMEOUT)
+    if await cache.aget(lock_key(user_id)) == job_id:
+        await cache.adelete(lock_key(user_id))
+    await sync_to_async(publish, thread_sensitive=False)(user_id, 'job', job_event(job_id, FAILED))
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:40
+
+import mental_health_backend.fields
+from django.db import migrations, models
+
+from mental_health_backend.fields import copy_field_values
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moodtracker", "0001_initial"),
+    ]
+
+    operations = [
+        # Nullable while both columns exist, so reversing can re-add it empty and copy the text back.
+        migrations.AlterField(model_name="insight", name="content", field=models.TextField(null=True)),
+        migrations.AddField(
+            model_name="insight",
+            name="content_compressed",
+            field=mental_health_backend.fields.CompressedTextField(null=True),
+        ),
+        migrations.RunPython(
+            copy_field_values("moodtracker", "Insight", [("content", "content_compressed")]),
+            copy_field_values("moodtracker", "Insight", [("content_compressed", "content")]),
+        ),
+        migrations.RemoveField(model_name="insight", name="content"),
+        migrations.RenameField(model_name="insight", old_name="content_compressed", new_name="content"),
+        migrations.AlterField(
+            model_name="insight",
+            name="content",
+            field=mental_health_backend.fields.CompressedTextField(),
+        ),
+    ]
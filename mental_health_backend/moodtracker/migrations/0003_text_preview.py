@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:52
+
+import mental_health_backend.fields
+from django.db import migrations
+
+from mental_health_backend.fields import fill_previews
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moodtracker", "0002_compress_insight_content"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="insight",
+            name="preview",
+            field=mental_health_backend.fields.TextPreviewField(blank=True, default="", editable=False, max_length=200, source="content"),
+        ),
+        migrations.RunPython(fill_previews("moodtracker", "Insight", "preview"), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moodtracker", "0003_text_preview"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="insight",
+            name="generated_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="swipesession",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="userresponse",
+            name="timestamp",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moodtracker", "0004_admin_date_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="insight",
+            name="approved",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="insight",
+            name="reviewed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="insight",
+            name="reviewed_by",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name="insight",
+            index=models.Index(condition=models.Q(("reviewed", False)), fields=["generated_at", "id"], name="moodtracker_insight_queue_idx"),
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
 from django.conf import settings
+from mental_health_backend.fields import CompressedTextField, TextPreviewField
 from django.utils import timezone
 
+# Cache key holding the serialized prompt catalog (see moodtracker.views.aget_prompt_catalog)
+PROMPT_CATALOG_CACHE_KEY = 'moodtracker:prompt_catalog'
+
 class Prompt(models.Model):
     """
     Stores the self-reflective statements or questions presented to users.
@@ -31,7 +35,7 @@ class SwipeSession(models.Model):
         on_delete=models.CASCADE,
         related_name='swipe_sessions'
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # Admin date hierarchy
     completed = models.BooleanField(default=False)
 
     def __str__(self):
@@ -52,7 +56,7 @@ class UserResponse(models.Model):
         related_name='responses'
     )
     response = models.BooleanField()  # True for right swipe, False for left swipe
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)  # Admin date hierarchy
     session = models.ForeignKey(
         SwipeSession,
         on_delete=models.CASCADE,
@@ -76,10 +80,26 @@ class Insight(models.Model):
         on_delete=models.CASCADE,
         related_name='insights'
     )
-    content = models.TextField()
-    generated_at = models.DateTimeField(auto_now_add=True)
+    content = CompressedTextField()
+    preview = TextPreviewField(source='content')  # Served by list views instead of the full text
+    generated_at = models.DateTimeField(auto_now_add=True, db_index=True)  # Admin date hierarchy
     confidence_score = models.FloatField(null=True, blank=True)  # Optional field for AI confidence
     reviewed = models.BooleanField(default=False)  # Indicates if the insight has been reviewed by admin
+    approved = models.BooleanField(null=True, blank=True)  # The review decision; null until reviewed
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    class Meta:
+        indexes = [
+            # The review queue: unreviewed insights, oldest first (see moodtracker.review)
+            models.Index(fields=['generated_at', 'id'], condition=models.Q(reviewed=False), name='moodtracker_insight_queue_idx'),
+        ]
 
     def __str__(self):
         return f"Insight for {self.user.username} at {self.generated_at.strftime('%Y-%m-%d %H:%M:%S')}"
@@ -0,0 +1,56 @@
+# moodtracker/review.py
+"""
+Admin review of generated insights.
+
+The queue is every unreviewed insight, oldest first, read with keyset pagination over the
+partial index ``moodtracker_insight_queue_idx``. A batch of decisions is written with one
+``UPDATE``; ``update()`` sends no ``post_save``, so the change log entries for delta sync and
+the dashboard invalidation are written here (as in users.batch).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.pagination import CursorPagination
+
+from mental_health_backend.metrics import INSIGHT_REVIEW_DELAY, INSIGHTS_REVIEWED
+from users.dashboard import bump_version
+from users.models import ChangeLog
+
+from .models import Insight
+
+MAX_REVIEW_BATCH = 500
+
+
+class ReviewQueuePagination(CursorPagination):
+    ordering = ('generated_at', 'id')
+    page_size = 50
+
+
+def review_queue():
+    return Insight.objects.filter(reviewed=False)
+
+
+def review_insights(queryset, approved, reviewer):
+    """
+    Records ``approved`` as the decision for every insight in ``queryset``. Returns how many were updated.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values_list('pk', 'user_id', 'generated_at'))
+        if not rows:
+            return 0
+        updated = Insight.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            reviewed=True, approved=approved, reviewed_at=now, reviewed_by=reviewer,
+        )
+        by_user = defaultdict(list)
+        for pk, user_id, _ in rows:
+            by_user[user_id].append(('insights', pk, False))
+        for user_id, entries in by_user.items():
+            ChangeLog.objects.record_many(user_id, entries)
+            transaction.on_commit(lambda user_id=user_id: bump_version(user_id))
+
+    INSIGHTS_REVIEWED.labels('approved' if approved else 'rejected').inc(updated)
+    for _, _, generated_at in rows:
+        INSIGHT_REVIEW_DELAY.observe(max((now - generated_at).total_seconds(), 0))
+    return updated
@@ -0,0 +1,55 @@
+# moodtracker/schema.py
+import graphene
+from graphene_django import DjangoObjectType
+
+from mental_health_backend.loaders import batch_by_foreign_key, batch_by_pk, load_related, mark_siblings
+from .models import Prompt, SwipeSession, UserResponse, Insight
+
+
+class PromptType(DjangoObjectType):
+    class Meta:
+        model = Prompt
+        fields = ('id', 'text', 'category', 'created_at', 'updated_at')
+        convert_choices_to_enum = False
+
+
+class UserResponseType(DjangoObjectType):
+    prompt = graphene.Field(PromptType, required=True)
+
+    class Meta:
+        model = UserResponse
+        fields = ('id', 'response', 'timestamp', 'feedback')
+
+    def resolve_prompt(root, info):
+        return load_related(info, 'prompt', root, 'prompt_id', batch_by_pk(Prompt.objects.all()))
+
+
+class SwipeSessionType(DjangoObjectType):
+    responses = graphene.List(graphene.NonNull(UserResponseType), required=True)
+
+    class Meta:
+        model = SwipeSession
+        fields = ('id', 'created_at', 'completed')
+
+    def resolve_responses(root, info):
+        return load_related(
+            info, 'session.responses', root, 'pk',
+            batch_by_foreign_key(UserResponse.objects.all(), 'session_id', ['timestamp', 'id']),
+            default=[],
+        )
+
+
+class InsightType(DjangoObjectType):
+    class Meta:
+        model = Insight
+        fields = ('id', 'content', 'generated_at', 'confidence_score', 'reviewed')
+
+
+class Query(graphene.ObjectType):
+    prompts = graphene.List(graphene.NonNull(PromptType), required=True, category=graphene.String())
+
+    def resolve_prompts(root, info, category=None):
+        prompts = Prompt.objects.order_by('id')
+        if category:
+            prompts = prompts.filter(category=category)
+        return mark_siblings(prompts)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Prompt, UserResponse, Insight, SwipeSession
+from .review import MAX_REVIEW_BATCH
 
 class PromptSerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,3 +26,7 @@ class InsightSerializer(serializers.ModelSerializer):
         model = Insight
         fields = ['id', 'user', 'content', 'generated_at', 'confidence_score', 'reviewed']
         read_only_fields = ['user', 'content', 'generated_at', 'confidence_score', 'reviewed']
+
+class InsightReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=MAX_REVIEW_BATCH)
+    approved = serializers.BooleanField()
@@ -0,0 +1,24 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from mental_health_backend.events import publish
+from .models import Insight, Prompt, PROMPT_CATALOG_CACHE_KEY
+
+
+@receiver([post_save, post_delete], sender=Prompt)
+def invalidate_prompt_catalog(sender, **kwargs):
+    """
+    Drops the cached prompt catalog whenever a prompt is created, edited or removed.
+    """
+    cache.delete(PROMPT_CATALOG_CACHE_KEY)
+
+
+@receiver(post_save, sender=Insight)
+def announce_insight(sender, instance, created, **kwargs):
+    """
+    Pushes an ``insight`` event to the owner's open event streams once a new insight is committed.
+    """
+    if created:
+        data = {'id': instance.pk, 'preview': instance.preview, 'generated_at': instance.generated_at}
+        transaction.on_commit(lambda: publish(instance.user_id, 'insight', data), robust=True)
@@ -1,25 +1,105 @@
 # moodtracker/tasks.py
 
+import logging
+import time
+
 from celery import shared_task
 from django.contrib.auth import get_user_model
+from .generation import stream_generation
+from .jobs import FAILED, FINISHED, RUNNING, SUCCEEDED, get_job, release_job, set_job_status
 from .models import Insight, SwipeSession
 import requests
 from django.conf import settings
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
+from mental_health_backend.delivery import delivery_key, sending
+from mental_health_backend.events import publish
+from mental_health_backend.metrics import INSIGHT_API_LATENCY
+
+logger = logging.getLogger(__name__)
 
 @shared_task
-def generate_insight_task(user_id, prompt_text, session_id=None):
+def generate_insight_task(user_id, prompt_text, session_id=None, job_id=None):
     """
     Generates an AI-driven insight based on user responses and emails it to the user.
+
+    With a ``job_id`` (see moodtracker.jobs), records the job's progress and releases the
+    user's in-flight lock when done. A redelivered job runs only if it never started: one
+    interrupted while running (its insight may already exist and be emailed) is marked failed.
+    """
+    if job_id is None:
+        generate_insight(user_id, prompt_text, session_id)
+        return
+
+    job = get_job(job_id)
+    if job is not None and job['status'] in FINISHED:
+        return  # Redelivered after it already ran
+    if job is not None and job['status'] == RUNNING:
+        set_job_status(job_id, user_id, FAILED)
+        release_job(user_id, job_id)
+        return
+    set_job_status(job_id, user_id, RUNNING)
+    try:
+        insight = generate_insight(user_id, prompt_text, session_id, job_id)
+    except Exception:
+        set_job_status(job_id, user_id, FAILED)
+        raise
+    else:
+        set_job_status(job_id, user_id, SUCCEEDED, insight_id=insight.pk if insight else None)
+    finally:
+        release_job(user_id, job_id)
+
+
+def generate_insight(user_id, prompt_text, session_id=None, job_id=None):
+    """
+    Returns the new insight, or ``None`` if the user no longer exists.
     """
     User = get_user_model()
     try:
         user = User.objects.get(id=user_id)
     except User.DoesNotExist:
-        return
+        return None
+
+    if settings.INSIGHT_MODEL_BACKEND == 'local':
+        insight_content = stream_insight_text(user.id, prompt_text, job_id)
+    else:
+        insight_content = request_insight_text(prompt_text)
 
+    # Save the insight
+    insight = Insight.objects.create(
+        user=user,
+        content=insight_content,
+        generated_at=timezone.now(),
+        confidence_score=None,  # Hugging Face Inference API may not provide confidence scores directly
+    )
+
+    # Optionally, associate the insight with the swipe session
+    if session_id:
+        try:
+            session = SwipeSession.objects.get(id=session_id, user=user, completed=False)
+            # If linking is desired, add a ForeignKey or ManyToManyField
+            # For simplicity, this example does not establish the link
+        except SwipeSession.DoesNotExist:
+            pass
+
+    # Send the insight via email
+    subject = 'Your Personalized Mental Health Insight'
+    message = render_to_string('emails/insight_email.html', {'user': user, 'insight': insight})
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        fail_silently=False,
+    )
+    return insight
+
+
+def request_insight_text(prompt_text):
+    """
+    Generates the insight text with the Hugging Face Inference API.
+    """
     # Hugging Face Inference API URL for the selected model
     model_name = "gpt2"  # Replace with your chosen model
     API_URL = f"https://api-inference.huggingface.co/models/{model_name}"
@@ -40,6 +120,8 @@ def generate_insight_task(user_id, prompt_text, session_id=None):
     }
 
     # Call the Hugging Face Inference API
+    started = time.perf_counter()
+    outcome = 'success'
     try:
         response = requests.post(API_URL, headers=headers, json=payload)
         response.raise_for_status()  # Raises stored HTTPError, if one occurred.
@@ -47,39 +129,33 @@ def generate_insight_task(user_id, prompt_text, session_id=None):
         # Extract the generated text
         insight_content = data[0]['generated_text'].strip()
     except requests.exceptions.HTTPError as http_err:
+        outcome = 'http_error'
         print(f"HTTP error occurred: {http_err}")
         insight_content = "We're experiencing issues generating your insight. Please try again later."
     except Exception as err:
+        outcome = 'error'
         print(f"An error occurred: {err}")
         insight_content = "An error occurred while generating your insight. Please try again later."
+    finally:
+        INSIGHT_API_LATENCY.labels(outcome=outcome).observe(time.perf_counter() - started)
+    return insight_content
 
-    # Save the insight
-    insight = Insight.objects.create(
-        user=user,
-        content=insight_content,
-        generated_at=timezone.now(),
-        confidence_score=None,  # Hugging Face Inference API may not provide confidence scores directly
-    )
-
-    # Optionally, associate the insight with the swipe session
-    if session_id:
-        try:
-            session = SwipeSession.objects.get(id=session_id, user=user, completed=False)
-            # If linking is desired, add a ForeignKey or ManyToManyField
-            # For simplicity, this example does not establish the link
-        except SwipeSession.DoesNotExist:
-            pass
 
-    # Send the insight via email
-    subject = 'Your Personalized Mental Health Insight'
-    message = render_to_string('emails/insight_email.html', {'user': user, 'insight': insight})
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-    )
+def stream_insight_text(user_id, prompt_text, job_id=None):
+    """
+    Generates the insight text with the local model, pushing each piece to the user's event
+    stream as a ``token`` event as it is produced.
+    """
+    pieces = []
+    try:
+        for piece in stream_generation(prompt_text):
+            if piece:
+                pieces.append(piece)
+                publish(user_id, 'token', {'job_id': job_id, 'text': piece})
+    except Exception:
+        logger.exception("Local insight generation failed", extra={'user_id': user_id, 'job_id': job_id})
+        return "An error occurred while generating your insight. Please try again later."
+    return ''.join(pieces).strip()
 
 @shared_task
 def send_swipe_reminders():
@@ -92,12 +168,16 @@ def send_swipe_reminders():
         # Check if the user hasn't completed a swipe session today
         today = timezone.now().date()
         if not user.swipe_sessions.filter(created_at__date=today).exists():
-            subject = 'Time for Your Daily Self-Reflection!'
-            message = render_to_string('emails/swipe_reminder.html', {'user': user})
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+            # A redelivered run skips the users already reminded today
+            with sending([delivery_key('swipe_reminder', user.pk, today)]) as claimed:
+                if not claimed:
+                    continue
+                subject = 'Time for Your Daily Self-Reflection!'
+                message = render_to_string('emails/swipe_reminder.html', {'user': user})
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [user.email],
+                    fail_silently=False,
+                )
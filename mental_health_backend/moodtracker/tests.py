@@ -1,3 +1,308 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mental_health_backend.events import publish
+from prometheus_client import REGISTRY
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import ChangeLog
+from .models import Prompt, UserResponse, Insight, SwipeSession
+
+User = get_user_model()
+
+class MoodtrackerAppTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        cls.other_user = User.objects.create_user(username="otheruser", email="other@example.com", password="password123")
+        cls.prompts = Prompt.objects.bulk_create(
+            [Prompt(text=f"Prompt {i}", category="mood") for i in range(15)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    # ---------------------
+    # Prompt Tests
+    # ---------------------
+    def test_prompt_list(self):
+        response = self.client.get(reverse('prompt-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(set(response.data["results"][0]), {"id", "text", "category"})
+
+    def test_prompt_list_excludes_recent_swipes(self):
+        swiped = self.prompts[:5]
+        UserResponse.objects.bulk_create(
+            [UserResponse(user=self.user, prompt=prompt, response=True) for prompt in swiped]
+        )
+        response = self.client.get(reverse('prompt-list'))
+        returned_ids = {prompt["id"] for prompt in response.data["results"]}
+        self.assertFalse(returned_ids & {prompt.id for prompt in swiped})
+
+    def test_prompt_list_uses_cached_catalog(self):
+        self.client.get(reverse('prompt-list'))
+        # Catalog is cached; only the auth lookup-free exclusion query should run
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('prompt-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_prompt_catalog_invalidated_on_write(self):
+        self.client.get(reverse('prompt-list'))
+        Prompt.objects.all().delete()
+        response = self.client.get(reverse('prompt-list'))
+        self.assertEqual(response.data["results"], [])
+
+    # ---------------------
+    # Insight Tests
+    # ---------------------
+    def test_insight_list_only_own(self):
+        Insight.objects.create(user=self.user, content="Mine")
+        Insight.objects.create(user=self.other_user, content="Not mine")
+        response = self.client.get(reverse('insight-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["content"], "Mine")
+
+    def test_insight_list_sparse_preview(self):
+        Insight.objects.create(user=self.user, content="A fairly long insight about sleep " * 20)
+        response = self.client.get(reverse('insight-list'), {'fields': 'id,content', 'preview': 15})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["results"][0]), {"id", "content"})
+        self.assertEqual(response.data["results"][0]["content"], "A fairly long i")
+
+    def test_insight_list_unauthenticated(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('insight-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight(self, mock_task):
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        response = self.client.post(reverse('generate-insight'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        mock_task.delay.assert_called_once()
+        user_id, prompt_text, session_id = mock_task.delay.call_args.args
+        self.assertEqual(user_id, self.user.id)
+        self.assertIn("Prompt 0: Resonates", prompt_text)
+        self.assertIsNone(session_id)
+
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_coalesces_duplicates(self, mock_task):
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        first = self.client.post(reverse('generate-insight'), {}, format='json')
+        second = self.client.post(reverse('generate-insight'), {}, format='json')
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.data["job_id"], first.data["job_id"])
+        self.assertEqual(second["Location"], reverse('insight-job-status', args=[first.data["job_id"]]))
+        mock_task.delay.assert_called_once()
+        self.assertEqual(mock_task.delay.call_args.kwargs, {"job_id": first.data["job_id"]})
+
+        status_response = self.client.get(first["Location"])
+        self.assertEqual(status_response.data, {"job_id": first.data["job_id"], "status": "pending", "insight_id": None})
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(first["Location"]).status_code, status.HTTP_404_NOT_FOUND)
+
+    @mock.patch('moodtracker.tasks.send_mail')
+    @mock.patch('moodtracker.tasks.render_to_string', return_value="insight")
+    @mock.patch('moodtracker.tasks.requests.post')
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_job_completes(self, mock_task, mock_post, mock_render, mock_send_mail):
+        from .tasks import generate_insight_task
+        mock_post.return_value.json.return_value = [{"generated_text": "Keep going"}]
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        job_id = self.client.post(reverse('generate-insight'), {}, format='json').data["job_id"]
+
+        generate_insight_task.apply(args=mock_task.delay.call_args.args, kwargs=mock_task.delay.call_args.kwargs)
+        response = self.client.get(reverse('insight-job-status', args=[job_id]))
+        insight = Insight.objects.get(user=self.user)
+        self.assertEqual(response.data, {"job_id": job_id, "status": "succeeded", "insight_id": insight.pk})
+
+        # Redelivery of a finished job does nothing; the lock is free for a new request
+        generate_insight_task.apply(args=mock_task.delay.call_args.args, kwargs=mock_task.delay.call_args.kwargs)
+        self.assertEqual(Insight.objects.filter(user=self.user).count(), 1)
+        self.assertNotEqual(self.client.post(reverse('generate-insight'), {}, format='json').data["job_id"], job_id)
+
+    @mock.patch('moodtracker.tasks.generate_insight')
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_interrupted_job_is_not_rerun(self, mock_task, mock_generate):
+        from .jobs import RUNNING, set_job_status
+        from .tasks import generate_insight_task
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        job_id = self.client.post(reverse('generate-insight'), {}, format='json').data["job_id"]
+        set_job_status(job_id, self.user.id, RUNNING)  # Its worker stopped mid-run
+
+        generate_insight_task.apply(args=mock_task.delay.call_args.args, kwargs=mock_task.delay.call_args.kwargs)
+        mock_generate.assert_not_called()
+        self.assertEqual(self.client.get(reverse('insight-job-status', args=[job_id])).data["status"], "failed")
+        self.assertNotEqual(self.client.post(reverse('generate-insight'), {}, format='json').data["job_id"], job_id)
+
+    @mock.patch('moodtracker.tasks.send_mail')
+    @mock.patch('moodtracker.tasks.render_to_string', return_value="reminder")
+    def test_swipe_reminders_are_sent_once_a_day(self, mock_render, mock_send_mail):
+        from .tasks import send_swipe_reminders
+        SwipeSession.objects.create(user=self.other_user)
+        mock_send_mail.side_effect = ConnectionError("SMTP down")
+        with self.assertRaises(ConnectionError):
+            send_swipe_reminders()
+        mock_send_mail.side_effect = None
+        send_swipe_reminders()
+        send_swipe_reminders()  # Redelivered
+        self.assertEqual([call.args[3] for call in mock_send_mail.call_args_list], [[self.user.email]] * 2)
+
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_enqueue_failure_releases_lock(self, mock_task):
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        mock_task.delay.side_effect = ConnectionError("broker down")
+        with self.assertRaises(ConnectionError):
+            self.client.post(reverse('generate-insight'), {}, format='json')
+        mock_task.delay.side_effect = None
+        response = self.client.post(reverse('generate-insight'), {}, format='json')
+        self.assertEqual(response.data["message"], "Insight generation in progress.")
+
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_without_responses(self, mock_task):
+        response = self.client.post(reverse('generate-insight'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_task.delay.assert_not_called()
+
+    @mock.patch('moodtracker.views.generate_insight_task')
+    def test_generate_insight_invalid_session(self, mock_task):
+        UserResponse.objects.create(user=self.user, prompt=self.prompts[0], response=True)
+        session = SwipeSession.objects.create(user=self.other_user)
+        response = self.client.post(reverse('generate-insight'), {"session_id": session.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_task.delay.assert_not_called()
+
+
+class InsightReviewTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username="reviewer", email="reviewer@example.com", password="password123")
+        cls.user = User.objects.create_user(username="author", email="author@example.com", password="password123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        now = timezone.now()
+        self.insights = [Insight.objects.create(user=self.user, content=f"Insight {i}") for i in range(5)]
+        for i, insight in enumerate(self.insights):
+            Insight.objects.filter(pk=insight.pk).update(generated_at=now - timedelta(hours=5 - i))
+        Insight.objects.filter(pk=self.insights[0].pk).update(reviewed=True)
+
+    def reviewed_total(self, decision):
+        return REGISTRY.get_sample_value('insights_reviewed_total', {'decision': decision}) or 0
+
+    def test_queue_pages_unreviewed_oldest_first(self):
+        url = reverse('insight-review-queue')
+        with mock.patch('moodtracker.review.ReviewQueuePagination.page_size', 3):
+            first = self.client.get(url)
+            second = self.client.get(first.data['next'])
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, [insight.pk for insight in self.insights[1:]])
+        self.assertIsNone(second.data['next'])
+
+    def test_queue_is_admin_only(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(reverse('insight-review-queue')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_review_is_one_update(self):
+        approved_before = self.reviewed_total('approved')
+        ids = [insight.pk for insight in self.insights]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('insight-review-queue'), {'ids': ids, 'approved': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'reviewed': 4})  # The first one was already reviewed
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "moodtracker_insight"') for q in queries.captured_queries), 1)
+        self.assertEqual(Insight.objects.filter(approved=True, reviewed_by=self.admin, reviewed_at__isnull=False).count(), 4)
+        self.assertEqual(self.reviewed_total('approved') - approved_before, 4)
+        self.assertEqual(ChangeLog.objects.filter(user=self.user, source='insights', object_id__in=ids[1:]).count(), 4)
+
+    def test_bulk_review_validation(self):
+        url = reverse('insight-review-queue')
+        self.assertEqual(self.client.post(url, {'ids': [], 'approved': True}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {'ids': [1]}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_reject_action(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:moodtracker_insight_changelist'), {
+            'action': 'reject_insights', '_selected_action': [self.insights[1].pk, self.insights[2].pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(Insight.objects.filter(approved=False).values_list('pk', flat=True)), {self.insights[1].pk, self.insights[2].pk})
+
+
+class InsightEventsTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="listener", email="listener@example.com", password="password123")
+        cls.other_user = User.objects.create_user(username="bystander", email="bystander@example.com", password="password123")
+
+    def test_insight_saved_publishes_event(self):
+        with mock.patch('moodtracker.signals.publish') as mock_publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                insight = Insight.objects.create(user=self.user, content="Saved")
+            Insight.objects.filter(pk=insight.pk).update(reviewed=True)
+            insight.save()
+        mock_publish.assert_called_once_with(
+            self.user.id, 'insight', {'id': insight.pk, 'preview': "Saved", 'generated_at': insight.generated_at}
+        )
+
+    async def test_stream_delivers_own_events(self):
+        response = await AsyncClient().get(reverse('insight-events'), headers={
+            'Accept': 'text/event-stream', 'Authorization': f'Bearer {AccessToken.for_user(self.user)}',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b'retry: 3000\n\n')
+
+        publish(self.other_user.id, 'job', {'job_id': 'theirs', 'status': 'running', 'insight_id': None})
+        publish(self.user.id, 'job', {'job_id': 'mine', 'status': 'running', 'insight_id': None})
+        self.assertEqual(await anext(content), b'event: job\ndata: {"job_id":"mine","status":"running","insight_id":null}\n\n')
+
+    def test_stream_refused_under_wsgi(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('insight-events'), HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def test_stream_unauthenticated(self):
+        response = await AsyncClient().get(reverse('insight-events'), headers={'Accept': 'text/event-stream'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(response.content.startswith(b'event: error\ndata: '))
+
+    @override_settings(INSIGHT_MODEL_BACKEND='local')
+    @mock.patch('moodtracker.tasks.send_mail')
+    @mock.patch('moodtracker.tasks.render_to_string', return_value="insight")
+    @mock.patch('moodtracker.tasks.publish')
+    @mock.patch('moodtracker.tasks.stream_generation', return_value=iter(["Keep", " going", ""]))
+    def test_local_backend_streams_tokens(self, mock_stream, mock_publish, mock_render, mock_send_mail):
+        from .tasks import generate_insight
+        insight = generate_insight(self.user.id, "prompt", job_id="abc")
+        self.assertEqual(insight.content, "Keep going")
+        self.assertEqual(mock_publish.call_args_list, [
+            mock.call(self.user.id, 'token', {'job_id': "abc", 'text': "Keep"}),
+            mock.call(self.user.id, 'token', {'job_id': "abc", 'text': " going"}),
+        ])
+
+    @mock.patch('moodtracker.tasks.publish')
+    @mock.patch('moodtracker.tasks.stream_generation', side_effect=RuntimeError("out of memory"))
+    def test_local_backend_failure_is_logged(self, mock_stream, mock_publish):
+        from .tasks import stream_insight_text
+        with self.assertLogs('moodtracker.tasks', level='ERROR') as logs:
+            text = stream_insight_text(self.user.id, "prompt", job_id="abc")
+        self.assertEqual(text, "An error occurred while generating your insight. Please try again later.")
+        self.assertIn("out of memory", logs.output[0])
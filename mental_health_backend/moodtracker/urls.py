@@ -1,20 +1,28 @@
 from django.urls import path
 from .views import (
     PromptListView,
+    RelatedPromptsView,
     SwipeSessionCreateView,
     SwipeSessionCompleteView,
     UserResponseCreateView,
     InsightListView,
+    InsightReviewQueueView,
     GenerateInsightView,
+    InsightJobStatusView,
+    InsightEventStreamView,
     UserProgressView
 )
 
 urlpatterns = [
     path('prompts/', PromptListView.as_view(), name='prompt-list'),
+    path('prompts/<int:pk>/related/', RelatedPromptsView.as_view(), name='prompt-related'),
     path('swipe_sessions/', SwipeSessionCreateView.as_view(), name='swipe-session-create'),
     path('swipe_sessions/<int:session_id>/complete/', SwipeSessionCompleteView.as_view(), name='swipe-session-complete'),
     path('responses/', UserResponseCreateView.as_view(), name='user-response-create'),
     path('insights/', InsightListView.as_view(), name='insight-list'),
     path('insights/generate/', GenerateInsightView.as_view(), name='generate-insight'),
-    path('progress/', UserProgressView.as_view(), name='user-progress'),
+    path('insights/jobs/<str:job_id>/', InsightJobStatusView.as_view(), name='insight-job-status'),
+    path('insights/events/', InsightEventStreamView.as_view(), name='insight-events'),
+    path('insights/review/', InsightReviewQueueView.as_view(), name='insight-review-queue'),
+    path('progress/', UserProgressView.as_view(), name='swipe-progress'),
 ]
@@ -1,16 +1,37 @@
+import random
+
+from asgiref.sync import sync_to_async
+from adrf import generics as async_generics
+from adrf.views import APIView as AsyncAPIView
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
+from mental_health_backend.embeddings import result_limit, similar
+from mental_health_backend.events import event_stream
+from mental_health_backend.fastpath import RowListMixin
+from mental_health_backend.fieldsets import SparseFieldsetMixin
+from mental_health_backend.idempotency import IdempotentCreateMixin
+from mental_health_backend.renderers import EventStreamRenderer, ORJSONRenderer
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from .models import Prompt, UserResponse, Insight, SwipeSession
+from goals.models import UserProgress
+from .jobs import aclaim_job, afail_job, aget_job
+from .models import Prompt, UserResponse, Insight, SwipeSession, PROMPT_CATALOG_CACHE_KEY
+from .review import ReviewQueuePagination, review_insights, review_queue
 from .serializers import (
     PromptSerializer,
     UserResponseSerializer,
     InsightSerializer,
+    InsightReviewSerializer,
     SwipeSessionSerializer
 )
+from .tasks import generate_insight_task
 import openai
 from django.conf import settings
 from celery import shared_task
@@ -20,30 +41,64 @@ from django.template.loader import render_to_string
 # Ensure OpenAI API key is set
 openai.api_key = settings.OPENAI_API_KEY
 
-class PromptListView(generics.ListAPIView):
+PROMPTS_PER_SESSION = 10
+
+
+async def aget_prompt_catalog():
+    """
+    Returns every prompt as a list of dicts, served from the cache when possible.
+    """
+    catalog = await cache.aget(PROMPT_CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = [prompt async for prompt in Prompt.objects.values('id', 'text', 'category')]
+        await cache.aset(PROMPT_CATALOG_CACHE_KEY, catalog, settings.PROMPT_CATALOG_CACHE_TIMEOUT)
+    return catalog
+
+
+class PromptListView(async_generics.ListAPIView):
     """
     API endpoint to retrieve a personalized list of prompts for the user to swipe.
     """
     serializer_class = PromptSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        user = self.request.user
+    async def get(self, request, *args, **kwargs):
+        user = request.user
+        catalog = await aget_prompt_catalog()
         # Exclude prompts swiped in the last 7 days
         exclusion_period = timezone.now() - timezone.timedelta(days=7)
-        excluded_prompts = UserResponse.objects.filter(
-            user=user,
-            timestamp__gte=exclusion_period
-        ).values_list('prompt_id', flat=True)
-        available_prompts = Prompt.objects.exclude(id__in=excluded_prompts)
+        excluded_prompts = {
+            prompt_id async for prompt_id in UserResponse.objects.filter(
+                user=user,
+                timestamp__gte=exclusion_period
+            ).values_list('prompt_id', flat=True)
+        }
+        available_prompts = [prompt for prompt in catalog if prompt['id'] not in excluded_prompts]
         # If not enough prompts, fallback to all prompts
-        if available_prompts.count() < 10:
-            available_prompts = Prompt.objects.all()
-        # Randomly select a subset
-        selected_prompts = available_prompts.order_by('?')[:10]  # Adjust number as needed
-        return selected_prompts
+        if len(available_prompts) < PROMPTS_PER_SESSION:
+            available_prompts = catalog
+        # Randomly select a subset in memory instead of ORDER BY RANDOM() over the table
+        selected_prompts = random.sample(available_prompts, min(PROMPTS_PER_SESSION, len(available_prompts)))
+        page = await self.apaginate_queryset(selected_prompts)
+        serializer = self.get_serializer(page, many=True)
+        return await self.get_apaginated_response(serializer.data)
 
-class SwipeSessionCreateView(generics.CreateAPIView):
+class RelatedPromptsView(APIView):
+    """
+    API endpoint listing the prompts closest in meaning to a prompt, best first, from the
+    prompt embedding index (see mental_health_backend.embeddings). Supports ``?limit=``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, format=None):
+        matches = similar('prompts', pk, result_limit(request))
+        if matches is None:
+            return Response({'error': 'Prompt not found or not indexed yet.'}, status=status.HTTP_404_NOT_FOUND)
+        prompts = Prompt.objects.in_bulk([id for id, _ in matches])
+        results = [{**PromptSerializer(prompts[id]).data, 'score': score} for id, score in matches if id in prompts]
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+class SwipeSessionCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     Creates a new swipe session for the user.
     """
@@ -53,7 +108,7 @@ class SwipeSessionCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class UserResponseCreateView(generics.CreateAPIView):
+class UserResponseCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     API endpoint to record a user's response to a prompt.
     """
@@ -65,38 +120,64 @@ class UserResponseCreateView(generics.CreateAPIView):
         active_session = SwipeSession.objects.filter(user=self.request.user, completed=False).first()
         serializer.save(user=self.request.user, session=active_session)
 
-class InsightListView(generics.ListAPIView):
+class InsightListView(SparseFieldsetMixin, RowListMixin, async_generics.ListAPIView):
     """
-    API endpoint to retrieve insights for the user.
+    API endpoint to retrieve insights for the user. Supports ``?fields=`` and ``?preview=N``.
     """
     serializer_class = InsightSerializer
     permission_classes = [permissions.IsAuthenticated]
+    preview_fields = {'content': 'preview'}
 
     def get_queryset(self):
         return Insight.objects.filter(user=self.request.user).order_by('-generated_at')
 
-class GenerateInsightView(APIView):
+class InsightReviewQueueView(generics.ListAPIView):
+    """
+    Admin review queue: unreviewed insights, oldest first, paged with a cursor.
+
+    POST ``{"ids": [...], "approved": true|false}`` records the decision for the listed
+    insights that are still unreviewed.
+    """
+    serializer_class = InsightSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = ReviewQueuePagination
+
+    def get_queryset(self):
+        return review_queue()
+
+    def post(self, request, format=None):
+        serializer = InsightReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reviewed = review_insights(
+            review_queue().filter(pk__in=serializer.validated_data['ids']),
+            serializer.validated_data['approved'],
+            request.user,
+        )
+        return Response({'reviewed': reviewed}, status=status.HTTP_200_OK)
+
+class GenerateInsightView(AsyncAPIView):
     """
     API endpoint to generate an insight based on recent user responses.
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    def post(self, request, format=None):
+    async def post(self, request, format=None):
         user = request.user
         session_id = request.data.get('session_id')
-        
+
         # Validate session if session_id is provided
         if session_id:
-            try:
-                session = SwipeSession.objects.get(id=session_id, user=user, completed=False)
-            except SwipeSession.DoesNotExist:
+            session_exists = await SwipeSession.objects.filter(id=session_id, user=user, completed=False).aexists()
+            if not session_exists:
                 return Response({'error': 'Invalid or completed session.'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            session = None
 
         # Fetch recent responses, e.g., last 10
-        recent_responses = UserResponse.objects.filter(user=user).order_by('-timestamp')[:10]
-        if not recent_responses.exists():
+        recent_responses = [
+            response async for response in UserResponse.objects.filter(user=user)
+            .select_related('prompt')
+            .order_by('-timestamp')[:10]
+        ]
+        if not recent_responses:
             return Response({"detail": "Not enough data to generate insight."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Prepare data for AI
@@ -110,10 +191,53 @@ class GenerateInsightView(APIView):
         # Since we're not modifying the 'users' app, preferences can be handled here if implemented
         # Example: prompt_text += f"\nUser Preferences: {', '.join(user_preferences)}."
 
-        # Enqueue the insight generation task
-        generate_insight_task.delay(user.id, prompt_text, session_id)
+        # One generation in flight per user: repeats are pointed at the pending job
+        job_id, created = await aclaim_job(user.id)
+        headers = {'Location': reverse('insight-job-status', args=[job_id])}
+        if not created:
+            return Response(
+                {'message': 'Insight generation already in progress.', 'job_id': job_id},
+                status=status.HTTP_202_ACCEPTED, headers=headers,
+            )
+
+        # Enqueue the insight generation task; publishing to the broker is blocking I/O
+        try:
+            await sync_to_async(generate_insight_task.delay, thread_sensitive=False)(user.id, prompt_text, session_id, job_id=job_id)
+        except Exception:
+            await afail_job(user.id, job_id)
+            raise
+
+        return Response({'message': 'Insight generation in progress.', 'job_id': job_id}, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+class InsightJobStatusView(AsyncAPIView):
+    """
+    API endpoint to poll an insight generation job started by ``GenerateInsightView``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request, job_id, format=None):
+        job = await aget_job(job_id)
+        if job is None or job['user_id'] != request.user.id:
+            return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'job_id': job_id, 'status': job['status'], 'insight_id': job.get('insight_id')}, status=status.HTTP_200_OK)
+
+class InsightEventStreamView(AsyncAPIView):
+    """
+    Server-sent events for the user's insights: ``insight`` when one is saved, ``job`` when a
+    generation job changes state, and ``token`` for text as the local model generates it.
+    Open for as long as the client stays connected, so it is only served by the ASGI app:
+    a WSGI server would read the endless stream to its end before sending anything.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, ORJSONRenderer]
 
-        return Response({'message': 'Insight generation in progress.'}, status=status.HTTP_202_ACCEPTED)
+    async def get(self, request, format=None):
+        if not isinstance(request._request, ASGIRequest):
+            return Response({'error': 'Event streams are only served over ASGI.'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        response = StreamingHttpResponse(event_stream(request.user.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+        return response
 
 class SwipeSessionCompleteView(APIView):
     """
@@ -123,9 +247,11 @@ class SwipeSessionCompleteView(APIView):
 
     def post(self, request, session_id, format=None):
         try:
-            session = SwipeSession.objects.get(id=session_id, user=request.user, completed=False)
-            session.completed = True
-            session.save()
+            with transaction.atomic():
+                session = SwipeSession.objects.select_for_update().get(id=session_id, user=request.user, completed=False)
+                session.completed = True
+                session.save()
+                UserProgress.objects.record_completion(request.user, timezone.now())
             return Response({'message': 'Swipe session marked as completed.'}, status=status.HTTP_200_OK)
         except SwipeSession.DoesNotExist:
             return Response({'error': 'Swipe session not found or already completed.'}, status=status.HTTP_404_NOT_FOUND)
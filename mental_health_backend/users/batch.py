@@ -0,0 +1,181 @@
+# users/batch.py
+"""
+Batched writes for clients replaying offline changes.
+
+Every operation is validated with the regular serializer before anything is written; if
+any of them fails, nothing is applied. Otherwise all of them are applied in one transaction.
+Creates and updates of plain sources use ``bulk_create``/``bulk_update`` per source, so their
+change log entries (see users.sync) and the dashboard invalidation are written here rather
+than by the model signals. Sources with side effects in their serializer are saved one by one.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from rest_framework import status
+
+from mental_health_backend.fields import refresh_previews
+
+from .dashboard import bump_version
+from .models import ChangeLog
+from .sync import SYNC_SOURCES
+
+BATCH_SOURCES = {
+    source: SYNC_SOURCES[source] for source in ('journaling', 'gratitude', 'goals', 'problem_solving_sessions')
+}
+# Their serializers only map fields, so rows can be written in bulk
+BULK_SOURCES = {'journaling', 'gratitude', 'goals'}
+OPERATIONS = ('create', 'update', 'delete')
+MAX_OPERATIONS = 100
+
+
+class Operation:
+
+    def __init__(self, index, spec):
+        self.index = index
+        self.spec = spec
+        self.kind = self.source = self.object_id = self.instance = self.serializer = None
+        self.errors = None
+        self.error_status = status.HTTP_400_BAD_REQUEST
+
+    @property
+    def target(self):
+        return (self.source, self.object_id) if self.object_id is not None else None
+
+    def parse(self):
+        spec = self.spec
+        if not isinstance(spec, dict):
+            self.errors = {'non_field_errors': ['Expected an object.']}
+            return
+        errors = {}
+        self.kind, self.source = spec.get('op'), spec.get('source')
+        if self.kind not in OPERATIONS:
+            errors['op'] = [f"Must be one of: {', '.join(OPERATIONS)}."]
+        if self.source not in BATCH_SOURCES:
+            errors['source'] = [f"Must be one of: {', '.join(BATCH_SOURCES)}."]
+        if self.kind in ('update', 'delete'):
+            object_id = spec.get('id')
+            if isinstance(object_id, int) and not isinstance(object_id, bool):
+                self.object_id = object_id
+            else:
+                errors['id'] = ['An integer id is required.']
+        if self.kind in ('create', 'update') and not isinstance(spec.get('data'), dict):
+            errors['data'] = ['An object is required.']
+        self.errors = errors or None
+
+    def validate(self, instances):
+        if self.target is not None:
+            self.instance = instances.get(self.target)
+            if self.instance is None:
+                self.errors = {'id': ['Not found.']}
+                self.error_status = status.HTTP_404_NOT_FOUND
+                return
+        if self.kind == 'delete':
+            return
+        _, serializer_class = BATCH_SOURCES[self.source]
+        self.serializer = serializer_class(self.instance, data=self.spec['data'], partial=self.kind == 'update')
+        if not self.serializer.is_valid():
+            self.errors = self.serializer.errors
+
+
+def validate_operations(user, specs):
+    """
+    Parses and validates every operation. Returns ``(operations, valid)``.
+    """
+    operations = [Operation(index, spec) for index, spec in enumerate(specs)]
+    for operation in operations:
+        operation.parse()
+
+    seen = set()
+    wanted = defaultdict(set)
+    for operation in operations:
+        if operation.errors is None and operation.target is not None:
+            if operation.target in seen:
+                operation.errors = {'id': ['The same object appears in more than one operation.']}
+                continue
+            seen.add(operation.target)
+            wanted[operation.source].add(operation.object_id)
+
+    instances = {}
+    for source, ids in wanted.items():
+        model, _ = BATCH_SOURCES[source]
+        instances.update(((source, obj.pk), obj) for obj in model.objects.filter(user=user, pk__in=ids))
+
+    for operation in operations:
+        if operation.errors is None:
+            operation.validate(instances)
+    return operations, all(operation.errors is None for operation in operations)
+
+
+def apply_operations(user, operations):
+    """
+    Writes validated operations in one transaction and returns their results in request order.
+    """
+    bulk = defaultdict(lambda: defaultdict(list))  # source -> kind -> operations
+    for operation in operations:
+        if operation.kind != 'delete' and operation.source in BULK_SOURCES:
+            bulk[operation.source][operation.kind].append(operation)
+
+    results = {}
+    logged = []
+    with transaction.atomic():
+        for source, kinds in bulk.items():
+            model, serializer_class = BATCH_SOURCES[source]
+            derived = getattr(serializer_class, 'derived_fields', None)
+            created = [
+                model(**op.serializer.validated_data, **(derived(op.serializer.validated_data, user) if derived else {}), user=user)
+                for op in kinds['create']
+            ]
+            model.objects.bulk_create(created)
+            updated, fields = [], set()
+            for op in kinds['update']:
+                values = {**op.serializer.validated_data, **(derived(op.serializer.validated_data) if derived else {})}
+                for field, value in values.items():
+                    setattr(op.instance, field, value)
+                fields.update(values)
+                fields.update(refresh_previews(op.instance, values))  # bulk_update skips pre_save
+                updated.append(op.instance)
+            if updated:
+                model.objects.bulk_update(updated, sorted(fields))
+            for op, instance in zip(kinds['create'], created):
+                results[op.index] = (status.HTTP_201_CREATED, instance)
+            for op in kinds['update']:
+                results[op.index] = (status.HTTP_200_OK, op.instance)
+            logged.extend((source, instance.pk, False) for instance in [*created, *updated])
+
+        deletes = defaultdict(list)
+        for operation in operations:
+            if operation.kind == 'delete':
+                deletes[operation.source].append(operation)
+                results[operation.index] = (status.HTTP_204_NO_CONTENT, None)
+            elif operation.source not in BULK_SOURCES:
+                instance = operation.serializer.save(**({'user': user} if operation.kind == 'create' else {}))
+                code = status.HTTP_201_CREATED if operation.kind == 'create' else status.HTTP_200_OK
+                results[operation.index] = (code, instance)
+        for source, ops in deletes.items():
+            model, _ = BATCH_SOURCES[source]
+            model.objects.filter(user=user, pk__in=[op.object_id for op in ops]).delete()  # Signals log these
+
+        ChangeLog.objects.record_many(user.pk, logged)
+        if logged:
+            transaction.on_commit(lambda: bump_version(user.pk))
+
+    output = []
+    for operation in operations:
+        code, instance = results[operation.index]
+        result = {'index': operation.index, 'status': code}
+        if instance is not None:
+            _, serializer_class = BATCH_SOURCES[operation.source]
+            result['data'] = serializer_class(instance).data
+        output.append(result)
+    return output
+
+
+def error_results(operations):
+    """
+    Per-operation results for a rejected batch: the errors, or 424 for operations that were valid.
+    """
+    return [
+        {'index': op.index, 'status': op.error_status, 'errors': op.errors}
+        if op.errors is not None else {'index': op.index, 'status': status.HTTP_424_FAILED_DEPENDENCY}
+        for op in operations
+    ]
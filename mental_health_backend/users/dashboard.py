@@ -0,0 +1,181 @@
+# users/dashboard.py
+"""
+Per-user home screen summary.
+
+Each app contributes one query, anchored on the user's row with correlated subqueries so it
+always returns exactly one row. The result is cached under a per-user version token that
+any write to a contributing model replaces (see users.signals), so a repeat open is a single
+``get_many`` round trip.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Left
+from django.utils import timezone
+
+from goals.models import Goals
+from gratitude.models import Gratitude
+from journaling.models import Journaling, ProblemSolvingSession
+from moodtracker.models import Insight, Prompt, SwipeSession, UserResponse
+
+User = get_user_model()
+
+# Characters of free text included in "latest" previews (journals and insights use their stored
+# preview columns, which hold the same length)
+PREVIEW_LENGTH = 200
+
+
+def version_key(user_id):
+    return f'dashboard:version:{user_id}'
+
+
+def summary_key(user_id):
+    return f'dashboard:summary:{user_id}'
+
+
+def bump_version(user_id):
+    """
+    Invalidates the cached summary of ``user_id``.
+    """
+    cache.set(version_key(user_id), uuid4().hex, timeout=None)
+
+
+def _count(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.filter(user=OuterRef('pk')).order_by().values('user').annotate(n=Count('pk')).values('n'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _latest(queryset, field):
+    return Subquery(queryset.filter(user=OuterRef('pk')).values(field)[:1])
+
+
+def _latest_fields(queryset, prefix, fields):
+    return {f'{prefix}__{name}': _latest(queryset, expression) for name, expression in fields.items()}
+
+
+def _nested(row, prefix):
+    """
+    Collects ``prefix__*`` columns into a dict, or ``None`` when there is no such row.
+    """
+    item = {key.split('__', 1)[1]: value for key, value in row.items() if key.startswith(f'{prefix}__')}
+    return item if item.get('id') is not None else None
+
+
+def _summary_row(user, **expressions):
+    return User.objects.filter(pk=user.pk).values(**expressions).get()
+
+
+def _journaling_summary(user, now):
+    journals = Journaling.objects.order_by('-created_at', '-id')
+    sessions = ProblemSolvingSession.objects.all()
+    upcoming = sessions.filter(completed=False, scheduled_time__gte=now).order_by('scheduled_time', 'id')
+    row = _summary_row(
+        user,
+        journal_count=_count(journals),
+        session_count=_count(sessions),
+        sessions_completed=_count(sessions.filter(completed=True)),
+        sessions_upcoming=_count(upcoming),
+        **_latest_fields(journals, 'journal', {'id': 'id', 'entry_text': 'preview', 'created_at': 'created_at'}),
+        **_latest_fields(upcoming, 'session', {'id': 'id', 'title': 'title', 'scheduled_time': 'scheduled_time'}),
+    )
+    return {
+        'journals': {'count': row['journal_count'], 'latest': _nested(row, 'journal')},
+        'problem_solving_sessions': {
+            'count': row['session_count'],
+            'completed': row['sessions_completed'],
+            'upcoming': row['sessions_upcoming'],
+            'next': _nested(row, 'session'),
+        },
+    }
+
+
+def _goals_summary(user, now):
+    goals = Goals.objects.all()
+    due = goals.filter(status='in-progress', due_date__gte=now.date()).order_by('due_date', 'id')
+    row = _summary_row(
+        user,
+        goal_count=_count(goals),
+        goals_in_progress=_count(goals.filter(status='in-progress')),
+        goals_completed=_count(goals.filter(status='completed')),
+        **_latest_fields(due, 'goal', {'id': 'id', 'goal_name': 'goal_name', 'due_date': 'due_date'}),
+    )
+    return {
+        'goals': {
+            'count': row['goal_count'],
+            'in_progress': row['goals_in_progress'],
+            'completed': row['goals_completed'],
+            'next_due': _nested(row, 'goal'),
+        },
+    }
+
+
+def _gratitude_summary(user, now):
+    entries = Gratitude.objects.order_by('-created_at', '-id').annotate(preview=Left('entry_text', PREVIEW_LENGTH))
+    row = _summary_row(
+        user,
+        gratitude_count=_count(entries),
+        **_latest_fields(entries, 'gratitude', {'id': 'id', 'entry_text': 'preview', 'created_at': 'created_at'}),
+    )
+    return {'gratitude': {'count': row['gratitude_count'], 'latest': _nested(row, 'gratitude')}}
+
+
+def _moodtracker_summary(user, now):
+    insights = Insight.objects.order_by('-generated_at', '-id')
+    responses = UserResponse.objects.all()
+    categories = [category for category, _ in Prompt.CATEGORY_CHOICES]
+    row = _summary_row(
+        user,
+        insight_count=_count(insights),
+        swipe_total=_count(responses),
+        swipe_sessions_completed=_count(SwipeSession.objects.filter(completed=True)),
+        last_swipe_at=_latest(responses.order_by('-timestamp'), 'timestamp'),
+        **{f'swipes_{category}': _count(responses.filter(prompt__category=category)) for category in categories},
+        **_latest_fields(insights, 'insight', {'id': 'id', 'content': 'preview', 'generated_at': 'generated_at'}),
+    )
+    return {
+        'insights': {'count': row['insight_count'], 'latest': _nested(row, 'insight')},
+        'swipes': {
+            'total': row['swipe_total'],
+            'by_category': {category: row[f'swipes_{category}'] for category in categories},
+            'completed_sessions': row['swipe_sessions_completed'],
+            'last_swipe_at': row['last_swipe_at'],
+        },
+    }
+
+
+SECTIONS = (_journaling_summary, _goals_summary, _gratitude_summary, _moodtracker_summary)
+
+
+def build_summary(user):
+    now = timezone.now()
+    summary = {'generated_at': now}
+    for section in SECTIONS:
+        summary.update(section(user, now))
+    return summary
+
+
+def get_summary(user):
+    """
+    Returns the cached summary for ``user``, rebuilding it when its version is stale.
+    """
+    vkey, skey = version_key(user.pk), summary_key(user.pk)
+    cached = cache.get_many([vkey, skey])
+    version = cached.get(vkey)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(vkey, version, timeout=None):
+            version = cache.get(vkey, version)
+    entry = cached.get(skey)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    summary = build_summary(user)
+    cache.set(skey, (version, summary), settings.DASHBOARD_CACHE_TIMEOUT)
+    return summary
@@ -0,0 +1,29 @@
+# users/management/commands/build_embedding_index.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mental_health_backend.embeddings import SOURCES, build_index
+from mental_health_backend.vectors import IndexBusy
+
+
+class Command(BaseCommand):
+    help = "Embeds prompts and journal entries and rebuilds their semantic search indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('indexes', nargs='*', help=f"Indexes to rebuild: {', '.join(SOURCES)} (default: all)")
+
+    def handle(self, *args, **options):
+        names = options['indexes'] or list(SOURCES)
+        unknown = sorted(set(names) - set(SOURCES))
+        if unknown:
+            raise CommandError(f"Unknown index: {', '.join(unknown)}")
+        for name in names:
+            started = time.perf_counter()
+            try:
+                rows = build_index(name)
+            except IndexBusy as err:
+                # An overlapping scheduled run is still building it
+                self.stderr.write(self.style.WARNING(f"Skipped {name}: {err}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(f"Indexed {rows} rows into {name} in {time.perf_counter() - started:.1f}s"))
@@ -0,0 +1,19 @@
+# users/management/commands/generate_openapi_schema.py
+from django.core.management.base import BaseCommand
+
+from mental_health_backend.openapi import artifact_path, code_version, write_schema
+
+
+class Command(BaseCommand):
+    help = "Writes the OpenAPI schema artifact for the current code version (served at /swagger.json)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the artifact already exists')
+
+    def handle(self, *args, **options):
+        path = artifact_path()
+        if path.exists() and not options['force']:
+            self.stdout.write(f"Schema for version {code_version()} is up to date: {path}")
+            return
+        path = write_schema()
+        self.stdout.write(self.style.SUCCESS(f"Wrote schema for version {code_version()} to {path}"))
@@ -0,0 +1,213 @@
+# users/management/commands/seed_synthetic.py
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from goals.models import Goals, ConcretenessModule, ActivityReminder, UserProgress
+from goals.reminders import next_occurrence
+from gratitude.models import Gratitude, CompassionExercise
+from journaling.models import Journaling, Meditation, CognitiveExercise, ProblemSolvingSession
+from journaling.stats import entry_date, entry_stats
+from moodtracker.models import Prompt, SwipeSession, UserResponse, Insight
+from users.models import ChangeLog, SyncSequence
+from users.sync import SOURCE_BY_MODEL
+
+WORDS = (
+    "today felt calm busy heavy light grateful anxious hopeful tired proud walk friend family "
+    "work sleep breathe coffee rain sun morning evening plan small step progress worry kind "
+    "notice moment rest focus read music meal call message garden quiet loud long short better"
+).split()
+
+
+@contextmanager
+def backdatable(*models):
+    """
+    Temporarily disables auto_now/auto_now_add so generated rows keep historical timestamps.
+    """
+    toggled = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    setattr(field, flag, False)
+                    toggled.append((field, flag))
+    try:
+        yield
+    finally:
+        for field, flag in toggled:
+            setattr(field, flag, True)
+
+
+class Command(BaseCommand):
+    help = "Bulk-generates synthetic users with realistic activity histories across all apps."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users to create')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk_create call')
+        parser.add_argument('--days', type=int, default=90, help='Length of each generated history in days')
+        parser.add_argument('--prefix', default='synthetic_', help='Username prefix for generated users')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.days = options['days']
+        self.now = timezone.now()
+        User = get_user_model()
+
+        prompts = self.seed_catalog()
+        offset = User.objects.filter(username__startswith=options['prefix']).count()
+        password = make_password('synthetic-password')  # Hash once; hashing per user dominates runtime
+        models = (
+            User, Journaling, Gratitude, Goals, ActivityReminder, UserProgress,
+            ProblemSolvingSession, SwipeSession, UserResponse, Insight,
+        )
+
+        created = 0
+        with backdatable(*models):
+            while created < options['users']:
+                count = min(self.batch_size, options['users'] - created)
+                start = offset + created
+                with transaction.atomic():
+                    users = User.objects.bulk_create(
+                        [
+                            User(
+                                username=f"{options['prefix']}{index}",
+                                email=f"{options['prefix']}{index}@example.com",
+                                password=password,
+                                date_joined=self.now - timedelta(days=self.days),
+                                created_at=self.now - timedelta(days=self.days),
+                            )
+                            for index in range(start, start + count)
+                        ],
+                        batch_size=self.batch_size,
+                    )
+                    self.seed_histories(users, prompts)
+                created += count
+                self.stdout.write(f"Created {created}/{options['users']} users")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {created} synthetic users."))
+
+    def seed_catalog(self):
+        """
+        Creates the shared catalog tables if they are empty and returns the prompt list.
+        """
+        if not Prompt.objects.exists():
+            categories = [choice for choice, _ in Prompt.CATEGORY_CHOICES]
+            Prompt.objects.bulk_create(
+                [Prompt(text=self.sentence(6, 12)[:255], category=categories[i % len(categories)]) for i in range(200)]
+            )
+        if not Meditation.objects.exists():
+            Meditation.objects.bulk_create(
+                [Meditation(title=f"Meditation {i}", description=self.sentence(20, 40), duration=self.rng.randint(3, 30))
+                 for i in range(50)]
+            )
+        if not CognitiveExercise.objects.exists():
+            CognitiveExercise.objects.bulk_create(
+                [CognitiveExercise(title=f"Exercise {i}", prompt=self.sentence(10, 25), example=self.sentence(10, 25))
+                 for i in range(50)]
+            )
+        if not ConcretenessModule.objects.exists():
+            ConcretenessModule.objects.bulk_create(
+                [ConcretenessModule(title=f"Module {i}", steps=self.sentence(20, 60)) for i in range(30)]
+            )
+        if not CompassionExercise.objects.exists():
+            CompassionExercise.objects.bulk_create(
+                [CompassionExercise(title=f"Compassion exercise {i}", prompt=self.sentence(10, 25)) for i in range(30)]
+            )
+        return list(Prompt.objects.only('id'))
+
+    def seed_histories(self, users, prompts):
+        rows = {model: [] for model in (
+            Journaling, Gratitude, Goals, ActivityReminder, UserProgress, ProblemSolvingSession, Insight,
+        )}
+        sessions = []
+        progress = Counter()  # One UserProgress row per (user, date)
+        for user in users:
+            # Activity follows a long tail: most users are light, a few journal daily
+            intensity = min(self.rng.expovariate(1.0), 4.0) / 4.0
+            active_days = [day for day in range(self.days) if self.rng.random() < intensity]
+            for day in active_days:
+                moment = self.moment(day)
+                text = self.sentence(30, 400)
+                rows[Journaling].append(Journaling(
+                    user=user, entry_text=text, created_at=moment, entry_date=entry_date(user, moment), **entry_stats(text),
+                ))
+                if self.rng.random() < 0.5:
+                    rows[Gratitude].append(Gratitude(user=user, entry_text=self.sentence(5, 40), created_at=moment))
+                progress[user, moment.date()] += self.rng.randint(1, 4)
+                if self.rng.random() < 0.6:
+                    sessions.append(SwipeSession(user=user, created_at=moment, completed=self.rng.random() < 0.8))
+            for _ in range(self.rng.randint(0, 8)):
+                due = (self.now + timedelta(days=self.rng.randint(-self.days, self.days))).date()
+                rows[Goals].append(Goals(
+                    user=user, goal_name=self.sentence(2, 5)[:255], description=self.sentence(10, 40), due_date=due,
+                    status=self.rng.choice(['in-progress', 'completed']),
+                ))
+            for _ in range(self.rng.randint(0, 3)):
+                reminder_time = time(self.rng.randint(6, 22), self.rng.choice([0, 15, 30, 45]))
+                rows[ActivityReminder].append(ActivityReminder(
+                    user=user, title=self.sentence(2, 5)[:255], description=self.sentence(5, 15),
+                    reminder_time=reminder_time, next_fire_at=next_occurrence(reminder_time, user.timezone, self.now),
+                ))
+            for _ in range(self.rng.randint(0, 6)):
+                created_at = self.moment(self.rng.randrange(self.days))
+                completed = self.rng.random() < 0.6
+                rows[ProblemSolvingSession].append(ProblemSolvingSession(
+                    user=user, title=self.sentence(2, 6)[:255], created_at=created_at,
+                    scheduled_time=created_at + timedelta(days=self.rng.randint(1, 7)),
+                    notes_before=self.sentence(10, 80), notes_after=self.sentence(10, 80) if completed else None,
+                    completed=completed, completed_at=created_at + timedelta(days=7) if completed else None,
+                ))
+            for _ in range(len(active_days) // 7):
+                rows[Insight].append(Insight(
+                    user=user, content=self.sentence(20, 120), generated_at=self.moment(self.rng.randrange(self.days)),
+                    confidence_score=round(self.rng.random(), 3), reviewed=self.rng.random() < 0.3,
+                ))
+        rows[UserProgress] = [
+            UserProgress(user=user, date=day, completed_sessions=count) for (user, day), count in progress.items()
+        ]
+
+        for model, objects in rows.items():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+        # bulk_create sends no signals, so log the new rows for delta sync here
+        sequences = Counter()
+        changes = []
+        for model, objects in rows.items():
+            source = SOURCE_BY_MODEL.get(model)
+            for obj in objects if source else ():
+                sequences[obj.user_id] += 1
+                changes.append(ChangeLog(
+                    user_id=obj.user_id, source=source, object_id=obj.pk, sequence=sequences[obj.user_id], changed_at=self.now,
+                ))
+        ChangeLog.objects.bulk_create(changes, batch_size=self.batch_size)
+        SyncSequence.objects.bulk_create(
+            [SyncSequence(user_id=user_id, value=value) for user_id, value in sequences.items()], batch_size=self.batch_size,
+        )
+
+        sessions = SwipeSession.objects.bulk_create(sessions, batch_size=self.batch_size)
+        responses = []
+        for session in sessions:
+            for prompt in self.rng.sample(prompts, min(len(prompts), self.rng.randint(5, 10))):
+                responses.append(UserResponse(
+                    user_id=session.user_id, prompt=prompt, session=session,
+                    response=self.rng.random() < 0.5, timestamp=session.created_at,
+                ))
+        UserResponse.objects.bulk_create(responses, batch_size=self.batch_size)
+
+    def moment(self, days_ago):
+        """
+        Returns a timestamp ``days_ago`` days in the past at a random time of day.
+        """
+        return self.now - timedelta(days=days_ago, seconds=self.rng.randrange(86400))
+
+    def sentence(self, min_words, max_words):
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(min_words, max_words))).capitalize() + "."
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:14
+
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_user_permissions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="timezone",
+            field=models.CharField(default="UTC", max_length=64, validators=[users.models.validate_timezone]),
+        ),
+    ]
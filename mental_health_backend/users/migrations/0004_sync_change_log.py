@@ -0,0 +1,80 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# (source, app label, model) of the rows existing before the change log
+SOURCES = [
+    ("journaling", "journaling", "Journaling"),
+    ("gratitude", "gratitude", "Gratitude"),
+    ("goals", "goals", "Goals"),
+    ("problem_solving_sessions", "journaling", "ProblemSolvingSession"),
+    ("insights", "moodtracker", "Insight"),
+]
+
+
+def backfill_change_log(apps, schema_editor):
+    """
+    Logs every existing row once, numbered per user, so a first sync (since=0) returns them all.
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    ChangeLog = apps.get_model("users", "ChangeLog")
+    SyncSequence = apps.get_model("users", "SyncSequence")
+    rows = " UNION ALL ".join(
+        f"SELECT {quote('user_id')} AS user_id, %s AS source, {quote('id')} AS object_id "
+        f"FROM {quote(apps.get_model(app_label, model_name)._meta.db_table)}"
+        for _, app_label, model_name in SOURCES
+    )
+    log = quote(ChangeLog._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {log} ({quote('user_id')}, {quote('source')}, {quote('object_id')}, "
+            f"{quote('sequence')}, {quote('deleted')}, {quote('changed_at')}) "
+            f"SELECT user_id, source, object_id, "
+            f"ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY source, object_id), %s, %s FROM ({rows}) existing",
+            [False, connection.ops.adapt_datetimefield_value(timezone.now()), *[source for source, _, _ in SOURCES]],
+        )
+        cursor.execute(
+            f"INSERT INTO {quote(SyncSequence._meta.db_table)} ({quote('user_id')}, {quote('value')}) "
+            f"SELECT {quote('user_id')}, MAX({quote('sequence')}) FROM {log} GROUP BY {quote('user_id')}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_timezone"),
+        ("goals", "0006_userprogress_unique_user_date"),
+        ("gratitude", "0004_alter_compassionexercise_options_and_more"),
+        ("journaling", "0013_compress_long_text"),
+        ("moodtracker", "0002_compress_insight_content"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncSequence",
+            fields=[
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ("value", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ChangeLog",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("source", models.CharField(max_length=32)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("sequence", models.PositiveBigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                ("changed_at", models.DateTimeField()),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="changes", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("user", "source", "object_id"), name="users_changelog_object_uniq"), models.UniqueConstraint(fields=("user", "sequence"), name="users_changelog_user_seq_uniq")],
+            },
+        ),
+        migrations.RunPython(backfill_change_log, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,23 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.contrib.auth.models import AbstractUser, Group, Permission
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"'{value}' is not a valid IANA time zone.")
+
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    timezone = models.CharField(max_length=64, default='UTC', validators=[validate_timezone])  # e.g. "Europe/Paris"
 
     groups = models.ManyToManyField(
         Group,
@@ -22,3 +36,101 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored time zone, so a save can tell whether it changed (see goals.signals)
+        instance.saved_timezone = instance.__dict__.get('timezone')
+        return instance
+
+
+class SyncSequence(models.Model):
+    """
+    Per-user counter handing out change sequence numbers (see ``ChangeLog``).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True)
+    value = models.PositiveBigIntegerField(default=0)
+
+
+class ChangeLogQuerySet(models.QuerySet):
+
+    def record(self, user_id, source, object_id, deleted=False):
+        """
+        Marks ``source`` object ``object_id`` as changed (or deleted) under the user's next sequence number.
+
+        The user's counter row stays locked until the surrounding transaction commits, so a
+        user's sequence numbers become visible in order and a client that has seen ``n`` has
+        seen everything below it. Each object keeps one row, moved forward on every change.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            sequence = self._allocate(cursor, user_id, 1)
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("user_id")}, {quote("source")}, {quote("object_id")}, '
+                f'{quote("sequence")}, {quote("deleted")}, {quote("changed_at")}) VALUES (%s, %s, %s, %s, %s, %s) '
+                f'ON CONFLICT ({quote("user_id")}, {quote("source")}, {quote("object_id")}) DO UPDATE SET '
+                f'{quote("sequence")} = EXCLUDED.{quote("sequence")}, {quote("deleted")} = EXCLUDED.{quote("deleted")}, '
+                f'{quote("changed_at")} = EXCLUDED.{quote("changed_at")}',
+                [user_id, source, object_id, sequence, deleted, connection.ops.adapt_datetimefield_value(timezone.now())],
+            )
+        return sequence
+
+    def record_many(self, user_id, changes):
+        """
+        ``record`` for a list of ``(source, object_id, deleted)`` changes to distinct objects, in two statements.
+        """
+        if not changes:
+            return
+        now = timezone.now()
+        with transaction.atomic(using=self.db), connections[self.db].cursor() as cursor:
+            last = self._allocate(cursor, user_id, len(changes))
+            self.bulk_create(
+                [
+                    self.model(user_id=user_id, source=source, object_id=object_id, deleted=deleted,
+                               sequence=sequence, changed_at=now)
+                    for sequence, (source, object_id, deleted) in enumerate(changes, start=last - len(changes) + 1)
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'source', 'object_id'],
+                update_fields=['sequence', 'deleted', 'changed_at'],
+            )
+
+    def _allocate(self, cursor, user_id, count):
+        """
+        Reserves ``count`` sequence numbers for the user and returns the last one.
+        """
+        quote = cursor.db.ops.quote_name
+        sequences = quote(SyncSequence._meta.db_table)
+        cursor.execute(
+            f'INSERT INTO {sequences} ({quote("user_id")}, {quote("value")}) VALUES (%s, %s) '
+            f'ON CONFLICT ({quote("user_id")}) DO UPDATE SET {quote("value")} = {sequences}.{quote("value")} + %s '
+            f'RETURNING {quote("value")}',
+            [user_id, count, count],
+        )
+        return cursor.fetchone()[0]
+
+
+class ChangeLog(models.Model):
+    """
+    Latest change to each synced object, ordered per user by ``sequence`` (see users.sync).
+
+    Deleted objects keep their row as a tombstone.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='changes')
+    source = models.CharField(max_length=32)  # Key in users.sync.SYNC_SOURCES
+    object_id = models.PositiveBigIntegerField()
+    sequence = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+
+    objects = ChangeLogQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'source', 'object_id'], name='users_changelog_object_uniq'),
+            # Also the index behind "changes after cursor n" range scans
+            models.UniqueConstraint(fields=['user', 'sequence'], name='users_changelog_user_seq_uniq'),
+        ]
@@ -0,0 +1,59 @@
+# users/schema.py
+import graphene
+from django.contrib.auth import get_user_model
+from graphene_django import DjangoObjectType
+
+from goals.models import Goals, ActivityReminder, UserProgress
+from goals.schema import GoalType, ActivityReminderType, UserProgressType
+from gratitude.models import Gratitude
+from gratitude.schema import GratitudeType
+from journaling.models import Journaling, ProblemSolvingSession
+from journaling.schema import JournalingType, ProblemSolvingSessionType
+from mental_health_backend.loaders import batch_by_foreign_key, load_related, mark_siblings
+from moodtracker.models import SwipeSession, Insight
+from moodtracker.schema import SwipeSessionType, InsightType
+
+User = get_user_model()
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def user_list(type_, model, order_by):
+    """
+    A ``limit``-bounded list of ``model`` rows owned by the user, batched across users.
+    """
+    def resolve(root, info, limit=DEFAULT_LIMIT):
+        limit = max(0, min(limit, MAX_LIMIT))
+        return load_related(
+            info, f'{model._meta.label}:{limit}', root, 'pk',
+            batch_by_foreign_key(model.objects.all(), 'user_id', order_by, limit=limit),
+            default=[],
+        )
+
+    return graphene.List(
+        graphene.NonNull(type_), required=True,
+        limit=graphene.Int(default_value=DEFAULT_LIMIT), resolver=resolve,
+    )
+
+
+class UserType(DjangoObjectType):
+    journals = user_list(JournalingType, Journaling, ['-created_at', '-id'])
+    problem_solving_sessions = user_list(ProblemSolvingSessionType, ProblemSolvingSession, ['-scheduled_time', '-id'])
+    gratitude_entries = user_list(GratitudeType, Gratitude, ['-created_at', '-id'])
+    goals = user_list(GoalType, Goals, ['due_date', 'id'])
+    activity_reminders = user_list(ActivityReminderType, ActivityReminder, ['reminder_time', 'id'])
+    progress = user_list(UserProgressType, UserProgress, ['-date', '-id'])
+    swipe_sessions = user_list(SwipeSessionType, SwipeSession, ['-created_at', '-id'])
+    insights = user_list(InsightType, Insight, ['-generated_at', '-id'])
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'created_at')
+
+
+class Query(graphene.ObjectType):
+    me = graphene.Field(UserType, required=True)
+
+    def resolve_me(root, info):
+        return mark_siblings([info.context.user])[0]
@@ -37,7 +37,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'created_at']
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'timezone', 'created_at']
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from goals.models import Goals
+from gratitude.models import Gratitude
+from journaling.models import Journaling, ProblemSolvingSession
+from moodtracker.models import Insight, SwipeSession, UserResponse
+from .dashboard import bump_version
+from .models import ChangeLog
+from .sync import SOURCE_BY_MODEL
+
+User = get_user_model()
+
+DASHBOARD_MODELS = [Journaling, ProblemSolvingSession, Goals, Gratitude, Insight, SwipeSession, UserResponse]
+
+
+def invalidate_dashboard(sender, instance, **kwargs):
+    """
+    Invalidates the owner's dashboard summary once a write to one of its sources commits.
+
+    Note that ``bulk_create``/``update`` do not send these signals; callers using them must
+    call ``bump_version`` themselves.
+    """
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard:{model._meta.label}:save')
+    post_delete.connect(invalidate_dashboard, sender=model, dispatch_uid=f'dashboard:{model._meta.label}:delete')
+
+
+def record_sync_change(sender, instance, **kwargs):
+    """
+    Logs the write for delta sync, in the same transaction as the write when there is one.
+    """
+    origin = kwargs.get('origin')
+    if isinstance(origin, User):
+        return  # The user's log goes with them
+    deleted = 'created' not in kwargs
+    ChangeLog.objects.record(instance.user_id, SOURCE_BY_MODEL[sender], instance.pk, deleted=deleted)
+
+
+for model in SOURCE_BY_MODEL:
+    post_save.connect(record_sync_change, sender=model, dispatch_uid=f'sync:{model._meta.label}:save')
+    post_delete.connect(record_sync_change, sender=model, dispatch_uid=f'sync:{model._meta.label}:delete')
@@ -0,0 +1,70 @@
+# users/sync.py
+"""
+Delta sync for offline-first clients.
+
+Writes to the models in ``SYNC_SOURCES`` are recorded in ``ChangeLog`` (see users.signals),
+one row per object carrying the user's latest sequence number. ``changes_since`` reads the
+log with an index range scan on ``(user, sequence)``, so a sync costs one query for the log
+plus one per source that changed, however long the user's history is.
+"""
+from goals.models import Goals
+from goals.serializers import GoalsSerializer
+from gratitude.models import Gratitude
+from gratitude.serializers import GratitudeSerializer
+from journaling.models import Journaling, ProblemSolvingSession
+from journaling.serializers import JournalingSerializer, ProblemSolvingSessionSerializer
+from moodtracker.models import Insight
+from moodtracker.serializers import InsightSerializer
+
+from .models import ChangeLog
+
+SYNC_SOURCES = {
+    'journaling': (Journaling, JournalingSerializer),
+    'gratitude': (Gratitude, GratitudeSerializer),
+    'goals': (Goals, GoalsSerializer),
+    'problem_solving_sessions': (ProblemSolvingSession, ProblemSolvingSessionSerializer),
+    'insights': (Insight, InsightSerializer),
+}
+SOURCE_BY_MODEL = {model: source for source, (model, _) in SYNC_SOURCES.items()}
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+
+
+def changes_since(user, since=0, limit=DEFAULT_LIMIT):
+    """
+    Returns up to ``limit`` changes after sequence ``since``, grouped by source.
+
+    ``cursor`` is the sequence to pass as ``since`` next time; ``has_more`` tells the client
+    to keep paging. Objects changed several times since the cursor appear once, in their
+    current state.
+    """
+    entries = list(
+        ChangeLog.objects.filter(user=user, sequence__gt=since)
+        .order_by('sequence')
+        .values_list('source', 'object_id', 'deleted', 'sequence')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    upserted = {source: [] for source in SYNC_SOURCES}
+    deleted = {source: [] for source in SYNC_SOURCES}
+    for source, object_id, is_deleted, _ in entries:
+        if source in SYNC_SOURCES:
+            (deleted if is_deleted else upserted)[source].append(object_id)
+
+    changes = {}
+    for source, (model, serializer_class) in SYNC_SOURCES.items():
+        rows = []
+        if upserted[source]:
+            found = {obj.pk: obj for obj in model.objects.filter(user=user, pk__in=upserted[source])}
+            rows = [found[pk] for pk in upserted[source] if pk in found]
+            # Deleted after the log was read
+            deleted[source].extend(pk for pk in upserted[source] if pk not in found)
+        changes[source] = {'updated': serializer_class(rows, many=True).data, 'deleted': deleted[source]}
+
+    return {
+        'cursor': entries[-1][3] if entries else since,
+        'has_more': has_more,
+        'changes': changes,
+    }
@@ -1,7 +1,22 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from goals.models import Goals
+from gratitude.models import Gratitude
+from journaling.models import Journaling, ProblemSolvingSession
+from moodtracker.models import Insight, Prompt, SwipeSession, UserResponse
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from .models import ChangeLog
 
 User = get_user_model()
 
@@ -61,3 +76,299 @@ class UsersAppTestCase(APITestCase):
     def test_user_str(self):
         user = User.objects.get(username="user1")
         self.assertEqual(str(user), "user1")
+
+    @mock.patch('users.views.send_mail')
+    @mock.patch('users.views.render_to_string', return_value="reset")
+    def test_password_reset_request(self, mock_render, mock_send_mail):
+        cache.clear()
+        url = reverse('password-reset-request')
+        response = self.client.post(url, {"email": "user1@example.com"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_send_mail.assert_called_once()
+        self.assertEqual(mock_send_mail.call_args.args[3], ["user1@example.com"])
+
+        # A second request inside the cooldown window does not send another email
+        response = self.client.post(url, {"email": "user1@example.com"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_send_mail.assert_called_once()
+
+    @mock.patch('users.views.send_mail')
+    def test_password_reset_request_unknown_email(self, mock_send_mail):
+        url = reverse('password-reset-request')
+        response = self.client.post(url, {"email": "nobody@example.com"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_send_mail.assert_not_called()
+
+
+class SeedSyntheticCommandTestCase(TestCase):
+
+    def test_seed_synthetic_creates_users_and_histories(self):
+        call_command('seed_synthetic', users=5, batch_size=2, days=30, seed=7, stdout=StringIO())
+        users = User.objects.filter(username__startswith='synthetic_')
+        self.assertEqual(users.count(), 5)
+        self.assertTrue(Prompt.objects.exists())
+        # Histories are backdated over the requested days rather than stamped with the insert time
+        # (with seed 7 the oldest entry falls in the first days of the history)
+        created = Journaling.objects.filter(user__in=users).values_list('created_at', flat=True)
+        self.assertTrue(created)
+        now = timezone.now()
+        self.assertLess(min(created), now - timedelta(days=25))
+        self.assertGreaterEqual(min(created), now - timedelta(days=31))
+        self.assertLessEqual(max(created), now)
+
+    def test_seed_synthetic_appends_users(self):
+        call_command('seed_synthetic', users=2, seed=1, stdout=StringIO())
+        call_command('seed_synthetic', users=2, seed=1, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='synthetic_').count(), 4)
+
+    def test_seed_synthetic_logs_rows_for_sync(self):
+        call_command('seed_synthetic', users=3, days=30, seed=7, stdout=StringIO())
+        user = User.objects.filter(username__startswith='synthetic_').order_by('pk').first()
+        self.assertEqual(
+            ChangeLog.objects.filter(user=user, source='journaling').count(),
+            Journaling.objects.filter(user=user).count(),
+        )
+
+
+class DashboardTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        cls.prompt = Prompt.objects.create(text="I feel calm", category='mood')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def test_summary_contents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Journaling.objects.create(user=self.user, entry_text="x" * 500)
+            Gratitude.objects.create(user=self.user, entry_text="Sunshine")
+            Goals.objects.create(
+                user=self.user, goal_name="Run", description="5k",
+                due_date=timezone.now().date() + timedelta(days=3), status='in-progress',
+            )
+            session = SwipeSession.objects.create(user=self.user, completed=True)
+            UserResponse.objects.create(user=self.user, prompt=self.prompt, session=session, response=True)
+            Insight.objects.create(user=self.user, content="You are doing well.")
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['journals']['count'], 1)
+        self.assertEqual(len(data['journals']['latest']['entry_text']), 200)
+        self.assertEqual(data['gratitude']['latest']['entry_text'], "Sunshine")
+        self.assertEqual(data['goals']['next_due']['goal_name'], "Run")
+        self.assertEqual(data['swipes']['by_category']['mood'], 1)
+        self.assertEqual(data['swipes']['completed_sessions'], 1)
+        self.assertEqual(data['insights']['count'], 1)
+        self.assertIsNone(data['problem_solving_sessions']['next'])
+
+    def test_repeat_opens_hit_the_cache(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('dashboard'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.data['journals']['count'], 0)
+
+    def test_writes_invalidate_the_summary(self):
+        self.client.get(reverse('dashboard'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Gratitude.objects.create(user=self.user, entry_text="New")
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.data['gratitude']['count'], 1)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SyncTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+        cls.other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, **params):
+        response = self.client.get(reverse('sync'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        journal = Journaling.objects.create(user=self.user, entry_text="Dear diary")
+        Gratitude.objects.create(user=self.user, entry_text="Sunshine")
+        Insight.objects.create(user=self.user, content="Keep going")
+        Gratitude.objects.create(user=self.other, entry_text="Not yours")
+        data = self.sync()
+        self.assertEqual(data['cursor'], 3)
+        self.assertFalse(data['has_more'])
+        self.assertEqual([row['id'] for row in data['changes']['journaling']['updated']], [journal.pk])
+        self.assertEqual(data['changes']['journaling']['updated'][0]['entry_text'], "Dear diary")
+        self.assertEqual(len(data['changes']['gratitude']['updated']), 1)
+        self.assertEqual(len(data['changes']['insights']['updated']), 1)
+        self.assertEqual(data['changes']['goals'], {'updated': [], 'deleted': []})
+
+    def test_only_changes_after_cursor_with_tombstones(self):
+        keep = Journaling.objects.create(user=self.user, entry_text="Keep")
+        drop = Journaling.objects.create(user=self.user, entry_text="Drop")
+        ProblemSolvingSession.objects.create(user=self.user, title="Plan", scheduled_time=timezone.now())
+        cursor = self.sync()['cursor']
+
+        keep.entry_text = "Edited"
+        keep.save()
+        drop_id = drop.pk
+        drop.delete()
+        data = self.sync(since=cursor)
+        self.assertGreater(data['cursor'], cursor)
+        self.assertEqual([row['entry_text'] for row in data['changes']['journaling']['updated']], ["Edited"])
+        self.assertEqual(data['changes']['journaling']['deleted'], [drop_id])
+        self.assertEqual(data['changes']['problem_solving_sessions']['updated'], [])  # Unchanged since the cursor
+
+        self.assertEqual(self.sync(since=data['cursor'])['changes']['journaling'], {'updated': [], 'deleted': []})
+
+    def test_repeated_changes_collapse_to_one_entry(self):
+        goal = Goals.objects.create(user=self.user, goal_name="Run", description="5k", due_date='2030-01-01', status='in-progress')
+        for status_value in ('completed', 'in-progress', 'completed'):
+            goal.status = status_value
+            goal.save()
+        self.assertEqual(ChangeLog.objects.filter(user=self.user).count(), 1)
+        data = self.sync()
+        self.assertEqual(data['cursor'], 4)
+        self.assertEqual([row['status'] for row in data['changes']['goals']['updated']], ['completed'])
+
+    def test_paging(self):
+        Gratitude.objects.bulk_create([Gratitude(user=self.user, entry_text=f"Entry {i}") for i in range(5)])
+        for entry in Gratitude.objects.filter(user=self.user):
+            entry.save()  # bulk_create sends no signals
+        first = self.sync(limit=3)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changes']['gratitude']['updated']), 3)
+        second = self.sync(since=first['cursor'], limit=3)
+        self.assertFalse(second['has_more'])
+        self.assertEqual(len(second['changes']['gratitude']['updated']), 2)
+
+    def test_query_count_does_not_depend_on_history(self):
+        Journaling.objects.bulk_create([Journaling(user=self.user, entry_text=f"Old {i}") for i in range(50)])
+        for entry in Journaling.objects.filter(user=self.user):
+            entry.save()
+        cursor = self.sync()['cursor']
+        Journaling.objects.create(user=self.user, entry_text="New")
+        with self.assertNumQueries(2):  # The log range, then the changed journal rows
+            data = self.sync(since=cursor)
+        self.assertEqual(len(data['changes']['journaling']['updated']), 1)
+
+    def test_user_deletion_cascades_the_log(self):
+        Journaling.objects.create(user=self.other, entry_text="Bye")
+        self.other.delete()
+        self.assertFalse(ChangeLog.objects.filter(user_id=self.other.pk).exists())
+
+    def test_invalid_parameters(self):
+        for params in ({'since': 'abc'}, {'since': -1}, {'limit': 0}, {'limit': 5000}):
+            response = self.client.get(reverse('sync'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BatchTestCase(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", email="test@example.com", password="password123")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def batch(self, *operations):
+        return self.client.post(reverse('batch'), {'operations': list(operations)}, format='json')
+
+    def test_applies_mixed_operations(self):
+        goal = Goals.objects.create(user=self.user, goal_name="Run", description="5k", due_date='2030-01-01', status='in-progress')
+        gone = Gratitude.objects.create(user=self.user, entry_text="Old")
+        response = self.batch(
+            {'op': 'create', 'source': 'journaling', 'data': {'entry_text': "One two three"}},
+            {'op': 'create', 'source': 'gratitude', 'data': {'entry_text': "Sunshine"}},
+            {'op': 'update', 'source': 'goals', 'id': goal.pk, 'data': {'status': 'completed'}},
+            {'op': 'delete', 'source': 'gratitude', 'id': gone.pk},
+            {'op': 'create', 'source': 'problem_solving_sessions',
+             'data': {'title': "Plan", 'scheduled_time': (timezone.now() + timedelta(days=1)).isoformat()}},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], [201, 201, 200, 204, 201])
+        journal = Journaling.objects.get(user=self.user)
+        self.assertEqual(results[0]['data']['id'], journal.pk)
+        self.assertEqual(journal.word_count, 3)
+        self.assertIsNotNone(journal.entry_date)
+        self.assertEqual(Goals.objects.get(pk=goal.pk).status, 'completed')
+        self.assertEqual(list(Gratitude.objects.values_list('entry_text', flat=True)), ["Sunshine"])
+        self.assertTrue(ProblemSolvingSession.objects.filter(user=self.user, title="Plan").exists())
+
+    def test_bulk_writes_are_logged_for_sync(self):
+        cursor = self.client.get(reverse('sync')).data['cursor']
+        response = self.batch(*[{'op': 'create', 'source': 'gratitude', 'data': {'entry_text': f"Entry {i}"}} for i in range(3)])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = self.client.get(reverse('sync'), {'since': cursor}).data
+        self.assertEqual(data['cursor'], cursor + 3)
+        self.assertEqual(len(data['changes']['gratitude']['updated']), 3)
+
+    def test_updates_refresh_text_previews(self):
+        journal = Journaling.objects.create(user=self.user, entry_text="Before")
+        response = self.batch({'op': 'update', 'source': 'journaling', 'id': journal.pk, 'data': {'entry_text': "After the walk"}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(Journaling.objects.values_list('preview', flat=True).get(pk=journal.pk), "After the walk")
+
+    def test_creates_are_bulk_inserted(self):
+        operations = [{'op': 'create', 'source': 'journaling', 'data': {'entry_text': f"Entry {i}"}} for i in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.batch(*operations)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [query['sql'].split()[:3] for query in queries.captured_queries]
+        self.assertEqual(statements.count(['INSERT', 'INTO', '"journaling_journaling"']), 1)
+        self.assertEqual(statements.count(['INSERT', 'INTO', '"users_changelog"']), 1)
+        self.assertEqual(Journaling.objects.filter(user=self.user).count(), 20)
+
+    def test_invalid_operation_rejects_the_whole_batch(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="password123")
+        foreign = Gratitude.objects.create(user=other, entry_text="Not yours")
+        response = self.batch(
+            {'op': 'create', 'source': 'gratitude', 'data': {'entry_text': "Fine"}},
+            {'op': 'create', 'source': 'journaling', 'data': {'entry_text': "   "}},
+            {'op': 'delete', 'source': 'gratitude', 'id': foreign.pk},
+            {'op': 'explode', 'source': 'nowhere'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], [424, 400, 404, 400])
+        self.assertIn('entry_text', results[1]['errors'])
+        self.assertEqual(set(results[3]['errors']), {'op', 'source'})
+        self.assertFalse(Gratitude.objects.filter(user=self.user).exists())
+        self.assertTrue(Gratitude.objects.filter(pk=foreign.pk).exists())
+
+    def test_same_object_twice_is_rejected(self):
+        entry = Gratitude.objects.create(user=self.user, entry_text="Once")
+        response = self.batch(
+            {'op': 'update', 'source': 'gratitude', 'id': entry.pk, 'data': {'entry_text': "Twice"}},
+            {'op': 'delete', 'source': 'gratitude', 'id': entry.pk},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([r['status'] for r in response.data['results']], [424, 400])
+
+    def test_failure_while_applying_rolls_back(self):
+        with mock.patch.object(Goals.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.batch(
+                    {'op': 'create', 'source': 'gratitude', 'data': {'entry_text': "Sunshine"}},
+                    {'op': 'create', 'source': 'goals',
+                     'data': {'goal_name': "Run", 'description': "5k", 'due_date': '2030-01-01', 'status': 'in-progress'}},
+                )
+        self.assertFalse(Gratitude.objects.exists())
+
+    def test_operations_must_be_a_list(self):
+        for body in ({}, {'operations': []}, {'operations': 'x'}):
+            response = self.client.post(reverse('batch'), body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
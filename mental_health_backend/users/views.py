@@ -1,5 +1,7 @@
 # users/views.py
 
+from asgiref.sync import sync_to_async
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateAPIView, GenericAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .models import User
@@ -11,16 +13,20 @@ from .serializers import (
 )
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.views import APIView
+from mental_health_backend.idempotency import IdempotentCreateMixin
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.conf import settings
-from django.urls import reverse
 from django.template.loader import render_to_string
+from .dashboard import get_summary
+from . import batch, sync
 
-class UserListCreateView(ListCreateAPIView):
+class UserListCreateView(IdempotentCreateMixin, ListCreateAPIView):
     """
     Handles user registration.
     """
@@ -38,21 +44,79 @@ class UserProfileView(RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+
+class DashboardView(APIView):
+    """
+    Home screen summary: counts and latest items across journaling, goals, gratitude and moodtracker.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_summary(request.user), status=status.HTTP_200_OK)
+
+
+class SyncView(APIView):
+    """
+    Delta sync: rows created, updated or deleted since ``?since=<cursor>`` (0 or omitted for everything).
+
+    Pass the returned ``cursor`` as ``since`` on the next call, repeating while ``has_more`` is true.
+    ``?limit=`` caps the changes per page (default 500, at most 1000).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', sync.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'since and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0 or not 1 <= limit <= sync.MAX_LIMIT:
+            return Response(
+                {'error': f'since must be >= 0 and limit between 1 and {sync.MAX_LIMIT}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(sync.changes_since(request.user, since, limit), status=status.HTTP_200_OK)
+
+
+class BatchView(APIView):
+    """
+    Applies a list of create/update/delete operations atomically.
+
+    Body: ``{"operations": [{"op": "create", "source": "journaling", "data": {...}},
+    {"op": "update", "source": "goals", "id": 3, "data": {...}}, {"op": "delete", "source": "gratitude", "id": 7}]}``.
+    Responds 200 with one result per operation, or 400 with per-operation errors when any of
+    them is invalid, in which case nothing is written.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        specs = request.data.get('operations') if isinstance(request.data, dict) else None
+        if not isinstance(specs, list) or not 1 <= len(specs) <= batch.MAX_OPERATIONS:
+            return Response(
+                {'error': f'operations must be a list of 1 to {batch.MAX_OPERATIONS} operations.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        operations, valid = batch.validate_operations(request.user, specs)
+        if not valid:
+            return Response({'results': batch.error_results(operations)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': batch.apply_operations(request.user, operations)}, status=status.HTTP_200_OK)
+
 # Password Reset Views
 
-class PasswordResetRequestView(GenericAPIView):
+class PasswordResetRequestView(AsyncGenericAPIView):
     """
     Handles password reset requests by sending a reset link to the user's email.
     """
     permission_classes = [AllowAny]
     serializer_class = PasswordResetRequestSerializer
 
-    def post(self, request):
+    async def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data['email']
-        user = get_user_model().objects.filter(email=email).first()
-        if user:
+        user = await get_user_model().objects.filter(email=email).afirst()
+        # Only one reset email per account per cooldown window; repeats are silently absorbed
+        if user and await cache.aadd(f'password_reset:{user.pk}', True, settings.PASSWORD_RESET_EMAIL_COOLDOWN):
             token = default_token_generator.make_token(user)
             uid = urlsafe_base64_encode(force_bytes(user.pk))
             # Construct the password reset link pointing to the frontend
@@ -62,7 +126,8 @@ class PasswordResetRequestView(GenericAPIView):
                 'user': user,
                 'reset_link': reset_link,
             })
-            send_mail(
+            # SMTP delivery is blocking I/O, so run it off the event loop
+            await sync_to_async(send_mail, thread_sensitive=False)(
                 subject,
                 message,
                 settings.DEFAULT_FROM_EMAIL,